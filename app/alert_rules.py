@@ -0,0 +1,253 @@
+"""Alert rules, evaluated in batches outside the write path.
+
+Each :class:`Rule` is declared once in :data:`RULES`: the alert it
+raises, when it runs, and a finder that picks matching users out of
+shared per-batch aggregates (:class:`Facts`, a few GROUP BYs over the
+``daily_spend`` rollup for a whole batch of users). Every alert carries a
+``dedupe_key`` of ``<rule>:<period>`` backed by a unique index on
+``(user_id, dedupe_key)``. One overspending day therefore raises one
+alert, however many expenses follow, and two evaluators racing can't
+double it.
+
+Rules run in two ways:
+
+* after commit: app.ledger queues the users whose transactions changed,
+  and the ``commit`` rules are evaluated for just those users
+  (``ALERT_RULES_AFTER_COMMIT``). In a request that happens once the
+  response has gone out. Elsewhere (``flask import-expenses``, job
+  workers) nothing runs after the commit, so the rules are evaluated in
+  the committing transaction instead.
+* on a schedule: ``flask run-alerts`` evaluates every rule for every user
+  in batches. daily_summary and weekly_savings report on closed periods,
+  so they only run here.
+"""
+import calendar
+from datetime import date, datetime, timedelta
+from flask import current_app, g, has_app_context, has_request_context, after_this_request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models import User, Alert, DailySpend
+
+BATCH_SIZE = 500
+BUDGET_THRESHOLDS = (100, 80, 50)
+
+
+class Rule:
+    def __init__(self, name, alert_type, icon, title, message, triggers, find):
+        self.name = name
+        self.alert_type = alert_type
+        self.icon = icon
+        self.title = title
+        self.message = message
+        self.triggers = triggers
+        self.find = find
+
+
+class Facts:
+    """Aggregates for one batch of users as of a day, each loaded on first use."""
+
+    def __init__(self, user_ids, as_of):
+        self.user_ids = list(user_ids)
+        self.as_of = as_of
+        self._cache = {}
+
+    def _spend(self, start, end):
+        """{user_id: (monthly_budget, spent in [start, end], spent on end day, expense count)}."""
+        key = (start, end)
+        if key not in self._cache:
+            on_end = db.case((DailySpend.day == end, DailySpend.total), else_=0)
+            rows = db.session.query(
+                User.id, User.monthly_budget,
+                db.func.coalesce(db.func.sum(DailySpend.total), 0),
+                db.func.coalesce(db.func.sum(on_end), 0),
+                db.func.coalesce(db.func.sum(DailySpend.txn_count), 0)
+            ).outerjoin(DailySpend, db.and_(
+                DailySpend.user_id == User.id, DailySpend.day >= start, DailySpend.day <= end
+            )).filter(User.id.in_(self.user_ids)).group_by(User.id, User.monthly_budget).all()
+            self._cache[key] = {
+                uid: (float(budget or 0), float(total), float(last), int(count))
+                for uid, budget, total, last, count in rows
+            }
+        return self._cache[key]
+
+    def month(self):
+        """Month-to-date spend through as_of, with as_of's own spend."""
+        return self._spend(self.as_of.replace(day=1), self.as_of)
+
+    def day(self, day):
+        return self._spend(day, day)
+
+    def week(self, start):
+        return self._spend(start, start + timedelta(days=6))
+
+
+def daily_limit(budget, month_spent, day):
+    """Same formula as SpendingContext.daily_limit, for any day."""
+    remaining_days = calendar.monthrange(day.year, day.month)[1] - day.day + 1
+    return round((budget - month_spent) / remaining_days, 2)
+
+
+def _daily_overspend(facts):
+    for uid, (budget, month_spent, today_spent, _) in facts.month().items():
+        limit = daily_limit(budget, month_spent, facts.as_of)
+        if today_spent > 0 and limit > 0 and today_spent > limit:
+            yield uid, facts.as_of.isoformat(), {'spent': today_spent, 'limit': limit}
+
+
+def _month_budget(facts):
+    for uid, (budget, month_spent, _, _) in facts.month().items():
+        if budget <= 0:
+            continue
+        pct = month_spent / budget * 100
+        crossed = next((t for t in BUDGET_THRESHOLDS if pct >= t), None)
+        if crossed:
+            period = f'{facts.as_of:%Y-%m}:{crossed}'
+            yield uid, period, {'pct': crossed, 'spent': month_spent, 'budget': budget}
+
+
+def _weekly_savings(facts):
+    last_monday = facts.as_of - timedelta(days=facts.as_of.weekday() + 7)
+    sunday = last_monday + timedelta(days=6)
+    days_in_month = calendar.monthrange(sunday.year, sunday.month)[1]
+    year, week, _ = last_monday.isocalendar()
+    for uid, (budget, spent, _, count) in facts.week(last_monday).items():
+        saved = budget * 7 / days_in_month - spent
+        if count and saved >= 1:
+            yield uid, f'{year}-W{week:02d}', {'saved': saved, 'spent': spent}
+
+
+def _daily_summary(facts):
+    yesterday = facts.as_of - timedelta(days=1)
+    month = facts.month()
+    for uid, (budget, spent, _, count) in facts.day(yesterday).items():
+        if count:
+            yield uid, yesterday.isoformat(), {
+                'spent': spent, 'count': count,
+                'limit': max(0.0, daily_limit(budget, month[uid][1], facts.as_of)),
+            }
+
+
+RULES = (
+    Rule('daily_overspend', 'overspend', '⚠️', '⚠️ Daily Limit Exceeded!',
+         "You've spent ₹{spent:.0f} today, exceeding your ₹{limit:.0f} limit.",
+         ('commit', 'schedule'), _daily_overspend),
+    Rule('month_budget', 'budget_warning', '⚠️', '⚠️ Budget Alert',
+         "You've spent {pct}% of your monthly budget (₹{spent:.0f} of ₹{budget:.0f}).",
+         ('commit', 'schedule'), _month_budget),
+    Rule('weekly_savings', 'savings', '🔥', '🔥 Great Savings!',
+         'You saved ₹{saved:.0f} last week! Keep it up!',
+         ('schedule',), _weekly_savings),
+    Rule('daily_summary', 'daily_summary', '📊', '📊 Daily Summary',
+         "Yesterday's spending: ₹{spent:.0f} over {count} expense(s) | Today's limit: ₹{limit:.0f}",
+         ('schedule',), _daily_summary),
+)
+
+
+def evaluate(trigger='schedule', user_ids=None, as_of=None, rules=None, batch_size=BATCH_SIZE):
+    """Run the rules for ``trigger`` over ``user_ids`` (all users by default).
+    Returns the number of alerts created; the caller commits."""
+    from app.notifications import recount_unread_alerts
+    from app.versioning import bump_data_versions
+
+    as_of = as_of or date.today()
+    active = [rule for rule in (rules or RULES) if trigger in rule.triggers]
+    if user_ids is None:
+        user_ids = [uid for (uid,) in db.session.query(User.id).order_by(User.id)]
+    user_ids = sorted(set(user_ids))
+
+    created = 0
+    for start in range(0, len(user_ids), batch_size):
+        facts = Facts(user_ids[start:start + batch_size], as_of)
+        candidates = {}
+        for rule in active:
+            for uid, period, values in rule.find(facts):
+                candidates[(uid, f'{rule.name}:{period}')] = (rule, values)
+        if not candidates:
+            continue
+
+        existing = set(db.session.query(Alert.user_id, Alert.dedupe_key).filter(
+            Alert.user_id.in_({uid for uid, _ in candidates}),
+            Alert.dedupe_key.in_({key for _, key in candidates})
+        ))
+        now = datetime.utcnow()
+        rows = [
+            {'user_id': uid, 'dedupe_key': key, 'alert_type': rule.alert_type, 'title': rule.title,
+             'message': rule.message.format(**values), 'icon': rule.icon, 'is_read': False, 'created_at': now}
+            for (uid, key), (rule, values) in candidates.items() if (uid, key) not in existing
+        ]
+        if not rows:
+            continue
+        inserted = db.session.execute(_insert_ignoring_duplicates(), rows).rowcount
+        created += max(inserted, 0)
+        touched = {row['user_id'] for row in rows}
+        recount_unread_alerts(user_ids=touched)
+        bump_data_versions(touched)
+    return created
+
+
+def _insert_ignoring_duplicates():
+    """INSERT that skips rows a concurrent evaluator already added (unique dedupe key)."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert(Alert.__table__).on_conflict_do_nothing()
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert(Alert.__table__).on_conflict_do_nothing()
+    return Alert.__table__.insert()
+
+
+def queue_alert_check(user_id):
+    """Evaluate the commit rules for ``user_id`` once the current transaction commits."""
+    db.session.info.setdefault('alert_user_ids', set()).add(user_id)
+
+
+@event.listens_for(Session, 'before_commit')
+def _evaluate_outside_requests(session):
+    if has_request_context() or not has_app_context() or not session.info.get('alert_user_ids'):
+        return
+    user_ids = session.info.pop('alert_user_ids')
+    if not current_app.config.get('ALERT_RULES_AFTER_COMMIT', True):
+        return
+    try:
+        # A savepoint, so a failing rule doesn't take the caller's writes down with it
+        with session.begin_nested():
+            evaluate('commit', user_ids)
+    except Exception:
+        current_app.logger.exception('alert rules failed for users %s', sorted(user_ids))
+
+
+@event.listens_for(Session, 'after_commit')
+def _schedule_after_commit(session):
+    user_ids = session.info.pop('alert_user_ids', None)
+    if not user_ids or not has_request_context():
+        return
+    if not current_app.config.get('ALERT_RULES_AFTER_COMMIT', True):
+        return
+    pending = g.get('alert_user_ids')
+    if pending is not None:
+        pending.update(user_ids)
+        return
+    g.alert_user_ids = pending = set(user_ids)
+    app = current_app._get_current_object()
+
+    @after_this_request
+    def evaluate_after_response(response):
+        response.call_on_close(lambda: _evaluate_in_background(app, pending))
+        return response
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_on_rollback(session, previous_transaction):
+    session.info.pop('alert_user_ids', None)
+
+
+def _evaluate_in_background(app, user_ids):
+    with app.app_context():
+        try:
+            evaluate('commit', user_ids)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            app.logger.exception('alert rules failed for users %s', sorted(user_ids))
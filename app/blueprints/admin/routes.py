@@ -0,0 +1,81 @@
+import os
+from functools import wraps
+from flask import Blueprint, current_app, jsonify, abort
+from flask_login import login_required, current_user
+from app.dbprofiles import pool_stats
+from app.profiler import endpoint_stats
+from app.cache import cache_stats
+
+admin_bp = Blueprint('admin', __name__, template_folder='templates')
+
+
+def admin_required(view):
+    """Only users listed in ADMIN_EMAILS; everyone else gets a 404."""
+    @wraps(view)
+    @login_required
+    def wrapped(*args, **kwargs):
+        if (current_user.email or '').lower() not in current_app.config.get('ADMIN_EMAILS', []):
+            abort(404)
+        return view(*args, **kwargs)
+    return wrapped
+
+
+@admin_bp.route('/api/pool')
+@admin_required
+def pool():
+    """This process's connection pool telemetry."""
+    return jsonify({
+        'profile': current_app.config['DB_PROFILE'],
+        'pid': os.getpid(),
+        **pool_stats.snapshot(),
+    })
+
+
+@admin_bp.route('/api/queries')
+@admin_required
+def queries():
+    """Per-endpoint query counts and DB time in this process, heaviest first."""
+    return jsonify({'pid': os.getpid(), 'endpoints': endpoint_stats.snapshot()})
+
+
+@admin_bp.route('/api/queries/reset', methods=['POST'])
+@admin_required
+def reset_queries():
+    endpoint_stats.reset()
+    return jsonify({'success': True})
+
+
+@admin_bp.route('/api/cache')
+@admin_required
+def cache():
+    """View cache hit/miss/eviction counts in this process and the backend's size."""
+    backend = current_app.extensions['view_cache']
+    return jsonify({'pid': os.getpid(), 'backend': backend.name, **backend.usage(), **cache_stats.snapshot()})
+
+
+@admin_bp.route('/api/cache/reset', methods=['POST'])
+@admin_required
+def reset_cache():
+    cache_stats.reset()
+    return jsonify({'success': True})
+
+
+@admin_bp.route('/api/jobs')
+@admin_required
+def jobs():
+    """Job counts by state, the oldest due job's wait and recent failures."""
+    from datetime import datetime
+    from app.extensions import db
+    from app.models import Job
+    from app.jobs import queue_counts
+    now = datetime.utcnow()
+    oldest = db.session.query(db.func.min(Job.run_after)).filter(
+        Job.state == 'queued', Job.run_after <= now
+    ).scalar()
+    failed = Job.query.filter_by(state='failed').order_by(Job.finished_at.desc()).limit(20).all()
+    return jsonify({
+        'runner': current_app.config['JOBS_RUNNER'],
+        'counts': queue_counts(),
+        'oldest_due_seconds': round((now - oldest).total_seconds(), 1) if oldest else 0,
+        'recent_failures': [job.to_dict() for job in failed],
+    })
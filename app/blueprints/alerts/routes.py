@@ -2,6 +2,7 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash,
 from flask_login import login_required, current_user
 from app.extensions import db
 from app.models import Alert
+from app.notifications import mark_alert_read, mark_all_alerts_read
 from datetime import datetime
 
 alerts_bp = Blueprint('alerts', __name__, template_folder='templates')
@@ -19,7 +20,7 @@ def index():
 @login_required
 def mark_read(alert_id):
     alert = Alert.query.filter_by(id=alert_id, user_id=current_user.id).first_or_404()
-    alert.is_read = True
+    mark_alert_read(alert)
     db.session.commit()
     return jsonify({'success': True})
 
@@ -27,7 +28,7 @@ def mark_read(alert_id):
 @alerts_bp.route('/mark-all-read', methods=['POST'])
 @login_required
 def mark_all_read():
-    Alert.query.filter_by(user_id=current_user.id, is_read=False).update({'is_read': True})
+    mark_all_alerts_read(current_user.id)
     db.session.commit()
     flash('All notifications marked as read! ✅', 'success')
     return redirect(url_for('alerts.index'))
@@ -36,5 +37,4 @@ def mark_all_read():
 @alerts_bp.route('/api/unread-count')
 @login_required
 def unread_count():
-    count = Alert.query.filter_by(user_id=current_user.id, is_read=False).count()
-    return jsonify({'count': count})
+    return jsonify({'count': current_user.unread_alert_count or 0})
@@ -0,0 +1,180 @@
+"""Single-pass analytics for the /analytics page.
+
+The user's month (plus the previous week, which can reach back into the
+prior month) is fetched with one query into flat column arrays. Every
+series and insight on the page is then derived in a single loop over
+those arrays, so the cost grows with the number of rows rather than with
+days x queries.
+"""
+from array import array
+from collections import namedtuple
+from datetime import date, timedelta
+import calendar
+
+from app.extensions import db
+from app.models import Transaction
+from app.daterange import within, days_range
+
+TopExpense = namedtuple('TopExpense', 'amount description category')
+
+
+class MonthAnalytics:
+    """Everything analytics/index.html renders, computed in one pass."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def to_context(self):
+        return dict(self.__dict__)
+
+
+def load_columns(user_id, first, last):
+    """Fetch a user's transactions dated first..last as parallel column arrays."""
+    rows = db.session.query(
+        Transaction.date, Transaction.amount, Transaction.category,
+        Transaction.subcategory, Transaction.is_food, Transaction.description
+    ).filter(
+        Transaction.user_id == user_id,
+        within(Transaction.date, days_range(first, last))
+    ).all()
+
+    days = array('i')
+    amounts = array('d')
+    categories, subcategories, descriptions = [], [], []
+    food = array('b')
+    for txn_date, amount, category, subcategory, is_food, description in rows:
+        days.append((txn_date.date() - first).days)
+        amounts.append(float(amount or 0))
+        categories.append(category)
+        subcategories.append(subcategory)
+        food.append(1 if is_food else 0)
+        descriptions.append(description)
+    return days, amounts, categories, subcategories, food, descriptions
+
+
+def compute_month_analytics(user, today=None):
+    today = today or date.today()
+    days_in_month = calendar.monthrange(today.year, today.month)[1]
+    month_start = date(today.year, today.month, 1)
+    next_month = month_start + timedelta(days=days_in_month)
+    this_week_start = today - timedelta(days=today.weekday())
+    last_week_start = this_week_start - timedelta(days=7)
+
+    start = min(month_start, last_week_start)
+    days, amounts, categories, subcategories, food, descriptions = load_columns(
+        user.id, start, next_month - timedelta(days=1)
+    )
+
+    # Day offsets (relative to the first loaded day) of the boundaries used below
+    month_lo = (month_start - start).days
+    today_idx = (today - start).days
+    this_week_lo = (this_week_start - start).days
+    last_week_lo = (last_week_start - start).days
+
+    per_day = [0.0] * (today_idx + 1)
+    category_totals = {}
+    food_totals = {}
+    month_spent = 0.0
+    this_week_spent = 0.0
+    last_week_spent = 0.0
+    top_idx = -1
+
+    for i in range(len(amounts)):
+        d = days[i]
+        amount = amounts[i]
+        if d <= today_idx:
+            per_day[d] += amount
+            if d >= this_week_lo:
+                this_week_spent += amount
+            elif d >= last_week_lo:
+                last_week_spent += amount
+        if d < month_lo:
+            continue
+        month_spent += amount
+        category_totals[categories[i]] = category_totals.get(categories[i], 0.0) + amount
+        if food[i]:
+            sub = subcategories[i] or 'Unknown'
+            food_totals[sub] = food_totals.get(sub, 0.0) + amount
+        if top_idx < 0 or amount > amounts[top_idx]:
+            top_idx = i
+
+    daily_spending = []
+    weekday_total = weekend_total = 0.0
+    weekday_count = weekend_count = 0
+    for day in range(1, today.day + 1):
+        d = date(today.year, today.month, day)
+        spent = per_day[month_lo + day - 1]
+        daily_spending.append({'day': day, 'date': d.isoformat(), 'amount': spent})
+        if d.weekday() < 5:
+            weekday_total += spent
+            weekday_count += 1
+        else:
+            weekend_total += spent
+            weekend_count += 1
+
+    weekday_avg = weekday_total / max(1, weekday_count)
+    weekend_avg = weekend_total / max(1, weekend_count)
+    week_change = this_week_spent - last_week_spent
+    week_change_pct = (week_change / max(1, last_week_spent)) * 100
+    daily_avg = month_spent / max(1, today.day)
+
+    remaining_days = days_in_month - today.day + 1
+    daily_limit = round((user.monthly_budget - month_spent) / remaining_days, 2)
+
+    top_expense = None
+    if top_idx >= 0:
+        top_expense = TopExpense(amounts[top_idx], descriptions[top_idx], categories[top_idx])
+
+    category_dist = sorted(category_totals.items())
+    insights = _insights(weekday_avg, weekend_avg, category_totals, week_change)
+
+    return MonthAnalytics(
+        daily_spending=daily_spending,
+        category_dist=category_dist,
+        food_breakdown=sorted(food_totals.items()),
+        weekday_avg=weekday_avg,
+        weekend_avg=weekend_avg,
+        this_week_spent=this_week_spent,
+        last_week_spent=last_week_spent,
+        week_change=week_change,
+        week_change_pct=week_change_pct,
+        month_spent=month_spent,
+        daily_avg=daily_avg,
+        daily_limit=daily_limit,
+        top_expense=top_expense,
+        insights=insights,
+        days_in_month=days_in_month,
+    )
+
+
+def _insights(weekday_avg, weekend_avg, category_totals, week_change):
+    insights = []
+    if weekend_avg > weekday_avg * 1.3:
+        insights.append({
+            'type': 'warning',
+            'icon': '📅',
+            'text': f'Weekend spending is {((weekend_avg/max(1,weekday_avg))-1)*100:.0f}% higher than weekdays'
+        })
+
+    food_total = category_totals.get('Food', 0)
+    total_spent = sum(category_totals.values())
+    if total_spent > 0 and food_total / total_spent > 0.6:
+        insights.append({
+            'type': 'info',
+            'icon': '🍕',
+            'text': f'Food makes up {food_total/total_spent*100:.0f}% of spending — try mess meals to save'
+        })
+
+    if week_change > 0:
+        insights.append({
+            'type': 'warning',
+            'icon': '📈',
+            'text': f'Spending is up ₹{week_change:.0f} vs last week'
+        })
+    else:
+        insights.append({
+            'type': 'success',
+            'icon': '📉',
+            'text': f'Great! Spending is down ₹{abs(week_change):.0f} vs last week'
+        })
+    return insights
@@ -0,0 +1,83 @@
+"""Year view for /analytics/history, read from monthly summaries.
+
+Closed months come from app.summaries (one small row each, computed in
+memory if the close-month job hasn't stored it yet). Only the current month
+is computed live, from the ``daily_spend`` rollup, so a year costs a
+handful of queries however many transactions it holds.
+"""
+import calendar
+from datetime import date
+from app.extensions import db
+from app.models import Budget, DailySpend
+from app.summaries import month_index, month_summaries, first_month
+
+
+def _current_month(user, today):
+    """The in-progress month in the same shape as MonthlySummary.to_dict()."""
+    start = today.replace(day=1)
+    rows = db.session.query(
+        DailySpend.category, db.func.sum(DailySpend.total), db.func.sum(DailySpend.txn_count)
+    ).filter(
+        DailySpend.user_id == user.id, DailySpend.day >= start, DailySpend.day <= today
+    ).group_by(DailySpend.category).all()
+    budget = Budget.query.filter_by(user_id=user.id, year=today.year, month=today.month).first()
+    categories = {category: round(float(total or 0), 2) for category, total, _ in rows}
+    return {
+        'year': today.year,
+        'month': today.month,
+        'total_spent': round(sum(categories.values()), 2),
+        'txn_count': int(sum(count or 0 for _, _, count in rows)),
+        'budget_amount': budget.total_amount if budget else None,
+        'category_totals': categories,
+    }
+
+
+def build_year(user, year, today=None):
+    """Month-by-month totals, budget vs actual and month-over-month change for ``year``."""
+    today = today or date.today()
+    current = month_index(today.year, today.month)
+    first, last = month_index(year, 1), min(month_index(year, 12), current)
+    # One month earlier so January has something to compare against
+    stored = {index: row.to_dict() for index, row in month_summaries(user, first - 1, last).items()}
+    if first <= current <= last:
+        stored[current] = _current_month(user, today)
+
+    months, categories = [], {}
+    for index in range(first, last + 1):
+        summary = stored.get(index)
+        if summary is None:
+            continue
+        total = summary['total_spent']
+        previous = stored.get(index - 1)
+        change_pct = None
+        if previous and previous['total_spent'] > 0:
+            change_pct = round((total - previous['total_spent']) / previous['total_spent'] * 100, 1)
+        budget = summary['budget_amount']
+        for category, amount in summary['category_totals'].items():
+            categories[category] = categories.get(category, 0.0) + amount
+        top = max(summary['category_totals'].items(), key=lambda item: item[1], default=(None, 0))
+        months.append({
+            'label': calendar.month_abbr[summary['month']],
+            'month': summary['month'],
+            'total': total,
+            'txn_count': summary['txn_count'],
+            'budget': budget,
+            'budget_pct': round(total / budget * 100) if budget else None,
+            'change_pct': change_pct,
+            'top_category': top[0],
+            'is_current': index == current,
+        })
+
+    closed = [m for m in months if not m['is_current']]
+    return {
+        'year': year,
+        'years': list(range(today.year, first_month(user) // 12 - 1, -1)),
+        'months': months,
+        'year_total': round(sum(m['total'] for m in months), 2),
+        'monthly_avg': round(sum(m['total'] for m in closed) / len(closed), 2) if closed else 0,
+        'highest_month': max(closed, key=lambda m: m['total'], default=None),
+        'lowest_month': min(closed, key=lambda m: m['total'], default=None),
+        'category_totals': sorted(((c, round(v, 2)) for c, v in categories.items()),
+                                  key=lambda item: item[1], reverse=True),
+    }
+
@@ -1,33 +1,31 @@
-from flask import Blueprint, render_template, redirect, url_for, request, flash
+from flask import Blueprint, render_template, redirect, url_for, request, flash, current_app
 from flask_login import login_user, logout_user, login_required, current_user
-from authlib.integrations.flask_client import OAuth
 from app.extensions import db
 from app.models import User
 from datetime import date
 
 auth_bp = Blueprint('auth', __name__, template_folder='templates')
 
-# Single OAuth instance — initialized once via init_oauth(app)
-oauth = OAuth()
-_google_registered = False
 
-
-def init_oauth(app):
-    """Call once from the app factory to register Google OAuth."""
-    global _google_registered
-    oauth.init_app(app)
-    if not _google_registered:
+def get_google():
+    """Google OAuth client, created on first use so Authlib stays out of cold starts."""
+    oauth = current_app.extensions.get('authlib.integrations.flask_client')
+    if oauth is None:
+        from authlib.integrations.flask_client import OAuth
+        oauth = OAuth()
         oauth.register(
             name='google',
-            client_id=app.config['GOOGLE_CLIENT_ID'],
-            client_secret=app.config['GOOGLE_CLIENT_SECRET'],
+            client_id=current_app.config['GOOGLE_CLIENT_ID'],
+            client_secret=current_app.config['GOOGLE_CLIENT_SECRET'],
             server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
             client_kwargs={
                 'scope': 'openid email profile',
                 'prompt': 'select_account',
             }
         )
-        _google_registered = True
+        # Only publish the instance once the client is registered
+        oauth.init_app(current_app._get_current_object())
+    return oauth.google
 
 
 @auth_bp.route('/login')
@@ -40,13 +38,13 @@ def login():
 @auth_bp.route('/google/login')
 def google_login():
     redirect_uri = url_for('auth.google_callback', _external=True)
-    return oauth.google.authorize_redirect(redirect_uri)
+    return get_google().authorize_redirect(redirect_uri)
 
 
 @auth_bp.route('/google/callback')
 def google_callback():
     try:
-        token = oauth.google.authorize_access_token()
+        token = get_google().authorize_access_token()
     except Exception as e:
         flash(f'Google login failed: {str(e)}', 'error')
         return redirect(url_for('auth.login'))
@@ -95,13 +93,14 @@ def google_callback():
 
 @auth_bp.route('/demo-login')
 def demo_login():
-    user = User.query.filter_by(email='demo@budgetbite.app').first()
-    if user:
-        login_user(user)
-        flash('Welcome, Alex! 👋 You\'re in the demo account.', 'success')
-        return redirect(url_for('dashboard.home'))
-    flash('Demo account not found. Please restart the app.', 'error')
-    return redirect(url_for('auth.login'))
+    from app.bootstrap import DEMO_EMAIL, seed_demo_data
+    user = User.query.filter_by(email=DEMO_EMAIL).first()
+    if not user:
+        # Seeded on first use rather than on every cold start
+        user = seed_demo_data()
+    login_user(user)
+    flash('Welcome, Alex! 👋 You\'re in the demo account.', 'success')
+    return redirect(url_for('dashboard.home'))
 
 
 @auth_bp.route('/onboarding', methods=['GET', 'POST'])
@@ -112,9 +111,11 @@ def onboarding():
         current_user.living_type = request.form.get('living_type', 'Hostel')
         current_user.food_preference = request.form.get('food_preference', 'Vegetarian')
         current_user.onboarding_complete = True
+        current_user.streak_as_of = None  # allowance changed, recompute streak history
         db.session.commit()
 
         from app.models import Budget
+        from app.envelopes import write_envelopes, default_allocations, RESERVE_SHARE
         today = date.today()
         total = current_user.monthly_budget
         budget = Budget(
@@ -122,18 +123,10 @@ def onboarding():
             month=today.month,
             year=today.year,
             total_amount=total,
-            food_allocation=total * 0.50,
-            travel_allocation=total * 0.18,
-            academic_allocation=total * 0.12,
-            entertainment_allocation=total * 0.12,
-            emergency_reserve=total * 0.08
+            emergency_reserve=total * RESERVE_SHARE
         )
-        budget.categories = {
-            'Food': total * 0.50, 'Travel': total * 0.18,
-            'Academic': total * 0.12, 'Entertainment': total * 0.12,
-            'Misc': total * 0.08
-        }
         db.session.add(budget)
+        write_envelopes(budget, {**default_allocations(total), 'Misc': total * RESERVE_SHARE})
         db.session.commit()
         flash('Budget set up! Your journey starts now 🚀', 'success')
         return redirect(url_for('dashboard.home'))
@@ -0,0 +1,67 @@
+"""Streaming transaction export.
+
+Rows are selected as plain column tuples (no Transaction objects) with
+``yield_per`` so the driver uses a server-side cursor where it can, and
+serialized into ~64 KB chunks for a generator response. Memory stays flat
+regardless of how many transactions the user has.
+"""
+import csv
+import io
+import json
+from app.extensions import db
+from app.models import Transaction
+from app.daterange import day_range
+
+EXPORT_COLUMNS = ('id', 'date', 'amount', 'category', 'subcategory', 'description', 'is_food', 'meal_type')
+FETCH_SIZE = 1000
+CHUNK_BYTES = 64 * 1024
+
+
+def export_rows(user_id, start=None, end=None, category=None):
+    """Yield (id, date, amount, ...) tuples oldest first, fetched in batches."""
+    stmt = db.select(
+        Transaction.id, Transaction.date, Transaction.amount, Transaction.category,
+        Transaction.subcategory, Transaction.description, Transaction.is_food, Transaction.meal_type
+    ).where(Transaction.user_id == user_id)
+    if start:
+        stmt = stmt.where(Transaction.date >= day_range(start)[0])
+    if end:
+        stmt = stmt.where(Transaction.date < day_range(end)[1])
+    if category:
+        stmt = stmt.where(Transaction.category == category)
+    stmt = stmt.order_by(Transaction.date, Transaction.id).execution_options(yield_per=FETCH_SIZE)
+    for row in db.session.execute(stmt):
+        yield tuple(row)
+
+
+def csv_chunks(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        txn_id, txn_date, amount, category, subcategory, description, is_food, meal_type = row
+        writer.writerow((txn_id, txn_date.isoformat() if txn_date else '', amount, category,
+                         subcategory or '', description or '', int(bool(is_food)), meal_type or ''))
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def ndjson_chunks(rows):
+    lines = []
+    size = 0
+    for row in rows:
+        record = dict(zip(EXPORT_COLUMNS, row))
+        record['date'] = record['date'].isoformat() if record['date'] else None
+        record['is_food'] = bool(record['is_food'])
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        lines.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield ''.join(lines)
+            lines, size = [], 0
+    if lines:
+        yield ''.join(lines)
+
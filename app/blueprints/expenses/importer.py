@@ -0,0 +1,172 @@
+"""Streaming CSV import of expenses.
+
+Rows are read one at a time from the uploaded file, validated against
+the user's categories (``Config.CATEGORIES`` plus their budget
+envelopes), ``FOOD_SUBCATEGORIES`` and ``MEAL_TYPES``, and written in
+batches: each batch is one executemany INSERT plus one batched
+daily_spend/envelope update, committed as its own transaction. Memory
+stays bounded by the batch size however long the file is. Overspend
+checks run once after the last batch. A line the csv module can't parse
+(e.g. a runaway quoted field) ends the import: the rows before it are
+kept and the line is reported.
+"""
+import csv
+from datetime import datetime
+from flask import current_app
+from app.extensions import db
+from app.models import Transaction
+from app.ledger import apply_daily_deltas
+from app.spending import invalidate_spending
+from app.versioning import bump_data_version
+from app.envelopes import user_categories
+
+COLUMNS = ('date', 'amount', 'category', 'subcategory', 'description', 'meal_type')
+DATE_FORMATS = ('%d/%m/%Y', '%d-%m-%Y', '%d/%m/%Y %H:%M', '%d-%m-%Y %H:%M')
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 200
+
+
+class ImportResult:
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors = []  # (line number, message), capped at MAX_REPORTED_ERRORS
+
+    def add_error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+def _choices(key):
+    return {value.lower(): value for value in current_app.config.get(key, [])}
+
+
+def _parse_date(value):
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f'unrecognised date "{value}"')
+
+
+def _parse_amount(value):
+    cleaned = value.strip().replace(',', '').lstrip('₹$').strip()
+    try:
+        amount = float(cleaned)
+    except ValueError:
+        raise ValueError(f'invalid amount "{value}"')
+    if amount <= 0:
+        raise ValueError('amount must be greater than zero')
+    return amount
+
+
+def parse_row(row, user_id, categories, food_subcategories, meal_types):
+    """Validate one CSV record and return the column values for an insert."""
+    def field(name):
+        return (row.get(name) or '').strip()
+
+    if not field('date'):
+        raise ValueError('missing date')
+    if not field('amount'):
+        raise ValueError('missing amount')
+
+    category = categories.get(field('category').lower() or 'misc')
+    if category is None:
+        raise ValueError(f'unknown category "{field("category")}"')
+    is_food = category == 'Food'
+
+    subcategory = field('subcategory') or None
+    if subcategory and is_food:
+        subcategory = food_subcategories.get(subcategory.lower())
+        if subcategory is None:
+            raise ValueError(f'unknown food subcategory "{field("subcategory")}"')
+
+    meal_type = None
+    if field('meal_type'):
+        meal_type = meal_types.get(field('meal_type').lower())
+        if meal_type is None:
+            raise ValueError(f'unknown meal type "{field("meal_type")}"')
+
+    return {
+        'user_id': user_id,
+        'date': _parse_date(field('date')),
+        'amount': _parse_amount(field('amount')),
+        'category': category,
+        'subcategory': subcategory,
+        'description': field('description')[:200],
+        'is_food': is_food,
+        'meal_type': meal_type if is_food else None,
+    }
+
+
+def _records(reader, result):
+    """The reader's rows up to the end, or to the first line it can't parse."""
+    try:
+        yield from reader
+    except csv.Error as e:
+        result.add_error(reader.line_num, f'unreadable CSV: {e}')
+
+
+def import_transactions(user, text_stream, batch_size=BATCH_SIZE):
+    """Import a CSV text stream for ``user``; returns an ImportResult."""
+    result = ImportResult()
+    reader = csv.DictReader(text_stream)
+    try:
+        fieldnames = reader.fieldnames
+    except csv.Error as e:
+        result.add_error(1, f'unreadable CSV: {e}')
+        return result
+    if fieldnames is None:
+        result.add_error(1, 'file is empty')
+        return result
+    reader.fieldnames = [(name or '').strip().lower() for name in reader.fieldnames]
+    missing = {'date', 'amount'} - set(reader.fieldnames)
+    if missing:
+        result.add_error(1, f'missing column(s): {", ".join(sorted(missing))}')
+        return result
+
+    user_id = user.id
+    categories = {value.lower(): value for value in user_categories(user_id)}
+    food_subcategories = _choices('FOOD_SUBCATEGORIES')
+    meal_types = _choices('MEAL_TYPES')
+
+    batch = []
+    for row in _records(reader, result):
+        try:
+            batch.append(parse_row(row, user_id, categories, food_subcategories, meal_types))
+        except ValueError as e:
+            result.add_error(reader.line_num, str(e))
+            continue
+        if len(batch) >= batch_size:
+            result.imported += _write_batch(user_id, batch)
+            batch = []
+    if batch:
+        result.imported += _write_batch(user_id, batch)
+
+    if result.imported:
+        invalidate_spending()
+        bump_data_version(user_id)
+        db.session.commit()
+    return result
+
+
+def _write_batch(user_id, rows):
+    """Insert one batch and its rollup deltas in a single transaction."""
+    db.session.execute(Transaction.__table__.insert(), rows)
+
+    deltas = {}
+    for row in rows:
+        key = (row['date'].date(), row['category'])
+        amount, count = deltas.get(key, (0.0, 0))
+        deltas[key] = (amount + row['amount'], count + 1)
+    apply_daily_deltas(user_id, deltas)
+
+    db.session.commit()
+    return len(rows)
@@ -0,0 +1,81 @@
+"""Keyset (cursor) pagination over transactions, newest first.
+
+Pages are keyed on ``(date, id)`` instead of OFFSET, so page 500 costs
+the same index range scan as page 1, and there is no COUNT(*). Cursors
+are opaque URL-safe tokens; totals are approximate and come from the
+daily_spend rollup.
+"""
+import base64
+import json
+from datetime import datetime
+from app.extensions import db
+from app.models import Transaction
+
+PER_PAGE = 15
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor=None, prev_cursor=None, approx_total=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.approx_total = approx_total
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+
+def encode_cursor(direction, txn):
+    payload = json.dumps([direction, txn.date.isoformat(), txn.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (direction, date, id), or None for a missing or malformed cursor."""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, when, txn_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if direction not in ('after', 'before'):
+            return None
+        return direction, datetime.fromisoformat(when), int(txn_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def keyset_page(query, cursor=None, per_page=PER_PAGE):
+    """Fetch one page of ``query`` (a Transaction query) relative to ``cursor``."""
+    newest_first = (Transaction.date.desc(), Transaction.id.desc())
+    position = decode_cursor(cursor)
+    if position is None:
+        rows = query.order_by(*newest_first).limit(per_page + 1).all()
+        items = rows[:per_page]
+        has_next, has_prev = len(rows) > per_page, False
+    elif position[0] == 'after':
+        _, when, txn_id = position
+        rows = query.filter(db.or_(
+            Transaction.date < when,
+            db.and_(Transaction.date == when, Transaction.id < txn_id)
+        )).order_by(*newest_first).limit(per_page + 1).all()
+        items = rows[:per_page]
+        has_next, has_prev = len(rows) > per_page, True
+    else:
+        _, when, txn_id = position
+        rows = query.filter(db.or_(
+            Transaction.date > when,
+            db.and_(Transaction.date == when, Transaction.id > txn_id)
+        )).order_by(Transaction.date.asc(), Transaction.id.asc()).limit(per_page + 1).all()
+        items = list(reversed(rows[:per_page]))
+        has_next, has_prev = True, len(rows) > per_page
+
+    return KeysetPage(
+        items,
+        next_cursor=encode_cursor('after', items[-1]) if items and has_next else None,
+        prev_cursor=encode_cursor('before', items[0]) if items and has_prev else None,
+    )
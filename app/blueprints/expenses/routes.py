@@ -1,46 +1,73 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, Response, stream_with_context
 from flask_login import login_required, current_user
 from app.extensions import db
-from app.models import Transaction, Alert
+from app.models import Transaction
+from app.ledger import add_transaction, delete_transaction, approx_transaction_count
+from app.envelopes import get_envelope, user_categories
+from app.blueprints.expenses.pagination import keyset_page, PER_PAGE
+from app.daterange import within, day_range
 from datetime import datetime, date
+import io
 
 expenses_bp = Blueprint('expenses', __name__, template_folder='templates')
 
 
-@expenses_bp.route('/')
-@login_required
-def index():
-    page = request.args.get('page', 1, type=int)
-    category_filter = request.args.get('category', 'all')
-    date_filter = request.args.get('date', '')
-
+def _filtered_query(category_filter, date_filter):
+    """Transactions for the current user matching the list filters."""
     query = Transaction.query.filter_by(user_id=current_user.id)
-
     if category_filter != 'all':
         query = query.filter_by(category=category_filter)
     if date_filter:
-        query = query.filter(db.func.date(Transaction.date) == date_filter)
+        query = query.filter(within(Transaction.date, day_range(date_filter)))
+    return query
+
 
-    transactions = query.order_by(Transaction.date.desc()).paginate(page=page, per_page=15, error_out=False)
+def _list_filters():
+    category_filter = request.args.get('category', 'all')
+    try:
+        date_filter = date.fromisoformat(request.args.get('date', ''))
+    except ValueError:
+        date_filter = None
+    return category_filter, date_filter
 
-    # Category totals for current month
-    today = date.today()
-    category_totals = db.session.query(
-        Transaction.category, db.func.sum(Transaction.amount)
-    ).filter(
-        Transaction.user_id == current_user.id,
-        db.extract('month', Transaction.date) == today.month,
-        db.extract('year', Transaction.date) == today.year
-    ).group_by(Transaction.category).all()
+
+@expenses_bp.route('/')
+@login_required
+def index():
+    category_filter, date_filter = _list_filters()
+    transactions = keyset_page(_filtered_query(category_filter, date_filter), request.args.get('cursor'))
+    transactions.approx_total = approx_transaction_count(
+        current_user.id, None if category_filter == 'all' else category_filter, date_filter
+    )
 
     return render_template('expenses/index.html',
         transactions=transactions,
-        category_totals=dict(category_totals),
+        category_totals=current_user.spending().category_totals,
         current_filter=category_filter,
-        date_filter=date_filter
+        date_filter=date_filter.isoformat() if date_filter else '',
+        categories=user_categories(current_user.id),
     )
 
 
+@expenses_bp.route('/api/list')
+@login_required
+def list_api():
+    """JSON page of expenses for infinite scroll; pass back next_cursor to continue."""
+    category_filter, date_filter = _list_filters()
+    limit = min(max(request.args.get('limit', PER_PAGE, type=int), 1), 100)
+    page = keyset_page(_filtered_query(category_filter, date_filter), request.args.get('cursor'), per_page=limit)
+    payload = {
+        'items': [txn.to_dict() for txn in page.items],
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+    }
+    if request.args.get('total') == '1':
+        payload['approx_total'] = approx_transaction_count(
+            current_user.id, None if category_filter == 'all' else category_filter, date_filter
+        )
+    return jsonify(payload)
+
+
 @expenses_bp.route('/add', methods=['GET', 'POST'])
 @login_required
 def add():
@@ -67,33 +94,88 @@ def add():
             meal_type=meal_type,
             date=datetime.strptime(txn_date, '%Y-%m-%d') if txn_date else datetime.now()
         )
-        db.session.add(txn)
-
-        # Check for overspending and create alert
-        daily_limit = current_user.get_daily_limit()
-        today_spent = current_user.get_today_spent() + amount
-        if today_spent > daily_limit and daily_limit > 0:
-            alert = Alert(
-                user_id=current_user.id,
-                alert_type='overspend',
-                title='⚠️ Daily Limit Exceeded!',
-                message=f'You\'ve spent ₹{today_spent:.0f} today, exceeding your ₹{daily_limit:.0f} limit.',
-                icon='⚠️'
-            )
-            db.session.add(alert)
+        add_transaction(txn)
+        envelope = get_envelope(current_user.id, category, txn.date)
 
         db.session.commit()
         flash(f'₹{amount:.0f} added to {category}! ✅', 'success')
+        if envelope is not None and envelope.is_over:
+            flash(f'{category} is ₹{-envelope.remaining:.0f} over its ₹{envelope.allocated:.0f} envelope ⚠️', 'warning')
         return redirect(url_for('expenses.index'))
 
-    return render_template('expenses/add.html', today=date.today().isoformat())
+    return render_template('expenses/add.html', today=date.today().isoformat(),
+                           categories=user_categories(current_user.id))
+
+
+@expenses_bp.route('/import', methods=['GET', 'POST'])
+@login_required
+def import_csv():
+    """Bulk import expenses from a CSV export."""
+    from app.blueprints.expenses.importer import import_transactions, COLUMNS
+    result = None
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Choose a CSV file to import!', 'error')
+            return redirect(url_for('expenses.import_csv'))
+        try:
+            result = import_transactions(current_user, io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline=''))
+        except UnicodeDecodeError:
+            flash('That file isn\'t UTF-8 text. Export it as CSV and try again.', 'error')
+            return redirect(url_for('expenses.import_csv'))
+        if result.imported:
+            flash(f'Imported {result.imported} expenses! ✅', 'success')
+        if result.failed:
+            flash(f'{result.failed} rows were skipped — see details below.', 'error')
+    return render_template('expenses/import.html', result=result, columns=COLUMNS)
+
+
+def _export_filters():
+    def parse(name):
+        value = request.args.get(name, '')
+        try:
+            return date.fromisoformat(value) if value else None
+        except ValueError:
+            return None
+    category = request.args.get('category', 'all')
+    return {
+        'start': parse('start'),
+        'end': parse('end'),
+        'category': None if category == 'all' else category,
+    }
+
+
+@expenses_bp.route('/export.csv')
+@login_required
+def export_csv():
+    """Stream all (or filtered) transactions as CSV."""
+    from app.blueprints.expenses.export import export_rows, csv_chunks
+    rows = export_rows(current_user.id, **_export_filters())
+    return Response(
+        stream_with_context(csv_chunks(rows)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': 'attachment; filename=budget-bite-expenses.csv'}
+    )
+
+
+@expenses_bp.route('/export.ndjson')
+@login_required
+def export_ndjson():
+    """Stream all (or filtered) transactions as newline-delimited JSON."""
+    from app.blueprints.expenses.export import export_rows, ndjson_chunks
+    rows = export_rows(current_user.id, **_export_filters())
+    return Response(
+        stream_with_context(ndjson_chunks(rows)),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename=budget-bite-expenses.ndjson'}
+    )
 
 
 @expenses_bp.route('/delete/<int:txn_id>', methods=['POST'])
 @login_required
 def delete(txn_id):
     txn = Transaction.query.filter_by(id=txn_id, user_id=current_user.id).first_or_404()
-    db.session.delete(txn)
+    delete_transaction(txn)
     db.session.commit()
     flash('Transaction deleted! 🗑️', 'info')
     return redirect(url_for('expenses.index'))
@@ -119,7 +201,7 @@ def quick_add():
         is_food=(category == 'Food'),
         date=datetime.now()
     )
-    db.session.add(txn)
+    add_transaction(txn)
     db.session.commit()
 
     return jsonify({
@@ -2,6 +2,8 @@ from flask import Blueprint, render_template, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app.extensions import db
 from app.models import Badge, SavingsGoal, Transaction
+from app.cache import cached_view, plain_rows
+from app.streaks import streak_summary
 from datetime import date, timedelta
 
 gamification_bp = Blueprint('gamification', __name__, template_folder='templates')
@@ -20,10 +22,9 @@ AVAILABLE_BADGES = [
 ]
 
 
-@gamification_bp.route('/')
-@login_required
-def index():
-    earned_badges = Badge.query.filter_by(user_id=current_user.id).all()
+def build_progress(user):
+    """Badges, goals, streak and savings for the page, as cacheable plain values."""
+    earned_badges = Badge.query.filter_by(user_id=user.id).all()
     earned_types = {b.badge_type for b in earned_badges}
 
     all_badges = []
@@ -35,25 +36,33 @@ def index():
         })
 
     # Savings goals
-    goals = SavingsGoal.query.filter_by(user_id=current_user.id).order_by(SavingsGoal.created_at.desc()).all()
+    goals = SavingsGoal.query.filter_by(user_id=user.id).order_by(SavingsGoal.created_at.desc()).all()
 
-    # Streak
-    streak = current_user.get_streak()
+    # Streak (persisted by the streaks.refresh job and close-day, not here)
+    streak, longest_streak = streak_summary(user)
 
     # Total savings this month
-    month_spent = current_user.get_month_spent()
+    month_spent = user.get_month_spent()
     today = date.today()
-    expected_by_now = (current_user.monthly_budget / 30) * today.day
+    expected_by_now = (user.monthly_budget / 30) * today.day
     savings_this_month = max(0, expected_by_now - month_spent)
 
-    return render_template('gamification/index.html',
-        all_badges=all_badges,
-        earned_count=len(earned_badges),
-        total_badges=len(AVAILABLE_BADGES),
-        goals=goals,
-        streak=streak,
-        savings_this_month=savings_this_month,
-    )
+    return {
+        'all_badges': all_badges,
+        'earned_count': len(earned_badges),
+        'total_badges': len(AVAILABLE_BADGES),
+        'goals': plain_rows(goals, 'progress'),
+        'streak': streak,
+        'longest_streak': longest_streak,
+        'savings_this_month': savings_this_month,
+    }
+
+
+@gamification_bp.route('/')
+@login_required
+def index():
+    progress = cached_view(current_user, 'gamification', lambda: build_progress(current_user))
+    return render_template('gamification/index.html', **progress)
 
 
 @gamification_bp.route('/goal/add', methods=['POST'])
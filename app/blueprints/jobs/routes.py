@@ -0,0 +1,15 @@
+from flask import Blueprint, jsonify
+from flask_login import login_required, current_user
+from app.models import Job
+
+jobs_bp = Blueprint('jobs', __name__)
+
+
+@jobs_bp.route('/<int:job_id>')
+@login_required
+def status(job_id):
+    """State of one of the user's background jobs, for the UI to poll."""
+    job = Job.query.filter_by(id=job_id, user_id=current_user.id).first_or_404()
+    response = jsonify(job.to_dict())
+    response.headers['Cache-Control'] = 'no-store'
+    return response
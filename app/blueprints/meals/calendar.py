@@ -0,0 +1,89 @@
+"""Meal plans over a date range, with day and week nutrition rollups.
+
+A range costs two queries whatever its length: the meal rows ordered by
+(date, meal_type) and one GROUP BY date for cost, calories, protein and
+planned vs completed cost. Week totals (Monday-based, clipped to the
+range) are folded from the daily rollups, so they're at most seven rows each.
+"""
+from datetime import timedelta
+from app.extensions import db
+from app.models import MealPlan
+
+MAX_RANGE_DAYS = 92
+
+
+def _empty_rollup():
+    return {'cost': 0.0, 'calories': 0, 'protein': 0.0, 'planned_cost': 0.0,
+            'completed_cost': 0.0, 'meal_count': 0}
+
+
+def _add_rollup(total, part):
+    for key, value in part.items():
+        total[key] += value
+
+
+def daily_rollups(user_id, start, end):
+    """{date: rollup} for days in [start, end] that have meals."""
+    completed = db.case((MealPlan.is_completed == True, MealPlan.cost), else_=0)  # noqa: E712
+    rows = db.session.query(
+        MealPlan.date,
+        db.func.sum(MealPlan.cost), db.func.sum(MealPlan.calories), db.func.sum(MealPlan.protein),
+        db.func.sum(completed), db.func.count(MealPlan.id)
+    ).filter(
+        MealPlan.user_id == user_id, MealPlan.date >= start, MealPlan.date <= end
+    ).group_by(MealPlan.date).all()
+    rollups = {}
+    for day, cost, calories, protein, completed_cost, count in rows:
+        cost = float(cost or 0)
+        completed_cost = float(completed_cost or 0)
+        rollups[day] = {
+            'cost': cost, 'calories': int(calories or 0), 'protein': float(protein or 0),
+            'planned_cost': cost - completed_cost, 'completed_cost': completed_cost,
+            'meal_count': count,
+        }
+    return rollups
+
+
+class MealCalendar:
+    """Meals and rollups for every day in [start, end]."""
+
+    def __init__(self, user_id, start, end):
+        self.start = start
+        self.end = end
+        meals = MealPlan.query.filter(
+            MealPlan.user_id == user_id, MealPlan.date >= start, MealPlan.date <= end
+        ).order_by(MealPlan.date, MealPlan.meal_type).all()
+        by_day = {}
+        for meal in meals:
+            by_day.setdefault(meal.date, []).append(meal)
+        rollups = daily_rollups(user_id, start, end)
+
+        self.days = []
+        self.weeks = []
+        self.totals = _empty_rollup()
+        day = start
+        while day <= end:
+            rollup = rollups.get(day) or _empty_rollup()
+            self.days.append({'date': day, 'meals': by_day.get(day, []), **rollup})
+            if not self.weeks or day.weekday() == 0:
+                self.weeks.append({'start': day, 'end': day, **_empty_rollup()})
+            week = self.weeks[-1]
+            week['end'] = day
+            _add_rollup(week, rollup)
+            _add_rollup(self.totals, rollup)
+            day += timedelta(days=1)
+
+    def to_dict(self):
+        return {
+            'start': self.start.isoformat(),
+            'end': self.end.isoformat(),
+            'days': [
+                {**day, 'date': day['date'].isoformat(), 'meals': [m.to_dict() for m in day['meals']]}
+                for day in self.days
+            ],
+            'weeks': [
+                {**week, 'start': week['start'].isoformat(), 'end': week['end'].isoformat()}
+                for week in self.weeks
+            ],
+            'totals': self.totals,
+        }
@@ -0,0 +1,112 @@
+"""Built-in meal suggestions, used to seed the meal_items table."""
+
+MEAL_DATABASE = {
+    'Vegetarian': {
+        'Breakfast': [
+            {'name': 'Poha + Chai', 'cost': 30, 'calories': 280, 'protein': 8, 'score': 7.5, 'source': 'Mess'},
+            {'name': 'Idli Sambar', 'cost': 35, 'calories': 300, 'protein': 10, 'score': 8.0, 'source': 'Mess'},
+            {'name': 'Upma + Coffee', 'cost': 25, 'calories': 250, 'protein': 6, 'score': 7.0, 'source': 'Mess'},
+            {'name': 'Bread Butter + Milk', 'cost': 20, 'calories': 320, 'protein': 9, 'score': 6.5, 'source': 'Self'},
+            {'name': 'Paratha + Curd', 'cost': 40, 'calories': 380, 'protein': 11, 'score': 7.5, 'source': 'Canteen'},
+            {'name': 'Oats + Banana', 'cost': 15, 'calories': 230, 'protein': 7, 'score': 8.5, 'source': 'Self'},
+        ],
+        'Lunch': [
+            {'name': 'Dal Rice + Sabzi + Roti', 'cost': 60, 'calories': 550, 'protein': 18, 'score': 8.0, 'source': 'Mess'},
+            {'name': 'Rajma Chawal', 'cost': 50, 'calories': 520, 'protein': 20, 'score': 8.5, 'source': 'Mess'},
+            {'name': 'Chole Bhature', 'cost': 55, 'calories': 600, 'protein': 16, 'score': 6.5, 'source': 'Canteen'},
+            {'name': 'Thali (Full)', 'cost': 70, 'calories': 650, 'protein': 22, 'score': 8.0, 'source': 'Mess'},
+            {'name': 'Veg Biryani', 'cost': 65, 'calories': 480, 'protein': 12, 'score': 7.0, 'source': 'Canteen'},
+        ],
+        'Dinner': [
+            {'name': 'Roti + Paneer + Dal', 'cost': 70, 'calories': 480, 'protein': 20, 'score': 8.5, 'source': 'Mess'},
+            {'name': 'Dal Khichdi', 'cost': 40, 'calories': 400, 'protein': 14, 'score': 8.0, 'source': 'Mess'},
+            {'name': 'Roti + Mix Veg', 'cost': 55, 'calories': 420, 'protein': 12, 'score': 7.5, 'source': 'Mess'},
+            {'name': 'Pav Bhaji', 'cost': 50, 'calories': 450, 'protein': 10, 'score': 7.0, 'source': 'Canteen'},
+        ],
+        'Snack': [
+            {'name': 'Banana + Biscuits', 'cost': 25, 'calories': 180, 'protein': 3, 'score': 6.0, 'source': 'Self'},
+            {'name': 'Samosa + Chai', 'cost': 20, 'calories': 250, 'protein': 4, 'score': 5.0, 'source': 'Canteen'},
+            {'name': 'Fruit Chaat', 'cost': 30, 'calories': 120, 'protein': 2, 'score': 8.5, 'source': 'Self'},
+            {'name': 'Peanut Chikki', 'cost': 15, 'calories': 200, 'protein': 7, 'score': 7.0, 'source': 'Self'},
+            {'name': 'Sprout Salad', 'cost': 20, 'calories': 150, 'protein': 9, 'score': 9.0, 'source': 'Self'},
+        ]
+    },
+    'Non-Vegetarian': {
+        'Breakfast': [
+            {'name': 'Egg Bhurji + Toast', 'cost': 35, 'calories': 350, 'protein': 18, 'score': 8.0, 'source': 'Mess'},
+            {'name': 'Omelette + Bread', 'cost': 30, 'calories': 320, 'protein': 16, 'score': 7.5, 'source': 'Mess'},
+            {'name': 'Boiled Eggs + Chai', 'cost': 25, 'calories': 250, 'protein': 14, 'score': 8.5, 'source': 'Self'},
+        ],
+        'Lunch': [
+            {'name': 'Chicken Curry + Rice', 'cost': 80, 'calories': 600, 'protein': 30, 'score': 8.0, 'source': 'Mess'},
+            {'name': 'Egg Fried Rice', 'cost': 60, 'calories': 500, 'protein': 18, 'score': 7.0, 'source': 'Canteen'},
+            {'name': 'Fish Curry + Rice', 'cost': 90, 'calories': 550, 'protein': 28, 'score': 8.5, 'source': 'Mess'},
+        ],
+        'Dinner': [
+            {'name': 'Chicken Biryani', 'cost': 100, 'calories': 650, 'protein': 32, 'score': 7.5, 'source': 'Canteen'},
+            {'name': 'Egg Curry + Roti', 'cost': 55, 'calories': 420, 'protein': 18, 'score': 8.0, 'source': 'Mess'},
+            {'name': 'Chicken + Dal + Roti', 'cost': 85, 'calories': 550, 'protein': 28, 'score': 8.5, 'source': 'Mess'},
+        ],
+        'Snack': [
+            {'name': 'Egg Roll', 'cost': 40, 'calories': 300, 'protein': 14, 'score': 6.5, 'source': 'Canteen'},
+            {'name': 'Chicken Sandwich', 'cost': 50, 'calories': 350, 'protein': 18, 'score': 7.0, 'source': 'Canteen'},
+        ]
+    },
+    'Vegan': {
+        'Breakfast': [
+            {'name': 'Poha + Black Coffee', 'cost': 25, 'calories': 260, 'protein': 6, 'score': 7.5, 'source': 'Mess'},
+            {'name': 'Vegetable Upma', 'cost': 25, 'calories': 250, 'protein': 6, 'score': 7.0, 'source': 'Mess'},
+            {'name': 'Oats + Banana (Water)', 'cost': 15, 'calories': 210, 'protein': 6, 'score': 8.0, 'source': 'Self'},
+            {'name': 'Besan Chilla', 'cost': 30, 'calories': 300, 'protein': 13, 'score': 8.5, 'source': 'Canteen'},
+        ],
+        'Lunch': [
+            {'name': 'Rajma Chawal', 'cost': 50, 'calories': 520, 'protein': 20, 'score': 8.5, 'source': 'Mess'},
+            {'name': 'Dal Rice + Sabzi', 'cost': 55, 'calories': 520, 'protein': 17, 'score': 8.0, 'source': 'Mess'},
+            {'name': 'Chana Masala + Roti', 'cost': 50, 'calories': 500, 'protein': 18, 'score': 8.0, 'source': 'Canteen'},
+        ],
+        'Dinner': [
+            {'name': 'Dal Khichdi', 'cost': 40, 'calories': 400, 'protein': 14, 'score': 8.0, 'source': 'Mess'},
+            {'name': 'Roti + Mix Veg', 'cost': 55, 'calories': 420, 'protein': 12, 'score': 7.5, 'source': 'Mess'},
+            {'name': 'Tofu Bhurji + Roti', 'cost': 65, 'calories': 450, 'protein': 22, 'score': 8.5, 'source': 'Canteen'},
+        ],
+        'Snack': [
+            {'name': 'Fruit Chaat', 'cost': 30, 'calories': 120, 'protein': 2, 'score': 8.5, 'source': 'Self'},
+            {'name': 'Peanut Chikki', 'cost': 15, 'calories': 200, 'protein': 7, 'score': 7.0, 'source': 'Self'},
+            {'name': 'Sprout Salad', 'cost': 20, 'calories': 150, 'protein': 9, 'score': 9.0, 'source': 'Self'},
+            {'name': 'Roasted Chana', 'cost': 10, 'calories': 160, 'protein': 8, 'score': 8.0, 'source': 'Self'},
+        ]
+    },
+    'Eggetarian': {
+        'Breakfast': [
+            {'name': 'Boiled Eggs + Chai', 'cost': 25, 'calories': 250, 'protein': 14, 'score': 8.5, 'source': 'Self'},
+            {'name': 'Omelette + Bread', 'cost': 30, 'calories': 320, 'protein': 16, 'score': 7.5, 'source': 'Mess'},
+            {'name': 'Idli Sambar', 'cost': 35, 'calories': 300, 'protein': 10, 'score': 8.0, 'source': 'Mess'},
+            {'name': 'Oats + Banana', 'cost': 15, 'calories': 230, 'protein': 7, 'score': 8.5, 'source': 'Self'},
+        ],
+        'Lunch': [
+            {'name': 'Dal Rice + Sabzi + Roti', 'cost': 60, 'calories': 550, 'protein': 18, 'score': 8.0, 'source': 'Mess'},
+            {'name': 'Egg Fried Rice', 'cost': 60, 'calories': 500, 'protein': 18, 'score': 7.0, 'source': 'Canteen'},
+            {'name': 'Rajma Chawal', 'cost': 50, 'calories': 520, 'protein': 20, 'score': 8.5, 'source': 'Mess'},
+        ],
+        'Dinner': [
+            {'name': 'Egg Curry + Roti', 'cost': 55, 'calories': 420, 'protein': 18, 'score': 8.0, 'source': 'Mess'},
+            {'name': 'Dal Khichdi', 'cost': 40, 'calories': 400, 'protein': 14, 'score': 8.0, 'source': 'Mess'},
+            {'name': 'Roti + Paneer + Dal', 'cost': 70, 'calories': 480, 'protein': 20, 'score': 8.5, 'source': 'Mess'},
+        ],
+        'Snack': [
+            {'name': 'Egg Roll', 'cost': 40, 'calories': 300, 'protein': 14, 'score': 6.5, 'source': 'Canteen'},
+            {'name': 'Sprout Salad', 'cost': 20, 'calories': 150, 'protein': 9, 'score': 9.0, 'source': 'Self'},
+            {'name': 'Samosa + Chai', 'cost': 20, 'calories': 250, 'protein': 4, 'score': 5.0, 'source': 'Canteen'},
+        ]
+    }
+}
+
+
+def catalog_rows():
+    """Flatten MEAL_DATABASE into meal_items rows."""
+    return [
+        dict(item, preference=preference, meal_type=meal_type)
+        for preference, meals in MEAL_DATABASE.items()
+        for meal_type, items in meals.items()
+        for item in items
+    ]
@@ -0,0 +1,108 @@
+"""In-process cache of the meal_items catalog.
+
+The whole catalog is loaded with one ordered query and kept per process
+together with what the meal pages need from it: options per meal type
+sorted by cost (with a parallel cost array for ``bisect``) and average
+cost per source. The cache is keyed by a catalog version (row count,
+highest id, latest ``updated_at``). The version is re-checked at most every
+``MEAL_CATALOG_TTL`` seconds, or straight away after this process writes
+meal items.
+
+When the table is empty (not migrated/seeded yet) the built-in
+``MEAL_DATABASE`` is served instead.
+"""
+import time
+from bisect import bisect_right
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models import MealItem
+
+DEFAULT_PREFERENCE = 'Vegetarian'
+DEFAULT_TTL = 30
+
+_state = {'version': None, 'checked_at': float('-inf'), 'menus': {}}
+
+
+class Menu:
+    """Catalog slice for one food preference."""
+
+    def __init__(self, preference, options):
+        self.preference = preference
+        self.options = {
+            meal_type: sorted(items, key=lambda o: (o['cost'], o['name']))
+            for meal_type, items in options.items()
+        }
+        self._costs = {meal_type: [o['cost'] for o in items] for meal_type, items in self.options.items()}
+
+        totals = {}
+        for items in self.options.values():
+            for o in items:
+                total, count = totals.get(o['source'], (0.0, 0))
+                totals[o['source']] = (total + o['cost'], count + 1)
+        self.source_avg = {source: total / count for source, (total, count) in totals.items()}
+
+    def affordable(self, meal_type, max_cost):
+        """Options for ``meal_type`` costing at most ``max_cost``, cheapest first."""
+        costs = self._costs.get(meal_type, [])
+        return self.options.get(meal_type, [])[:bisect_right(costs, max_cost)]
+
+    def average_cost(self, source):
+        return self.source_avg.get(source, 0)
+
+    def best_protein_value(self, max_cost, limit=2):
+        """The ``limit`` options with the most protein per rupee under ``max_cost``."""
+        candidates = [o for meal_type in self.options for o in self.affordable(meal_type, max_cost)]
+        candidates.sort(key=lambda o: (-o['protein'] / max(o['cost'], 1), o['cost'], o['name']))
+        return candidates[:limit]
+
+
+def _catalog_version():
+    return tuple(db.session.query(
+        db.func.count(MealItem.id), db.func.max(MealItem.id), db.func.max(MealItem.updated_at)
+    ).one())
+
+
+def _load_menus():
+    rows = db.session.query(
+        MealItem.preference, MealItem.meal_type, MealItem.name, MealItem.cost,
+        MealItem.calories, MealItem.protein, MealItem.score, MealItem.source
+    ).order_by(MealItem.preference, MealItem.meal_type, MealItem.cost, MealItem.name).all()
+
+    if rows:
+        grouped = {}
+        for preference, meal_type, name, cost, calories, protein, score, source in rows:
+            grouped.setdefault(preference, {}).setdefault(meal_type, []).append({
+                'name': name, 'cost': cost, 'calories': calories or 0, 'protein': protein or 0,
+                'score': score or 0, 'source': source,
+            })
+    else:
+        from app.blueprints.meals.catalog import MEAL_DATABASE
+        grouped = MEAL_DATABASE
+    return {preference: Menu(preference, options) for preference, options in grouped.items()}
+
+
+def get_menu(preference):
+    """Cached Menu for a food preference, falling back to Vegetarian."""
+    now = time.monotonic()
+    ttl = current_app.config.get('MEAL_CATALOG_TTL', DEFAULT_TTL)
+    if now - _state['checked_at'] >= ttl:
+        version = _catalog_version()
+        if version != _state['version']:
+            _state['menus'] = _load_menus()
+            _state['version'] = version
+        _state['checked_at'] = now
+    menus = _state['menus']
+    return menus.get(preference) or menus.get(DEFAULT_PREFERENCE) or next(iter(menus.values()))
+
+
+def invalidate_menu():
+    """Re-check the catalog version on the next read."""
+    _state['checked_at'] = float('-inf')
+
+
+@event.listens_for(Session, 'after_flush')
+def _invalidate_on_meal_item_flush(session, flush_context):
+    if any(isinstance(obj, MealItem) for obj in (*session.new, *session.dirty, *session.deleted)):
+        invalidate_menu()
@@ -0,0 +1,253 @@
+"""Budget-constrained weekly meal planning.
+
+The week is a multiple-choice knapsack: every (day, meal type) slot takes
+exactly one option, total cost must fit the food budget, and total
+nutrition score is maximised. The "no same dish on consecutive days"
+rule only links a meal type to itself on the next day, so the problem
+splits into one chain per meal type:
+
+1. For each meal type, a DP over days with state (last dish, cost) gives
+   the best chain score for every reachable total cost. Keeping the best
+   and second-best predecessor per cost makes each day O(options x cost).
+2. The per-type tables are merged with a max-plus knapsack over the
+   budget.
+
+Costs are rounded up to a step of ``COST_STEP`` rupees, widened so the
+budget spans at most ``MAX_BUDGET_UNITS`` steps, which bounds every
+table whatever the prices or the budget. Tables keep only their Pareto
+frontier (a cost is dropped if a cheaper one scores as well) and nothing
+over budget. An option that three others beat on both cost and score
+can never be needed, so large catalogs shrink to a few dozen options per
+meal type before the DP runs.
+
+Optional protein/calorie floors are daily averages over the plan. They
+are met by re-running with a growing bonus on protein/calories
+(Lagrangian relaxation). Results are deterministic: options are ordered
+by (cost, name) and ties keep the first plan found.
+"""
+import math
+from functools import reduce
+from operator import itemgetter
+
+MEAL_ORDER = ['Breakfast', 'Lunch', 'Snack', 'Dinner']
+FLOOR_WEIGHTS = (0.0, 0.05, 0.1, 0.2, 0.4, 0.8, 1.6)
+COST_STEP = 5
+MAX_BUDGET_UNITS = 240
+# An option needs this many cheaper-and-better alternatives before it can be
+# dropped: one for each neighbouring day, plus one to swap in
+DOMINATORS = 3
+NEG = float('-inf')
+
+
+class MealPlanResult:
+    def __init__(self, days, total_cost, total_score, within_budget):
+        self.days = days  # one {meal_type: option} dict per planned day
+        self.total_cost = total_cost
+        self.total_score = total_score
+        self.within_budget = within_budget
+
+
+def _frontier(table):
+    """Drop costs that a cheaper entry of {cost: (score, ...)} scores at least as well as."""
+    kept = {}
+    best = NEG
+    for c in sorted(table):
+        if table[c][0] > best:
+            kept[c] = table[c]
+            best = table[c][0]
+    return kept
+
+
+def _useful(values, costs):
+    """Indices of the options that fewer than DOMINATORS others beat on cost and score."""
+    top = []  # the DOMINATORS highest scores seen so far, all at lower or equal cost
+    kept = []
+    for _, neg_value, j in sorted(zip(costs, [-v for v in values], range(len(values)))):
+        # Anything else can't change the top scores either
+        if len(top) < DOMINATORS or -neg_value > top[-1]:
+            kept.append(j)
+            top = sorted(top + [-neg_value], reverse=True)[:DOMINATORS]
+    return sorted(kept)
+
+
+def _chain(values, costs, num_days, limit):
+    """Best score for each total cost (up to limit) of one meal type over num_days.
+
+    Returns {cost: (score, picks)} where picks is the option index per day.
+    """
+    n = len(values)
+    # layer[j] maps cost -> (score, back) for chains ending with option j
+    layer = [{costs[j]: (values[j], None)} if costs[j] <= limit else {} for j in range(n)]
+    history = [layer]
+    for _ in range(1, num_days):
+        # Best and second-best predecessor per cost, so excluding j is O(1)
+        best = {}
+        for i in range(n):
+            for c, (v, _) in layer[i].items():
+                top = best.get(c)
+                if top is None:
+                    best[c] = [(v, i), (NEG, -1)]
+                elif v > top[0][0]:
+                    top[1] = top[0]
+                    top[0] = (v, i)
+                elif v > top[1][0]:
+                    top[1] = (v, i)
+        layer = []
+        for j in range(n):
+            row = {}
+            for c, (first, second) in best.items():
+                nc = c + costs[j]
+                if nc > limit:
+                    continue
+                # A meal type with a single option has to repeat it
+                v, i = first if first[1] != j or n == 1 else second
+                if i < 0:
+                    continue
+                nv = v + values[j]
+                if nv > row.get(nc, (NEG,))[0]:
+                    row[nc] = (nv, (i, c))
+            layer.append(_frontier(row))
+        history.append(layer)
+
+    result = {}
+    for j in range(n):
+        for c, (v, _) in layer[j].items():
+            if v > result.get(c, (NEG,))[0]:
+                result[c] = (v, j)
+    # Reconstruct the option sequence for each final cost
+    chains = {}
+    for c, (v, j) in _frontier(result).items():
+        picks = []
+        cost = c
+        for day in range(num_days - 1, -1, -1):
+            picks.append(j)
+            back = history[day][j][cost][1]
+            if back is None:
+                break
+            j, cost = back
+        chains[c] = (v, picks[::-1])
+    return chains
+
+
+def _merge(left, right, limit):
+    """Max-plus combine two {cost: (score, picks)} frontiers, dropping costs over limit."""
+    merged = {}
+    right_costs = sorted(right)
+    for c1, (v1, p1) in left.items():
+        for c2 in right_costs:
+            c = c1 + c2
+            if c > limit:
+                break
+            v2, p2 = right[c2]
+            v = v1 + v2
+            if v > merged.get(c, (NEG,))[0]:
+                merged[c] = (v, p1 + p2)
+    return _frontier(merged)
+
+
+def _solve(meal_types, per_type, units, nutrition, num_days, budget_units, weight_protein, weight_calories):
+    tables = []
+    for meal_type in meal_types:
+        values = [score + weight_protein * protein + weight_calories * calories / 100
+                  for score, protein, calories in nutrition[meal_type]]
+        costs = units[meal_type]
+        useful = _useful(values, costs)
+        chains = _chain([values[j] for j in useful], [costs[j] for j in useful], num_days, budget_units)
+        tables.append({c: (v, [[useful[k] for k in picks]]) for c, (v, picks) in chains.items()})
+
+    combined = reduce(lambda a, b: _merge(a, b, budget_units), tables) if all(tables) else {}
+    if combined:
+        cost = max(combined, key=lambda c: (combined[c][0], -c))
+        return combined[cost][1], True
+    # Nothing fits: fall back to the cheapest possible plan, alternating the
+    # two cheapest options of each meal type
+    picks = []
+    for meal_type in meal_types:
+        cheapest = sorted(range(len(per_type[meal_type])), key=units[meal_type].__getitem__)[:2]
+        picks.append([cheapest[d % len(cheapest)] for d in range(num_days)])
+    return picks, False
+
+
+def plan_meals(catalog, num_days, budget, min_protein=0, min_calories=0, meal_types=MEAL_ORDER):
+    """Plan ``num_days`` of meals from ``catalog`` ({meal_type: [option, ...]})
+    within ``budget`` (total for all days). Returns a MealPlanResult."""
+    meal_types = [m for m in meal_types if catalog.get(m)]
+    if num_days <= 0 or not meal_types:
+        return MealPlanResult([{} for _ in range(max(0, num_days))], 0, 0, True)
+
+    budget = max(0, budget)
+    unit = max(COST_STEP, budget / MAX_BUDGET_UNITS)
+    per_type, units, nutrition = {}, {}, {}
+    for m in meal_types:
+        per_type[m] = sorted(catalog[m], key=itemgetter('cost', 'name'))
+        # Rounding up keeps every plan that fits in units within the real budget
+        units[m] = [max(1, math.ceil(o['cost'] / unit - 1e-9)) for o in per_type[m]]
+        nutrition[m] = list(map(itemgetter('score', 'protein', 'calories'), per_type[m]))
+    budget_units = int(budget // unit)
+
+    best = None
+    for weight in FLOOR_WEIGHTS:
+        picks, within = _solve(meal_types, per_type, units, nutrition, num_days, budget_units,
+                               weight if min_protein else 0, weight if min_calories else 0)
+        days = [{m: per_type[m][picks[t][d]] for t, m in enumerate(meal_types)} for d in range(num_days)]
+        protein = sum(o['protein'] for day in days for o in day.values()) / num_days
+        calories = sum(o['calories'] for day in days for o in day.values()) / num_days
+        best = (days, within)
+        if protein >= min_protein and calories >= min_calories:
+            break
+
+    days, within = best
+    total_cost = sum(o['cost'] for day in days for o in day.values())
+    return MealPlanResult(
+        [{m: dict(o) for m, o in day.items()} for day in days],
+        total_cost=total_cost,
+        total_score=round(sum(o['score'] for day in days for o in day.values()), 2),
+        within_budget=within and total_cost <= budget + 1e-9,
+    )
+
+
+def build_week_plan(user, options, start=None, days=7, min_protein=0, min_calories=0):
+    """Unsaved MealPlan rows filling the days in [start, start + days) that
+    have no meals yet, planned against the user's daily food budget."""
+    from datetime import date, timedelta
+    from app.extensions import db
+    from app.models import MealPlan
+
+    start = start or date.today()
+    end = start + timedelta(days=days)
+    planned = {d for (d,) in db.session.query(MealPlan.date).filter(
+        MealPlan.user_id == user.id, MealPlan.date >= start, MealPlan.date < end
+    ).distinct()}
+    open_days = [start + timedelta(days=i) for i in range(days)
+                 if start + timedelta(days=i) not in planned]
+    if not open_days:
+        return []
+
+    food_budget = user.get_daily_limit() * 0.6
+    result = plan_meals(options, len(open_days), food_budget * len(open_days),
+                        min_protein=min_protein, min_calories=min_calories)
+    return [
+        MealPlan(
+            user_id=user.id, date=day, meal_type=meal_type,
+            name=choice['name'], cost=choice['cost'], calories=choice['calories'],
+            protein=choice['protein'], nutrition_score=choice['score'], source=choice['source']
+        )
+        for day, meals in zip(open_days, result.days)
+        for meal_type, choice in meals.items()
+    ]
+
+
+def plan_week_job(job):
+    """``meals.auto_plan`` job: plan and save the open days of the job user's week."""
+    from app.extensions import db
+    from app.models import User
+    from app.blueprints.meals.menu import get_menu
+
+    user = db.session.get(User, job.user_id)
+    params = job.params
+    meals = build_week_plan(
+        user, get_menu(user.food_preference or 'Vegetarian').options,
+        min_protein=params.get('min_protein', 0), min_calories=params.get('min_calories', 0),
+    )
+    db.session.add_all(meals)
+    return {'planned': len(meals)}
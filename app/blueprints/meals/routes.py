@@ -1,66 +1,19 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
 from app.extensions import db
-from app.models import MealPlan, Transaction
+from app.models import MealPlan, Transaction, Job
+from app.ledger import add_transaction
+from app.blueprints.meals.menu import get_menu
+from app.blueprints.meals.calendar import MealCalendar, MAX_RANGE_DAYS
+from app.versioning import conditional_json
 from datetime import date, timedelta
-import random
 
 meals_bp = Blueprint('meals', __name__, template_folder='templates')
 
-# Meal database for suggestions
-MEAL_DATABASE = {
-    'Vegetarian': {
-        'Breakfast': [
-            {'name': 'Poha + Chai', 'cost': 30, 'calories': 280, 'protein': 8, 'score': 7.5, 'source': 'Mess'},
-            {'name': 'Idli Sambar', 'cost': 35, 'calories': 300, 'protein': 10, 'score': 8.0, 'source': 'Mess'},
-            {'name': 'Upma + Coffee', 'cost': 25, 'calories': 250, 'protein': 6, 'score': 7.0, 'source': 'Mess'},
-            {'name': 'Bread Butter + Milk', 'cost': 20, 'calories': 320, 'protein': 9, 'score': 6.5, 'source': 'Self'},
-            {'name': 'Paratha + Curd', 'cost': 40, 'calories': 380, 'protein': 11, 'score': 7.5, 'source': 'Canteen'},
-            {'name': 'Oats + Banana', 'cost': 15, 'calories': 230, 'protein': 7, 'score': 8.5, 'source': 'Self'},
-        ],
-        'Lunch': [
-            {'name': 'Dal Rice + Sabzi + Roti', 'cost': 60, 'calories': 550, 'protein': 18, 'score': 8.0, 'source': 'Mess'},
-            {'name': 'Rajma Chawal', 'cost': 50, 'calories': 520, 'protein': 20, 'score': 8.5, 'source': 'Mess'},
-            {'name': 'Chole Bhature', 'cost': 55, 'calories': 600, 'protein': 16, 'score': 6.5, 'source': 'Canteen'},
-            {'name': 'Thali (Full)', 'cost': 70, 'calories': 650, 'protein': 22, 'score': 8.0, 'source': 'Mess'},
-            {'name': 'Veg Biryani', 'cost': 65, 'calories': 480, 'protein': 12, 'score': 7.0, 'source': 'Canteen'},
-        ],
-        'Dinner': [
-            {'name': 'Roti + Paneer + Dal', 'cost': 70, 'calories': 480, 'protein': 20, 'score': 8.5, 'source': 'Mess'},
-            {'name': 'Dal Khichdi', 'cost': 40, 'calories': 400, 'protein': 14, 'score': 8.0, 'source': 'Mess'},
-            {'name': 'Roti + Mix Veg', 'cost': 55, 'calories': 420, 'protein': 12, 'score': 7.5, 'source': 'Mess'},
-            {'name': 'Pav Bhaji', 'cost': 50, 'calories': 450, 'protein': 10, 'score': 7.0, 'source': 'Canteen'},
-        ],
-        'Snack': [
-            {'name': 'Banana + Biscuits', 'cost': 25, 'calories': 180, 'protein': 3, 'score': 6.0, 'source': 'Self'},
-            {'name': 'Samosa + Chai', 'cost': 20, 'calories': 250, 'protein': 4, 'score': 5.0, 'source': 'Canteen'},
-            {'name': 'Fruit Chaat', 'cost': 30, 'calories': 120, 'protein': 2, 'score': 8.5, 'source': 'Self'},
-            {'name': 'Peanut Chikki', 'cost': 15, 'calories': 200, 'protein': 7, 'score': 7.0, 'source': 'Self'},
-            {'name': 'Sprout Salad', 'cost': 20, 'calories': 150, 'protein': 9, 'score': 9.0, 'source': 'Self'},
-        ]
-    },
-    'Non-Vegetarian': {
-        'Breakfast': [
-            {'name': 'Egg Bhurji + Toast', 'cost': 35, 'calories': 350, 'protein': 18, 'score': 8.0, 'source': 'Mess'},
-            {'name': 'Omelette + Bread', 'cost': 30, 'calories': 320, 'protein': 16, 'score': 7.5, 'source': 'Mess'},
-            {'name': 'Boiled Eggs + Chai', 'cost': 25, 'calories': 250, 'protein': 14, 'score': 8.5, 'source': 'Self'},
-        ],
-        'Lunch': [
-            {'name': 'Chicken Curry + Rice', 'cost': 80, 'calories': 600, 'protein': 30, 'score': 8.0, 'source': 'Mess'},
-            {'name': 'Egg Fried Rice', 'cost': 60, 'calories': 500, 'protein': 18, 'score': 7.0, 'source': 'Canteen'},
-            {'name': 'Fish Curry + Rice', 'cost': 90, 'calories': 550, 'protein': 28, 'score': 8.5, 'source': 'Mess'},
-        ],
-        'Dinner': [
-            {'name': 'Chicken Biryani', 'cost': 100, 'calories': 650, 'protein': 32, 'score': 7.5, 'source': 'Canteen'},
-            {'name': 'Egg Curry + Roti', 'cost': 55, 'calories': 420, 'protein': 18, 'score': 8.0, 'source': 'Mess'},
-            {'name': 'Chicken + Dal + Roti', 'cost': 85, 'calories': 550, 'protein': 28, 'score': 8.5, 'source': 'Mess'},
-        ],
-        'Snack': [
-            {'name': 'Egg Roll', 'cost': 40, 'calories': 300, 'protein': 14, 'score': 6.5, 'source': 'Canteen'},
-            {'name': 'Chicken Sandwich', 'cost': 50, 'calories': 350, 'protein': 18, 'score': 7.0, 'source': 'Canteen'},
-        ]
-    }
-}
+
+def meal_options(preference):
+    """Suggestion catalog for a food preference: {meal_type: [option, ...]}, cheapest first."""
+    return get_menu(preference).options
 
 
 @meals_bp.route('/')
@@ -80,26 +33,38 @@ def index():
     food_budget_left = max(0, daily_limit * 0.6 - sum(m.cost for m in today_meals if m.is_completed))
 
     # Weekly meal plan
-    week_meals = {}
-    for i in range(7):
-        d = today + timedelta(days=i)
-        day_meals = MealPlan.query.filter_by(user_id=current_user.id, date=d).all()
-        week_meals[d.strftime('%A')] = {'date': d, 'meals': day_meals, 'total': sum(m.cost for m in day_meals)}
+    week = MealCalendar(current_user.id, today, today + timedelta(days=6))
+    week_meals = {
+        day['date'].strftime('%A'): {'date': day['date'], 'meals': day['meals'], 'total': day['cost']}
+        for day in week.days
+    }
 
     # Cost comparison
-    pref = current_user.food_preference or 'Vegetarian'
-    meals_data = MEAL_DATABASE.get(pref, MEAL_DATABASE['Vegetarian'])
-    mess_avg = sum(m['cost'] for meals in meals_data.values() for m in meals if m['source'] == 'Mess') / max(1, sum(1 for meals in meals_data.values() for m in meals if m['source'] == 'Mess'))
-    canteen_avg = sum(m['cost'] for meals in meals_data.values() for m in meals if m['source'] == 'Canteen') / max(1, sum(1 for meals in meals_data.values() for m in meals if m['source'] == 'Canteen'))
+    menu = get_menu(current_user.food_preference or 'Vegetarian')
+    mess_avg = menu.average_cost('Mess')
+    canteen_avg = menu.average_cost('Canteen')
 
     # Smart suggestion
     if food_budget_left < 50:
         suggestion = "Budget tight! Try mess meals or cook something simple today 🍳"
     elif food_budget_left < 100:
-        suggestion = "Today's cheapest protein option: Sprout Salad (₹20) or Dal Rice (₹60) 💪"
+        picks = menu.best_protein_value(food_budget_left)
+        if picks:
+            options = ' or '.join(f"{m['name']} (₹{m['cost']:.0f})" for m in picks)
+            suggestion = f"Today's cheapest protein option: {options} 💪"
+        else:
+            suggestion = "Budget tight! Try mess meals or cook something simple today 🍳"
     else:
         suggestion = "Good budget! You can afford a balanced mess meal today 🎉"
 
+    # Auto-plan job still running: the page shows a banner and polls it
+    planning_job = None
+    job_id = request.args.get('job', type=int)
+    if job_id:
+        planning_job = Job.query.filter(
+            Job.id == job_id, Job.user_id == current_user.id, Job.state.in_(('queued', 'running'))
+        ).first()
+
     return render_template('meals/index.html',
         today_meals=today_meals,
         total_cost=total_cost,
@@ -110,6 +75,48 @@ def index():
         mess_avg=mess_avg,
         canteen_avg=canteen_avg,
         suggestion=suggestion,
+        planning_job=planning_job,
+    )
+
+
+@meals_bp.route('/calendar')
+@login_required
+def calendar_view():
+    """Month view of planned meals with day and week rollups."""
+    today = date.today()
+    try:
+        first = date.fromisoformat(request.args.get('month', '') + '-01')
+    except ValueError:
+        first = today.replace(day=1)
+    last = (first + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+    cal = MealCalendar(current_user.id, first, last)
+    return render_template('meals/calendar.html',
+        calendar=cal,
+        month_label=first.strftime('%B %Y'),
+        leading_blanks=first.weekday(),
+        prev_month=(first - timedelta(days=1)).strftime('%Y-%m'),
+        next_month=(last + timedelta(days=1)).strftime('%Y-%m'),
+        today=today,
+    )
+
+
+@meals_bp.route('/api/calendar')
+@login_required
+def calendar_api():
+    """Meals and cost/calorie/protein rollups per day and week for ?start=&end= (inclusive)."""
+    today = date.today()
+    try:
+        start = date.fromisoformat(request.args.get('start') or today.isoformat())
+        end = date.fromisoformat(request.args.get('end') or (start + timedelta(days=6)).isoformat())
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Dates must be YYYY-MM-DD'}), 400
+    if end < start:
+        return jsonify({'success': False, 'error': 'end must not be before start'}), 400
+    if (end - start).days >= MAX_RANGE_DAYS:
+        return jsonify({'success': False, 'error': f'Range is limited to {MAX_RANGE_DAYS} days'}), 400
+    return conditional_json(
+        current_user, f'meal-calendar-{start.isoformat()}-{end.isoformat()}',
+        lambda: MealCalendar(current_user.id, start, end).to_dict()
     )
 
 
@@ -138,36 +145,15 @@ def add():
 @meals_bp.route('/auto-plan', methods=['POST'])
 @login_required
 def auto_plan():
-    """Auto-generate meal plan for the week."""
-    pref = current_user.food_preference or 'Vegetarian'
-    meals_data = MEAL_DATABASE.get(pref, MEAL_DATABASE['Vegetarian'])
-    daily_limit = current_user.get_daily_limit()
-    food_budget = daily_limit * 0.6
-
-    today = date.today()
-    for i in range(7):
-        d = today + timedelta(days=i)
-        existing = MealPlan.query.filter_by(user_id=current_user.id, date=d).first()
-        if existing:
-            continue
-
-        for meal_type in ['Breakfast', 'Lunch', 'Snack', 'Dinner']:
-            options = meals_data.get(meal_type, [])
-            affordable = [m for m in options if m['cost'] <= food_budget * 0.35]
-            if not affordable:
-                affordable = options
-            if affordable:
-                choice = random.choice(affordable)
-                meal = MealPlan(
-                    user_id=current_user.id, date=d, meal_type=meal_type,
-                    name=choice['name'], cost=choice['cost'], calories=choice['calories'],
-                    protein=choice['protein'], nutrition_score=choice['score'], source=choice['source']
-                )
-                db.session.add(meal)
-
+    """Queue planning of the week's unplanned days; the meal page polls the job."""
+    from app.jobs import enqueue
+    job = enqueue('meals.auto_plan', {
+        'min_protein': request.form.get('min_protein', 0, type=float),
+        'min_calories': request.form.get('min_calories', 0, type=float),
+    }, user_id=current_user.id, unique=True)
     db.session.commit()
-    flash('Weekly meal plan generated! 🗓️', 'success')
-    return redirect(url_for('meals.index'))
+    flash('Planning your week... it will show up here in a moment 🗓️', 'info')
+    return redirect(url_for('meals.index', job=job.id))
 
 
 @meals_bp.route('/complete/<int:meal_id>', methods=['POST'])
@@ -186,7 +172,7 @@ def complete(meal_id):
         is_food=True,
         meal_type=meal.meal_type
     )
-    db.session.add(txn)
+    add_transaction(txn)
     db.session.commit()
     flash(f'{meal.name} completed & logged as ₹{meal.cost:.0f} expense! ✅', 'success')
     return redirect(url_for('meals.index'))
@@ -196,7 +182,7 @@ def complete(meal_id):
 @login_required
 def suggestions():
     pref = current_user.food_preference or 'Vegetarian'
-    meals_data = MEAL_DATABASE.get(pref, MEAL_DATABASE['Vegetarian'])
+    meals_data = meal_options(pref)
     daily_limit = current_user.get_daily_limit()
 
     return jsonify({
@@ -0,0 +1,67 @@
+"""Bill-split participants: settlement and outstanding balances.
+
+Each participant is its own split_participants row, so marking someone
+as paid is a single-row UPDATE. ``is_settled`` on the split is then set
+from a NOT EXISTS check over its unpaid participants in the same
+transaction. The split row is locked first (``FOR UPDATE`` where the
+database supports it), so two friends settling at once can't both see
+the other as still unpaid.
+"""
+from datetime import datetime
+from app.extensions import db
+from app.models import BillSplit, SplitParticipant
+from app.versioning import bump_data_version
+
+
+def lock_split(split_id, creator_id):
+    """The creator's split, row-locked for the rest of the transaction (404 if missing)."""
+    return BillSplit.query.filter_by(id=split_id, creator_id=creator_id)\
+        .with_for_update().first_or_404()
+
+
+def settle_participant(split_id, participant_id):
+    """Mark one participant as paid. Returns False if they'd already paid (or don't exist)."""
+    result = db.session.execute(
+        db.update(SplitParticipant).where(
+            SplitParticipant.id == participant_id,
+            SplitParticipant.split_id == split_id,
+            SplitParticipant.paid == False  # noqa: E712
+        ).values(paid=True, paid_at=datetime.utcnow())
+        .execution_options(synchronize_session='fetch')
+    )
+    if result.rowcount != 1:
+        return False
+    refresh_settled(split_id)
+    bump_data_version(db.session.get(BillSplit, split_id).creator_id)
+    return True
+
+
+def refresh_settled(split_id):
+    """Set bill_splits.is_settled from whether any participant is still unpaid."""
+    unpaid = db.select(SplitParticipant.id).where(
+        SplitParticipant.split_id == BillSplit.id,
+        SplitParticipant.paid == False  # noqa: E712
+    ).exists()
+    db.session.execute(
+        db.update(BillSplit).where(BillSplit.id == split_id).values(is_settled=~unpaid)
+        .execution_options(synchronize_session='fetch')
+    )
+
+
+def outstanding_balances(creator_id):
+    """[(name, amount owed, open splits)] across the creator's unsettled splits
+    that the creator paid for, largest first."""
+    amount = db.func.sum(SplitParticipant.share)
+    payer = db.aliased(SplitParticipant)
+    rows = db.session.query(
+        SplitParticipant.name, amount, db.func.count(SplitParticipant.id)
+    ).join(BillSplit, BillSplit.id == SplitParticipant.split_id).join(
+        payer, (payer.split_id == SplitParticipant.split_id) & (payer.is_payer == True)  # noqa: E712
+    ).filter(
+        BillSplit.creator_id == creator_id,
+        BillSplit.is_settled == False,  # noqa: E712
+        payer.is_creator == True,  # noqa: E712
+        SplitParticipant.paid == False,  # noqa: E712
+        SplitParticipant.is_payer == False  # noqa: E712
+    ).group_by(SplitParticipant.name).order_by(amount.desc(), SplitParticipant.name).all()
+    return [(name, round(float(total or 0), 2), count) for name, total, count in rows]
@@ -1,8 +1,10 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
 from app.extensions import db
-from app.models import BillSplit, User
-import json
+from app.models import BillSplit, SplitParticipant
+from app.blueprints.social import participants as split_participants
+from app.blueprints.social import settlement
+from datetime import datetime
 
 social_bp = Blueprint('social', __name__, template_folder='templates')
 
@@ -11,8 +13,10 @@ social_bp = Blueprint('social', __name__, template_folder='templates')
 @login_required
 def index():
     my_splits = BillSplit.query.filter_by(creator_id=current_user.id)\
+        .options(db.selectinload(BillSplit.participants))\
         .order_by(BillSplit.created_at.desc()).all()
-    return render_template('social/index.html', splits=my_splits)
+    balances = split_participants.outstanding_balances(current_user.id)
+    return render_template('social/index.html', splits=my_splits, balances=balances)
 
 
 @social_bp.route('/split/create', methods=['GET', 'POST'])
@@ -21,39 +25,46 @@ def create_split():
     if request.method == 'POST':
         title = request.form.get('title', 'Bill Split')
         total = float(request.form.get('total_amount', 0))
-        names = request.form.getlist('participant_name')
         split_type = request.form.get('split_type', 'equal')
+        paid_by = request.form.get('paid_by', '').strip().lower()
 
         if total <= 0:
             flash('Amount must be greater than zero!', 'error')
             return redirect(url_for('social.create_split'))
 
-        participants = []
-        per_person = total / max(1, len(names) + 1)
-
-        for name in names:
-            if name.strip():
-                participants.append({
-                    'name': name.strip(),
-                    'share': round(per_person, 2),
-                    'paid': False
-                })
-
-        # Add creator
-        participants.append({
-            'name': current_user.name,
-            'share': round(per_person, 2),
-            'paid': True,
-            'is_creator': True
-        })
+        # Friends first, then the creator; values are weights or exact amounts
+        names = request.form.getlist('participant_name')
+        friend_values = request.form.getlist('participant_value')
+        friend_values += [''] * (len(names) - len(friend_values))
+        people = [(name.strip(), value) for name, value in zip(names, friend_values) if name.strip()]
+        people.append((current_user.name, request.form.get('my_value', '')))
+        try:
+            values = [float(value) if str(value).strip() else None for _, value in people]
+            if split_type == 'exact' and values[-1] is None:
+                values[-1] = round(total - sum(v or 0 for v in values[:-1]), 2)
+            default = 1 if split_type == 'weighted' else 0
+            shares = settlement.split_shares(total, split_type, [default if v is None else v for v in values])
+        except ValueError as e:
+            flash(f'{e}!', 'error')
+            return redirect(url_for('social.create_split'))
 
+        payer_index = next((i for i, (name, _) in enumerate(people[:-1]) if name.lower() == paid_by),
+                           len(people) - 1)
+        now = datetime.utcnow()
         split = BillSplit(
             creator_id=current_user.id,
             title=title,
             total_amount=total,
             split_type=split_type
         )
-        split.participants = participants
+        for i, ((name, _), share) in enumerate(zip(people, shares)):
+            is_creator = i == len(people) - 1
+            split.participants.append(SplitParticipant(
+                name=name, user_id=current_user.id if is_creator else None, share=share,
+                paid=i == payer_index, paid_at=now if i == payer_index else None,
+                is_creator=is_creator, is_payer=i == payer_index
+            ))
+        split.is_settled = all(p.paid for p in split.participants)
         db.session.add(split)
         db.session.commit()
 
@@ -63,6 +74,13 @@ def create_split():
     return render_template('social/create_split.html')
 
 
+@social_bp.route('/api/settle-plan')
+@login_required
+def settle_plan_api():
+    """Fewest transfers that settle every open split the user created."""
+    return jsonify(settlement.settle_plan(current_user.id))
+
+
 @social_bp.route('/split/<int:split_id>')
 @login_required
 def view_split(split_id):
@@ -70,18 +88,16 @@ def view_split(split_id):
     return render_template('social/view_split.html', split=split)
 
 
-@social_bp.route('/split/<int:split_id>/settle/<int:idx>', methods=['POST'])
+@social_bp.route('/split/<int:split_id>/settle/<int:participant_id>', methods=['POST'])
 @login_required
-def settle_participant(split_id, idx):
-    split = BillSplit.query.filter_by(id=split_id, creator_id=current_user.id).first_or_404()
-    participants = split.participants
-    if 0 <= idx < len(participants):
-        participants[idx]['paid'] = True
-        split.participants = participants
-        all_paid = all(p.get('paid', False) for p in participants)
-        split.is_settled = all_paid
+def settle_participant(split_id, participant_id):
+    split_participants.lock_split(split_id, current_user.id)
+    if split_participants.settle_participant(split_id, participant_id):
+        name = db.session.get(SplitParticipant, participant_id).name
         db.session.commit()
-        flash(f'{participants[idx]["name"]} marked as paid! ✅', 'success')
+        flash(f'{name} marked as paid! ✅', 'success')
+    else:
+        db.session.rollback()
     return redirect(url_for('social.view_split', split_id=split_id))
 
 
@@ -0,0 +1,114 @@
+"""Share allocation and debt simplification for bill splits.
+
+Amounts are handled in integer paise so shares always add up to the bill
+exactly. Leftover paise from rounding go to the largest fractional
+remainders, ties to the earlier participant.
+
+The settle plan nets every unpaid share across the creator's unsettled
+splits into one balance per person (debts to each split's payer are
+summed in SQL). It then pays the largest debtor into the largest creditor
+until everything is zero (greedy min-cash-flow). That takes at most
+n - 1 transfers for n people with a non-zero balance.
+"""
+import heapq
+from app.extensions import db
+from app.models import BillSplit, SplitParticipant
+
+SPLIT_TYPES = ('equal', 'weighted', 'exact')
+
+
+def to_paise(amount):
+    return int(round(float(amount) * 100))
+
+
+def allocate(total, weights):
+    """Split ``total`` rupees in proportion to ``weights``; returns rupee shares summing to total."""
+    total_paise = to_paise(total)
+    weight_sum = sum(weights)
+    if weight_sum <= 0 or any(w < 0 for w in weights):
+        raise ValueError('Weights must be positive')
+    exact = [total_paise * w / weight_sum for w in weights]
+    shares = [int(x) for x in exact]
+    leftover = total_paise - sum(shares)
+    by_remainder = sorted(range(len(weights)), key=lambda i: (-(exact[i] - shares[i]), i))
+    for i in by_remainder[:leftover]:
+        shares[i] += 1
+    return [s / 100 for s in shares]
+
+
+def split_shares(total, split_type, values):
+    """Shares for each participant. ``values`` are weights for 'weighted' and
+    amounts for 'exact' (ignored for 'equal')."""
+    if split_type == 'equal':
+        return allocate(total, [1] * len(values))
+    if split_type == 'weighted':
+        return allocate(total, values)
+    if split_type == 'exact':
+        if any(v < 0 for v in values):
+            raise ValueError('Amounts cannot be negative')
+        if sum(to_paise(v) for v in values) != to_paise(total):
+            raise ValueError('Amounts must add up to the total')
+        return [to_paise(v) / 100 for v in values]
+    raise ValueError(f'Unknown split type "{split_type}"')
+
+
+def _person_key(name, user_id):
+    return ('user', user_id) if user_id else ('name', name.strip().lower())
+
+
+def net_balances(creator_id):
+    """{person key: [display name, paise]}; positive means they're owed money."""
+    payer = db.aliased(SplitParticipant)
+    rows = db.session.query(
+        SplitParticipant.name, SplitParticipant.user_id, payer.name, payer.user_id,
+        db.func.sum(SplitParticipant.share)
+    ).join(BillSplit, BillSplit.id == SplitParticipant.split_id).join(
+        payer, (payer.split_id == SplitParticipant.split_id) & (payer.is_payer == True)  # noqa: E712
+    ).filter(
+        BillSplit.creator_id == creator_id,
+        BillSplit.is_settled == False,  # noqa: E712
+        SplitParticipant.paid == False,  # noqa: E712
+        SplitParticipant.is_payer == False  # noqa: E712
+    ).group_by(
+        SplitParticipant.name, SplitParticipant.user_id, payer.name, payer.user_id
+    ).all()
+
+    balances = {}
+    for debtor, debtor_uid, creditor, creditor_uid, amount in rows:
+        paise = to_paise(amount or 0)
+        for name, user_id, sign in ((debtor, debtor_uid, -1), (creditor, creditor_uid, 1)):
+            entry = balances.setdefault(_person_key(name, user_id), [name, 0])
+            entry[1] += sign * paise
+    return balances
+
+
+def min_cash_flow(balances):
+    """Transfers [(from, to, paise)] that zero every balance in {key: (name, paise)}."""
+    creditors = [(-paise, name, key) for key, (name, paise) in balances.items() if paise > 0]
+    debtors = [(paise, name, key) for key, (name, paise) in balances.items() if paise < 0]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+    transfers = []
+    while creditors and debtors:
+        credit, creditor, ckey = heapq.heappop(creditors)
+        debt, debtor, dkey = heapq.heappop(debtors)
+        amount = min(-credit, -debt)
+        transfers.append((debtor, creditor, amount))
+        if -credit > amount:
+            heapq.heappush(creditors, (credit + amount, creditor, ckey))
+        if -debt > amount:
+            heapq.heappush(debtors, (debt + amount, debtor, dkey))
+    return transfers
+
+
+def settle_plan(creator_id):
+    balances = net_balances(creator_id)
+    transfers = min_cash_flow(balances)
+    return {
+        'balances': sorted(
+            ({'name': name, 'amount': paise / 100} for name, paise in balances.values() if paise),
+            key=lambda b: (-b['amount'], b['name'])
+        ),
+        'transfers': [{'from': debtor, 'to': creditor, 'amount': paise / 100}
+                      for debtor, creditor, paise in transfers],
+    }
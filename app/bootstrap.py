@@ -0,0 +1,164 @@
+"""Schema creation and demo seeding.
+
+These used to run inside ``create_app()`` on every process start, which
+meant DDL checks and a users query on every serverless cold start. They
+now run from ``flask init-db`` / ``flask seed-demo`` (or a migration),
+and only run automatically when ``AUTO_BOOTSTRAP`` is enabled, as it is
+for ``python run.py``.
+"""
+from datetime import datetime, date, timedelta
+import random
+from app.extensions import db
+from app.models import User, Transaction, Budget, MealPlan, Badge, SavingsGoal
+from app.ledger import rebuild_daily_spend
+from app.envelopes import write_envelopes
+from app.notifications import create_alert
+
+DEMO_EMAIL = 'demo@budgetbite.app'
+
+
+def init_db():
+    """Create any missing tables, the meal catalog and the demo account."""
+    db.create_all()
+    seed_meal_catalog()
+    seed_demo_data()
+
+
+def seed_meal_catalog():
+    """Load the built-in meal suggestions into an empty meal_items table.
+    Returns the number of items added."""
+    from app.models import MealItem
+    from app.blueprints.meals.catalog import catalog_rows
+    if db.session.query(MealItem.id).first() is not None:
+        return 0
+    rows = catalog_rows()
+    db.session.execute(MealItem.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def seed_demo_data():
+    """Seed demo data for the demo user if it doesn't exist. Returns the demo user."""
+    demo_user = User.query.filter_by(email=DEMO_EMAIL).first()
+    if demo_user:
+        return demo_user
+
+    # Create demo user
+    demo_user = User(
+        name='Alex Student',
+        email=DEMO_EMAIL,
+        monthly_budget=8000.0,
+        living_type='Hostel',
+        food_preference='Vegetarian',
+        onboarding_complete=True,
+        avatar=''
+    )
+    db.session.add(demo_user)
+    db.session.flush()
+
+    # Create budget
+    today = date.today()
+    budget = Budget(
+        user_id=demo_user.id,
+        month=today.month,
+        year=today.year,
+        total_amount=8000.0,
+        emergency_reserve=500.0
+    )
+    db.session.add(budget)
+
+    # Create transactions for the past 20 days
+    categories_data = [
+        ('Food', True, ['Mess lunch', 'Canteen snack', 'Tea and biscuits', 'Dinner at mess', 'Juice', 'Maggi', 'Samosa', 'Fruit salad']),
+        ('Travel', False, ['Auto to college', 'Bus ticket', 'Metro card recharge', 'Rickshaw']),
+        ('Academic', False, ['Xerox notes', 'Pen and notebook', 'Lab printout', 'Book from library']),
+        ('Entertainment', False, ['Movie ticket', 'Netflix share', 'Game recharge']),
+        ('Misc', False, ['Laundry', 'Phone recharge', 'Haircut']),
+    ]
+
+    for day_offset in range(20, 0, -1):
+        txn_date = datetime.now() - timedelta(days=day_offset)
+        num_transactions = random.randint(2, 5)
+        for _ in range(num_transactions):
+            cat_data = random.choice(categories_data)
+            category, is_food, descriptions = cat_data
+            amount = random.randint(10, 250) if is_food else random.randint(20, 400)
+            txn = Transaction(
+                user_id=demo_user.id,
+                amount=amount,
+                category=category,
+                description=random.choice(descriptions),
+                date=txn_date,
+                is_food=is_food,
+                meal_type=random.choice(['Breakfast', 'Lunch', 'Dinner', 'Snack']) if is_food else None
+            )
+            db.session.add(txn)
+
+    # Add today's transactions
+    for desc, amount, cat in [('Mess breakfast', 50, 'Food'), ('Auto to class', 30, 'Travel'), ('Canteen coffee', 20, 'Food')]:
+        txn = Transaction(
+            user_id=demo_user.id, amount=amount, category=cat,
+            description=desc, date=datetime.now(), is_food=(cat == 'Food'),
+            meal_type='Breakfast' if 'breakfast' in desc.lower() else 'Snack' if cat == 'Food' else None
+        )
+        db.session.add(txn)
+
+    # Create meal plans for today
+    meals = [
+        ('Breakfast', 'Poha + Chai', 30, 280, 8, 7.5, 'Mess'),
+        ('Lunch', 'Dal Rice + Sabzi + Roti', 60, 550, 18, 8.0, 'Mess'),
+        ('Snack', 'Banana + Biscuits', 25, 180, 3, 6.0, 'Self'),
+        ('Dinner', 'Roti + Paneer + Dal', 70, 480, 20, 8.5, 'Mess'),
+    ]
+    for meal_type, name, cost, cal, protein, score, source in meals:
+        mp = MealPlan(
+            user_id=demo_user.id, date=today, meal_type=meal_type,
+            name=name, cost=cost, calories=cal, protein=protein,
+            nutrition_score=score, source=source
+        )
+        db.session.add(mp)
+
+    # Create badges
+    badges_data = [
+        ('first_expense', 'First Step', 'Logged your first expense!', '🎯'),
+        ('week_streak', 'Week Warrior', '7-day under-budget streak!', '🔥'),
+        ('meal_planner', 'Meal Master', 'Planned meals for a full week', '🍽️'),
+        ('budget_setter', 'Budget Boss', 'Set up your first monthly budget', '💰'),
+    ]
+    for btype, bname, bdesc, bicon in badges_data:
+        badge = Badge(
+            user_id=demo_user.id, badge_type=btype,
+            name=bname, description=bdesc, icon=bicon,
+            earned_date=datetime.now() - timedelta(days=random.randint(1, 15))
+        )
+        db.session.add(badge)
+
+    # Create alerts
+    alerts_data = [
+        ('savings', '🔥 Great Savings!', 'You saved ₹300 this week! Keep it up!', '🔥'),
+        ('budget_warning', '⚠️ Budget Alert', 'You\'ve spent 60% of your monthly budget', '⚠️'),
+        ('meal_tip', '💡 Smart Tip', 'Skipping delivery today saves ₹150', '💡'),
+        ('daily_summary', '📊 Daily Summary', 'Today\'s spending: ₹100 | Remaining: ₹167', '📊'),
+    ]
+    for atype, atitle, amsg, aicon in alerts_data:
+        create_alert(demo_user.id, atype, atitle, amsg, aicon)
+
+    # Create savings goal
+    goal = SavingsGoal(
+        user_id=demo_user.id,
+        name='New Headphones',
+        target_amount=2000.0,
+        current_amount=850.0,
+        deadline=today + timedelta(days=45)
+    )
+    db.session.add(goal)
+
+    # Seed rows bypass the ledger, so build the demo user's rollup in one pass
+    rebuild_daily_spend(demo_user.id)
+    write_envelopes(budget, {
+        'Food': 4000, 'Travel': 1500, 'Academic': 1000,
+        'Entertainment': 1000, 'Shopping': 0, 'Health': 0, 'Misc': 500
+    })
+
+    db.session.commit()
+    return demo_user
@@ -0,0 +1,271 @@
+"""Per-user view cache keyed by ``User.data_version``.
+
+:func:`cached_view` stores what a page computes from a user's data (plain
+dicts, lists and numbers) under the view's data ETag: view, user id,
+data version and today's date (see app.versioning). Every write to the
+user's data bumps the version, so a changed user simply looks up a new
+key and old entries are never read again; nothing has to be deleted.
+That holds across processes too, because each request reads the
+current version from the users row it loads anyway.
+
+Values are pickled, so each backend knows their size:
+
+* ``memory``: an LRU per process, bounded by ``CACHE_MAX_MB``.
+* ``filesystem``: one file per entry under ``CACHE_DIR`` (default
+  ``<instance>/view-cache``), shared by every worker on the host. When the
+  directory outgrows ``CACHE_MAX_MB`` the least recently read files are
+  deleted. Loading a pickle can run code, so the directory must belong to
+  the app's user and be closed to everyone else; it is created mode 0700.
+* ``none``: always builds.
+
+Hits, misses, stores and evictions are counted per process in
+:data:`cache_stats` and served at /admin/api/cache.
+"""
+import os
+import stat
+import pickle
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from flask import current_app
+
+PRUNE_EVERY = 200
+
+
+class CacheStats:
+    """Per-process counters, overall and per view."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.evictions = 0
+            self.errors = 0
+            self.views = {}
+
+    def record(self, view, outcome):
+        """outcome is 'hits', 'misses' or 'stores'."""
+        with self._lock:
+            entry = self.views.setdefault(view, {'hits': 0, 'misses': 0, 'stores': 0})
+            entry[outcome] += 1
+
+    def count(self, field, amount=1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def snapshot(self):
+        with self._lock:
+            hits = sum(v['hits'] for v in self.views.values())
+            misses = sum(v['misses'] for v in self.views.values())
+            return {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None,
+                'evictions': self.evictions,
+                'errors': self.errors,
+                'views': {name: dict(entry) for name, entry in sorted(self.views.items())},
+            }
+
+
+cache_stats = CacheStats()
+
+
+class MemoryCache:
+    """LRU over pickled values, evicting the oldest entries past ``max_bytes``."""
+
+    name = 'memory'
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def set(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = data
+            self._bytes += len(data)
+            evicted = 0
+            while self._bytes > self.max_bytes:
+                _, dropped = self._entries.popitem(last=False)
+                self._bytes -= len(dropped)
+                evicted += 1
+        if evicted:
+            cache_stats.count('evictions', evicted)
+
+    def usage(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'max_bytes': self.max_bytes}
+
+
+class FileSystemCache:
+    """One file per entry, shared by every process that points at ``directory``.
+
+    Reads touch the file's mtime, so pruning by mtime drops the least
+    recently used entries first. Each process prunes every PRUNE_EVERY
+    stores.
+    """
+
+    name = 'filesystem'
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._stores = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        check_private(directory)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def set(self, key, data):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        with self._lock:
+            self._stores += 1
+            due = self._stores % PRUNE_EVERY == 0
+        if due:
+            self.prune()
+
+    def _files(self):
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.startswith('.tmp-'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def prune(self):
+        """Delete the least recently used files until the directory is under max_bytes."""
+        files = self._files()
+        total = sum(size for _, size, _ in files)
+        evicted = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        if evicted:
+            cache_stats.count('evictions', evicted)
+        return evicted
+
+    def usage(self):
+        files = self._files()
+        return {'entries': len(files), 'bytes': sum(size for _, size, _ in files),
+                'max_bytes': self.max_bytes, 'directory': self.directory}
+
+
+def check_private(directory):
+    """Refuse a cache directory another user owns or can write to."""
+    info = os.stat(directory)
+    if hasattr(os, 'getuid') and info.st_uid != os.getuid():
+        raise RuntimeError(f'CACHE_DIR {directory} is owned by another user')
+    if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise RuntimeError(f'CACHE_DIR {directory} is writable by other users; chmod 700 it')
+
+
+class NullCache:
+    name = 'none'
+
+    def get(self, key):
+        return None
+
+    def set(self, key, data):
+        pass
+
+    def usage(self):
+        return {'entries': 0, 'bytes': 0}
+
+
+def plain_rows(objects, *properties):
+    """ORM rows as dicts of their column values plus ``properties``, so they
+    can be cached. Templates read ``row.name`` from a dict just the same."""
+    rows = []
+    for obj in objects:
+        columns = obj.__mapper__.column_attrs
+        row = {attr.key: getattr(obj, attr.key) for attr in columns}
+        row.update((name, getattr(obj, name)) for name in properties)
+        rows.append(row)
+    return rows
+
+
+def make_backend(config, default_dir=None):
+    kind = config['CACHE_BACKEND']
+    max_bytes = config['CACHE_MAX_MB'] * 1024 * 1024
+    if kind == 'memory':
+        return MemoryCache(max_bytes)
+    if kind == 'filesystem':
+        return FileSystemCache(config['CACHE_DIR'] or default_dir, max_bytes)
+    if kind == 'none':
+        return NullCache()
+    raise ValueError(f'Unknown CACHE_BACKEND: {kind}')
+
+
+def init_cache(app):
+    app.extensions['view_cache'] = make_backend(app.config, os.path.join(app.instance_path, 'view-cache'))
+
+
+def cached_view(user, view, build):
+    """build() for this user's current data, from the cache when it's unchanged."""
+    from app.versioning import data_etag
+    backend = current_app.extensions['view_cache']
+    key = data_etag(user, view)
+    try:
+        data = backend.get(key)
+        if data is not None:
+            value = pickle.loads(data)
+            cache_stats.record(view, 'hits')
+            return value
+    except Exception:
+        cache_stats.count('errors')
+        current_app.logger.exception('view cache read failed for %s', view)
+    cache_stats.record(view, 'misses')
+
+    value = build()
+    try:
+        backend.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        cache_stats.record(view, 'stores')
+    except Exception:
+        cache_stats.count('errors')
+        current_app.logger.exception('view cache write failed for %s', view)
+    return value
@@ -0,0 +1,188 @@
+import click
+from app.extensions import db
+
+
+def register_commands(app):
+    """Attach maintenance commands to ``flask``."""
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create missing tables and seed the demo account."""
+        from app.bootstrap import init_db
+        init_db()
+        click.echo('Database initialised.')
+
+    @app.cli.command('seed-demo')
+    def seed_demo_command():
+        """Seed the demo account if it doesn't exist."""
+        from app.bootstrap import seed_demo_data
+        user = seed_demo_data()
+        click.echo(f'Demo user ready: {user.email}')
+
+    @app.cli.command('seed-meals')
+    def seed_meals_command():
+        """Load the built-in meal suggestions if meal_items is empty."""
+        from app.bootstrap import seed_meal_catalog
+        click.echo(f'Added {seed_meal_catalog()} meal items.')
+
+    @app.cli.command('rebuild-rollups')
+    @click.option('--user-id', type=int, default=None, help='Only rebuild this user.')
+    def rebuild_rollups(user_id):
+        """Recompute the daily_spend rollup and envelope spent from the transactions table."""
+        from app.models import User
+        from app.ledger import rebuild_daily_spend
+        from app.envelopes import rebuild_envelopes
+        from app.versioning import bump_data_versions
+        count = rebuild_daily_spend(user_id)
+        budgets = rebuild_envelopes(user_id)
+        # Cached pages were built from the old figures
+        bump_data_versions([user_id] if user_id else [uid for (uid,) in db.session.query(User.id)])
+        db.session.commit()
+        click.echo(f'Rebuilt {count} daily_spend rows and envelopes for {budgets} budgets.')
+
+    @app.cli.command('close-day')
+    @click.option('--date', 'as_of', type=click.DateTime(['%Y-%m-%d']), default=None,
+                  help='Last closed day (defaults to yesterday).')
+    def close_day(as_of):
+        """Fold closed days into every user's persisted streak."""
+        from app.models import User
+        from app.streaks import advance_streaks
+        users = User.query.all()
+        advance_streaks(users, as_of.date() if as_of else None)
+        db.session.commit()
+        click.echo(f'Advanced streaks for {len(users)} users.')
+
+    @app.cli.command('close-month')
+    @click.option('--month', type=click.DateTime(['%Y-%m']), default=None,
+                  help='Month to close, YYYY-MM (defaults to last month).')
+    def close_month_command(month):
+        """Write every user's summary for a closed month."""
+        from datetime import date, timedelta
+        from app.summaries import close_month
+        if month is None:
+            month = date.today().replace(day=1) - timedelta(days=1)
+        try:
+            written = close_month(month.year, month.month)
+        except ValueError as exc:
+            raise click.ClickException(str(exc))
+        db.session.commit()
+        click.echo(f'Wrote {written} summaries for {month.year}-{month.month:02d}.')
+
+    @app.cli.command('backfill-summaries')
+    @click.option('--user-id', type=int, default=None, help='Only backfill this user.')
+    @click.option('--rebuild', is_flag=True, help='Rewrite months that are already stored.')
+    def backfill_summaries(user_id, rebuild):
+        """Summarise every closed month that has no summary yet."""
+        from app.summaries import backfill
+        written = backfill(user_id, rebuild)
+        db.session.commit()
+        click.echo(f'Wrote {written} monthly summaries.')
+
+    @app.cli.command('recount-alerts')
+    @click.option('--user-id', type=int, default=None, help='Only repair this user.')
+    def recount_alerts(user_id):
+        """Repair users.unread_alert_count from the alerts table."""
+        from app.notifications import recount_unread_alerts
+        count = recount_unread_alerts(user_id)
+        db.session.commit()
+        click.echo(f'Recounted unread alerts for {count} users.')
+
+    @app.cli.command('run-alerts')
+    @click.option('--date', 'as_of', type=click.DateTime(['%Y-%m-%d']), default=None,
+                  help='Evaluate as of this day (defaults to today).')
+    @click.option('--rule', 'rule_names', multiple=True, help='Only run these rules (repeatable).')
+    def run_alerts(as_of, rule_names):
+        """Evaluate the alert rules for every user; safe to run repeatedly."""
+        from app.alert_rules import RULES, evaluate
+        rules = [rule for rule in RULES if not rule_names or rule.name in rule_names]
+        created = evaluate('schedule', as_of=as_of.date() if as_of else None, rules=rules)
+        db.session.commit()
+        click.echo(f'Created {created} alerts.')
+
+    @app.cli.command('import-expenses')
+    @click.argument('email')
+    @click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+    @click.option('--batch-size', type=int, default=1000, show_default=True)
+    def import_expenses(email, csv_file, batch_size):
+        """Stream a CSV of expenses into a user's account."""
+        from app.models import User
+        from app.blueprints.expenses.importer import import_transactions
+        user = User.query.filter_by(email=email).first()
+        if user is None:
+            raise click.ClickException(f'No user with email {email}')
+        result = import_transactions(user, csv_file, batch_size=batch_size)
+        for line, message in result.errors:
+            click.echo(f'line {line}: {message}', err=True)
+        click.echo(f'Imported {result.imported} rows, skipped {result.failed}.')
+
+    @app.cli.group('jobs')
+    def jobs_group():
+        """Run and inspect background jobs."""
+
+    @jobs_group.command('work')
+    @click.option('--threads', default=2, show_default=True, help='Jobs run at once per process.')
+    @click.option('--processes', default=1, show_default=True, help='Forked worker processes.')
+    @click.option('--poll', 'poll_interval', default=1.0, show_default=True, help='Seconds between polls when idle.')
+    @click.option('--once', is_flag=True, help='Run every due job, then exit (for cron).')
+    def jobs_work(threads, processes, poll_interval, once):
+        """Run queued jobs until interrupted."""
+        import signal
+        from flask import current_app
+        from app.jobs import Worker, run_worker_process
+
+        def interrupt(signum, frame):
+            raise KeyboardInterrupt
+
+        # SIGTERM (and forked children inherit this) finishes running jobs, then exits
+        signal.signal(signal.SIGTERM, interrupt)
+        app = current_app._get_current_object()
+        if once or processes <= 1:
+            click.echo(f'Job worker running {threads} thread(s).')
+            Worker(app, threads, poll_interval, once=once).run()
+            return
+        import multiprocessing
+        context = multiprocessing.get_context('fork')
+        children = [context.Process(target=run_worker_process, args=(app, threads, poll_interval))
+                    for _ in range(processes)]
+        for child in children:
+            child.start()
+        click.echo(f'Job worker running {processes} processes x {threads} thread(s).')
+        try:
+            for child in children:
+                child.join()
+        except KeyboardInterrupt:
+            for child in children:
+                child.terminate()
+                child.join()
+
+    @jobs_group.command('status')
+    def jobs_status():
+        """Show how many jobs are in each state."""
+        from app.jobs import queue_counts
+        counts = queue_counts()
+        for state in ('queued', 'running', 'succeeded', 'failed'):
+            click.echo(f'{state:<10} {counts.get(state, 0)}')
+
+    @jobs_group.command('retry')
+    @click.argument('job_ids', type=int, nargs=-1)
+    def jobs_retry(job_ids):
+        """Queue failed jobs again (all of them if no ids are given)."""
+        from datetime import datetime
+        from app.models import Job
+        query = db.update(Job).where(Job.state == 'failed')
+        if job_ids:
+            query = query.where(Job.id.in_(job_ids))
+        count = db.session.execute(query.values(
+            state='queued', attempts=0, run_after=datetime.utcnow(), finished_at=None
+        )).rowcount
+        db.session.commit()
+        click.echo(f'Requeued {count} jobs.')
+
+    @jobs_group.command('prune')
+    @click.option('--days', default=7, show_default=True, help='Keep finished jobs this recent.')
+    def jobs_prune(days):
+        """Delete finished jobs older than --days."""
+        from app.jobs import prune
+        count = prune(days)
+        db.session.commit()
+        click.echo(f'Deleted {count} finished jobs.')
@@ -6,6 +6,23 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///budget_bite.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Engine profile: serverless, worker or sqlite-local (see app/dbprofiles.py).
+    # Blank picks one from the URL and environment.
+    DB_PROFILE = os.environ.get('DB_PROFILE', '')
+    # Seconds between pool telemetry log lines per process; 0 disables them
+    POOL_STATS_LOG_SECONDS = int(os.environ.get('POOL_STATS_LOG_SECONDS', '300'))
+
+    # Per-request query counts and DB time (Server-Timing + /admin/api/queries).
+    # A statement repeated more than SQL_REPEAT_THRESHOLD times in one request is
+    # logged as a likely N+1 in debug mode, or everywhere with SQL_REPEAT_WARN=1.
+    SQL_PROFILER = os.environ.get('SQL_PROFILER', '1') == '1'
+    SQL_REPEAT_THRESHOLD = int(os.environ.get('SQL_REPEAT_THRESHOLD', '5'))
+    SQL_REPEAT_WARN = os.environ.get('SQL_REPEAT_WARN', '0') == '1'
+
+    # Create tables and seed the demo user inside create_app(). Off by default so
+    # serverless cold starts skip DDL; run `flask init-db` or `flask db upgrade` instead.
+    AUTO_BOOTSTRAP = os.environ.get('AUTO_BOOTSTRAP', '0') == '1'
+
     # Fix Postgres URI prefix (Vercel/Heroku sometimes provide postgres:// instead of postgresql://)
     @classmethod
     def fix_db_url(cls):
@@ -23,6 +40,32 @@ class Config:
     GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID', '')
     GOOGLE_CLIENT_SECRET = os.environ.get('GOOGLE_CLIENT_SECRET', '')
 
+    # Evaluate the commit-triggered alert rules after each response that wrote
+    # transactions. Off leaves everything to the scheduled `flask run-alerts`.
+    ALERT_RULES_AFTER_COMMIT = os.environ.get('ALERT_RULES_AFTER_COMMIT', '1') == '1'
+
+    # Who runs background jobs (app/jobs.py): "after-response" (the enqueuing
+    # request, once its response is sent; works on any deployment, including
+    # Vercel where nothing runs between requests), "thread" (JOBS_THREADS
+    # threads in the web process) or "worker" (a separate `flask jobs work`
+    # process; only choose it when one is running)
+    JOBS_RUNNER = os.environ.get('JOBS_RUNNER') or 'after-response'
+    JOBS_THREADS = int(os.environ.get('JOBS_THREADS', '2'))
+    # Seconds a job may stay running before it is assumed abandoned and requeued
+    JOBS_LOCK_TIMEOUT = int(os.environ.get('JOBS_LOCK_TIMEOUT', '600'))
+
+    # Cache for per-user page data, keyed by data_version (app/cache.py):
+    # "memory" (LRU per process), "filesystem" (CACHE_DIR, shared by every
+    # worker on the host) or "none". CACHE_MAX_MB bounds either backend.
+    # CACHE_DIR defaults to <instance>/view-cache; entries are pickles, so it
+    # must be private to the app's user (app/cache.py refuses anything else)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_MAX_MB = int(os.environ.get('CACHE_MAX_MB', '32'))
+    CACHE_DIR = os.environ.get('CACHE_DIR')
+
+    # Comma-separated emails allowed into /admin
+    ADMIN_EMAILS = [e.strip().lower() for e in os.environ.get('ADMIN_EMAILS', '').split(',') if e.strip()]
+
     # App settings
     DEFAULT_CURRENCY = '₹'
     CATEGORIES = ['Food', 'Travel', 'Academic', 'Entertainment', 'Shopping', 'Health', 'Misc']
@@ -31,6 +74,9 @@ class Config:
     LIVING_TYPES = ['Hostel', 'PG', 'Home', 'Flat']
     FOOD_PREFERENCES = ['Vegetarian', 'Non-Vegetarian', 'Vegan', 'Eggetarian']
 
+    # Seconds between checks of the meal_items catalog version by each process
+    MEAL_CATALOG_TTL = int(os.environ.get('MEAL_CATALOG_TTL', '30'))
+
 
 # Apply DB URL fix at import time
 Config.SQLALCHEMY_DATABASE_URI = Config.fix_db_url()
@@ -0,0 +1,35 @@
+"""Half-open ``[start, end)`` datetime ranges for index-friendly filters.
+
+Filtering with ``db.func.date(col) == d`` or ``db.extract('month', col)``
+wraps the column in a function, which stops SQLite and Postgres from
+using an index on it. Comparing the bare column against range bounds
+keeps the predicate sargable.
+"""
+from datetime import date, datetime, time, timedelta
+
+
+def _start_of(d):
+    return datetime.combine(d, time.min)
+
+
+def day_range(d):
+    """Return the [start, end) datetimes covering calendar day ``d``."""
+    return _start_of(d), _start_of(d + timedelta(days=1))
+
+
+def days_range(first, last):
+    """Return the [start, end) datetimes covering ``first`` through ``last`` inclusive."""
+    return _start_of(first), _start_of(last + timedelta(days=1))
+
+
+def month_range(year, month):
+    """Return the [start, end) datetimes covering a calendar month."""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return _start_of(start), _start_of(end)
+
+
+def within(column, bounds):
+    """SQL predicate for ``bounds[0] <= column < bounds[1]``."""
+    start, end = bounds
+    return (column >= start) & (column < end)
@@ -0,0 +1,314 @@
+"""Database engine profiles and connection pool telemetry.
+
+The same code runs in three very different places, so the engine is
+configured from a named profile rather than SQLAlchemy's defaults:
+
+``serverless``
+    Vercel functions. Instances are frozen between invocations and then
+    discarded, so any idle pooled connection is a connection Postgres keeps
+    open for nothing. Uses NullPool: every checkout opens a connection and
+    every checkin closes it. Point DATABASE_URL at the provider's pooler
+    (PgBouncer / Neon / Supabase pooled endpoint) to keep connects cheap.
+    Short statement and idle-in-transaction timeouts stop a frozen
+    instance from holding locks. They are applied with ``SET`` when a
+    connection opens rather than the libpq ``options`` startup parameter,
+    which transaction-mode poolers reject.
+``worker``
+    gunicorn and other long-lived processes. A bounded LIFO QueuePool
+    (``DB_POOL_SIZE`` + ``DB_MAX_OVERFLOW``), pre-ping so connections
+    killed by a failover are replaced instead of surfacing as errors, and
+    recycling before typical server/proxy idle limits.
+``sqlite-local``
+    Local development. WAL journal so the dev server can read while a CLI
+    command writes, a busy timeout instead of immediate "database is
+    locked" errors, and synchronous=NORMAL.
+
+``DB_PROFILE`` picks one explicitly; otherwise SQLite URLs get
+``sqlite-local``, Vercel/Lambda get ``serverless`` and anything else
+``worker``. Setting ``SQLALCHEMY_ENGINE_OPTIONS`` in the config skips
+profiles entirely.
+
+Every profile uses a timed pool class so checkout wait, timeouts,
+overflow and connection churn are counted in :data:`pool_stats`. The
+numbers are per process; they are logged every ``POOL_STATS_LOG_SECONDS``
+and served at ``/admin/api/pool``.
+"""
+import os
+import time
+import threading
+from collections import deque
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, NullPool, StaticPool
+
+PROFILES = ('serverless', 'worker', 'sqlite-local')
+
+
+class PoolStats:
+    """Per-process pool counters. Wait times keep the last ``window`` samples."""
+
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self._window = window
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.monotonic()
+            self.checkouts = 0
+            self.timeouts = 0
+            self.opened = 0
+            self.closed = 0
+            self.invalidated = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.waits = deque(maxlen=self._window)
+            self.in_use = 0
+            self.peak_in_use = 0
+            self.overflow = 0
+            self.peak_overflow = 0
+            self.pool_size = None
+            self.max_overflow = None
+
+    def record_checkout(self, pool, wait_ms):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            self.waits.append(wait_ms)
+            self._observe(pool)
+
+    def record_timeout(self, pool):
+        with self._lock:
+            self.timeouts += 1
+            self._observe(pool)
+
+    def record_checkin(self, pool):
+        with self._lock:
+            self._observe(pool)
+
+    def count(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def _observe(self, pool):
+        if isinstance(pool, QueuePool):
+            self.pool_size = pool.size()
+            self.max_overflow = pool._max_overflow
+            self.in_use = pool.checkedout()
+            self.overflow = max(0, pool.overflow())
+        else:
+            self.in_use = self.opened - self.closed
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        self.peak_overflow = max(self.peak_overflow, self.overflow)
+
+    def snapshot(self):
+        with self._lock:
+            waits = sorted(self.waits)
+            uptime = time.monotonic() - self.started
+            minutes = max(uptime / 60, 1 / 60)
+            return {
+                'uptime_s': round(uptime, 1),
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_ms': {
+                    'avg': round(self.wait_total_ms / self.checkouts, 2) if self.checkouts else 0.0,
+                    'p50': _percentile(waits, 50),
+                    'p95': _percentile(waits, 95),
+                    'p99': _percentile(waits, 99),
+                    'max': round(self.wait_max_ms, 2),
+                },
+                'connections': {
+                    'opened': self.opened,
+                    'closed': self.closed,
+                    'invalidated': self.invalidated,
+                    'open': self.opened - self.closed,
+                    'opened_per_min': round(self.opened / minutes, 2),
+                },
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                'overflow': self.overflow,
+                'peak_overflow': self.peak_overflow,
+                'pool_size': self.pool_size,
+                'max_overflow': self.max_overflow,
+            }
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 2)
+
+
+pool_stats = PoolStats()
+
+
+class _TimedCheckout:
+    """Times every checkout, including the connect itself when the pool opens one."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.record_timeout(self)
+            raise
+        pool_stats.record_checkout(self, (time.perf_counter() - started) * 1000)
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        pool_stats.record_checkin(self)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedNullPool(_TimedCheckout, NullPool):
+    pass
+
+
+class TimedStaticPool(_TimedCheckout, StaticPool):
+    pass
+
+
+def _env_int(name, default):
+    value = os.environ.get(name, '').strip()
+    return int(value) if value else default
+
+
+def select_profile(url, environ=os.environ):
+    """The profile name for ``url``: DB_PROFILE if set, else guessed from the environment."""
+    profile = environ.get('DB_PROFILE', '').strip()
+    if profile:
+        if profile not in PROFILES:
+            raise ValueError(f'Unknown DB_PROFILE "{profile}"; expected one of {", ".join(PROFILES)}')
+        return profile
+    if url.startswith('sqlite'):
+        return 'sqlite-local'
+    if environ.get('VERCEL') or environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+        return 'serverless'
+    return 'worker'
+
+
+def postgres_timeouts(profile):
+    """{setting: milliseconds} to SET on every new Postgres connection for ``profile``."""
+    if profile == 'serverless':
+        return {'statement_timeout': _env_int('DB_STATEMENT_TIMEOUT_MS', 10000),
+                'idle_in_transaction_session_timeout': 15000}
+    if profile == 'worker':
+        return {'statement_timeout': _env_int('DB_STATEMENT_TIMEOUT_MS', 30000),
+                'idle_in_transaction_session_timeout': 60000}
+    return {}
+
+
+def engine_options(profile, url):
+    """SQLALCHEMY_ENGINE_OPTIONS for ``profile`` on the database at ``url``."""
+    postgres = url.startswith('postgresql')
+    sqlite = url.startswith('sqlite')
+
+    if profile == 'serverless':
+        options = {'poolclass': TimedNullPool, 'pool_pre_ping': False}
+        if postgres:
+            options['connect_args'] = {'connect_timeout': 5}
+        return options
+
+    if profile == 'worker':
+        options = {
+            'poolclass': TimedQueuePool,
+            'pool_size': _env_int('DB_POOL_SIZE', 5),
+            'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+            'pool_timeout': _env_int('DB_POOL_TIMEOUT', 10),
+            'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+            'pool_pre_ping': True,
+            'pool_use_lifo': True,
+        }
+        if postgres:
+            options['connect_args'] = {'connect_timeout': 10}
+        return options
+
+    if profile == 'sqlite-local':
+        if not sqlite:
+            raise ValueError('The sqlite-local profile needs a sqlite:// DATABASE_URL')
+        if url in ('sqlite://', 'sqlite:///:memory:'):
+            return {'poolclass': TimedStaticPool, 'connect_args': {'check_same_thread': False}}
+        return {'poolclass': TimedQueuePool, 'pool_size': 5, 'max_overflow': 10,
+                'connect_args': {'timeout': 15}}
+
+    raise ValueError(f'Unknown DB_PROFILE "{profile}"; expected one of {", ".join(PROFILES)}')
+
+
+def apply_profile(app):
+    """Fill SQLALCHEMY_ENGINE_OPTIONS from the selected profile. Call before db.init_app."""
+    url = app.config['SQLALCHEMY_DATABASE_URI']
+    if app.config.get('SQLALCHEMY_ENGINE_OPTIONS'):
+        app.config['DB_PROFILE'] = 'custom'
+        return
+    profile = app.config.get('DB_PROFILE') or select_profile(url)
+    app.config['DB_PROFILE'] = profile
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(profile, url)
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA busy_timeout=5000')
+    cursor.close()
+
+
+def _postgres_settings(settings):
+    def apply_settings(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in settings.items():
+            cursor.execute(f'SET {name} = {int(value)}')
+        cursor.close()
+        # The driver opened a transaction for the SETs; don't hand it to the pool
+        dbapi_connection.commit()
+    return apply_settings
+
+
+def instrument_engine(app):
+    """Count connection churn on the app's engine, apply SQLite pragmas or
+    Postgres timeouts, and log pool_stats periodically. Call after db.init_app."""
+    from app.extensions import db
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'connect', lambda *args: pool_stats.count('opened'))
+    event.listen(engine, 'close', lambda *args: pool_stats.count('closed'))
+    event.listen(engine, 'close_detached', lambda *args: pool_stats.count('closed'))
+    event.listen(engine, 'invalidate', lambda *args: pool_stats.count('invalidated'))
+    if app.config['DB_PROFILE'] == 'sqlite-local':
+        event.listen(engine, 'connect', _sqlite_pragmas)
+    elif engine.dialect.name == 'postgresql':
+        settings = postgres_timeouts(app.config['DB_PROFILE'])
+        if settings:
+            event.listen(engine, 'connect', _postgres_settings(settings))
+
+    interval = app.config.get('POOL_STATS_LOG_SECONDS', 0)
+    if not interval:
+        return
+    last = {'at': time.monotonic()}
+
+    @app.after_request
+    def log_pool_stats(response):
+        now = time.monotonic()
+        if now - last['at'] >= interval:
+            last['at'] = now
+            app.logger.info(format_pool_stats(app.config['DB_PROFILE'], pool_stats.snapshot()))
+        return response
+
+
+def format_pool_stats(profile, stats):
+    wait = stats['wait_ms']
+    conns = stats['connections']
+    return (
+        f"pool profile={profile} checkouts={stats['checkouts']} timeouts={stats['timeouts']} "
+        f"wait_avg={wait['avg']}ms wait_p95={wait['p95']}ms wait_max={wait['max']}ms "
+        f"in_use={stats['in_use']} peak_in_use={stats['peak_in_use']} "
+        f"overflow={stats['overflow']} peak_overflow={stats['peak_overflow']} "
+        f"opened={conns['opened']} closed={conns['closed']} invalidated={conns['invalidated']} "
+        f"opened_per_min={conns['opened_per_min']}"
+    )
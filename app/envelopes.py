@@ -0,0 +1,131 @@
+"""Per-category budget envelopes.
+
+A monthly Budget has one BudgetEnvelope row per category. ``spent`` is
+moved by app.ledger in the same transaction as the Transaction write,
+so remaining-per-category and "over envelope" checks are single indexed
+reads (budgets by user/year/month, envelopes by budget/category). When
+envelopes are (re)written, ``spent`` starts from the daily_spend rollup
+for that month.
+"""
+from flask import current_app
+from app.extensions import db
+from app.models import Budget, BudgetEnvelope, DailySpend
+from app.daterange import month_range
+from app.versioning import bump_data_version
+
+DEFAULT_SHARES = (('Food', 0.50), ('Travel', 0.18), ('Academic', 0.12), ('Entertainment', 0.12))
+RESERVE_SHARE = 0.08
+
+
+def default_allocations(total):
+    return {category: total * share for category, share in DEFAULT_SHARES}
+
+
+def month_spend_by_category(user_id, year, month):
+    start, end = month_range(year, month)
+    rows = db.session.query(DailySpend.category, db.func.sum(DailySpend.total)).filter(
+        DailySpend.user_id == user_id, DailySpend.day >= start.date(), DailySpend.day < end.date()
+    ).group_by(DailySpend.category).all()
+    return {category: float(total or 0) for category, total in rows}
+
+
+def write_envelopes(budget, allocations):
+    """Make ``budget``'s envelopes match {category: allocated} with one batched
+    UPDATE, INSERT and DELETE."""
+    db.session.flush()
+    existing = dict(db.session.query(BudgetEnvelope.category, BudgetEnvelope.id)
+                    .filter(BudgetEnvelope.budget_id == budget.id))
+    new_categories = [category for category in allocations if category not in existing]
+    spent = month_spend_by_category(budget.user_id, budget.year, budget.month) if new_categories else {}
+
+    table = BudgetEnvelope.__table__
+    updates = [{'row_id': existing[category], 'new_allocated': amount}
+               for category, amount in allocations.items() if category in existing]
+    if updates:
+        db.session.execute(
+            table.update().where(table.c.id == db.bindparam('row_id'))
+            .values(allocated=db.bindparam('new_allocated')),
+            updates
+        )
+    if new_categories:
+        db.session.execute(table.insert(), [
+            {'budget_id': budget.id, 'category': category, 'allocated': allocations[category],
+             'spent': spent.get(category, 0.0)}
+            for category in new_categories
+        ])
+    removed = [row_id for category, row_id in existing.items() if category not in allocations]
+    if removed:
+        db.session.execute(table.delete().where(table.c.id.in_(removed)))
+    db.session.expire(budget, ['envelopes'])
+    bump_data_version(budget.user_id)
+
+
+def _month_budget_ids(user_id, year, month):
+    return db.select(Budget.id).where(Budget.user_id == user_id, Budget.year == year, Budget.month == month)
+
+
+def bump_envelope(user_id, day, category, amount):
+    """Move ``spent`` on the envelope covering ``day`` and ``category``, if there is one."""
+    db.session.execute(
+        db.update(BudgetEnvelope).where(
+            BudgetEnvelope.category == (category or 'Misc'),
+            BudgetEnvelope.budget_id.in_(_month_budget_ids(user_id, day.year, day.month))
+        ).values(spent=BudgetEnvelope.spent + amount).execution_options(synchronize_session=False)
+    )
+
+
+def apply_envelope_deltas(user_id, deltas):
+    """Roll {(year, month, category): amount} into envelopes with one executemany UPDATE."""
+    if not deltas:
+        return
+    table = BudgetEnvelope.__table__
+    budgets = Budget.__table__
+    budget_ids = db.select(budgets.c.id).where(
+        budgets.c.user_id == user_id,
+        budgets.c.year == db.bindparam('b_year'),
+        budgets.c.month == db.bindparam('b_month')
+    )
+    db.session.execute(
+        table.update().where(
+            table.c.category == db.bindparam('b_category'), table.c.budget_id.in_(budget_ids)
+        ).values(spent=table.c.spent + db.bindparam('d_spent')),
+        [{'b_year': year, 'b_month': month, 'b_category': category or 'Misc', 'd_spent': amount}
+         for (year, month, category), amount in deltas.items()]
+    )
+
+
+def get_envelope(user_id, category, day):
+    """The envelope for ``category`` in the month containing ``day``, or None."""
+    return BudgetEnvelope.query.join(Budget).filter(
+        Budget.user_id == user_id, Budget.year == day.year, Budget.month == day.month,
+        BudgetEnvelope.category == category
+    ).first()
+
+
+def user_categories(user_id):
+    """Config.CATEGORIES followed by the user's own envelope categories."""
+    builtin = list(current_app.config.get('CATEGORIES', []))
+    custom = db.session.query(BudgetEnvelope.category).join(Budget).filter(
+        Budget.user_id == user_id, BudgetEnvelope.category.notin_(builtin)
+    ).distinct().order_by(BudgetEnvelope.category)
+    return builtin + [category for (category,) in custom]
+
+
+def rebuild_envelopes(user_id=None):
+    """Recompute every envelope's ``spent`` from daily_spend. Returns the number of budgets."""
+    query = db.session.query(Budget.id, Budget.user_id, Budget.year, Budget.month)
+    if user_id is not None:
+        query = query.filter(Budget.user_id == user_id)
+    budgets = query.all()
+    table = BudgetEnvelope.__table__
+    for budget_id, uid, year, month in budgets:
+        spent = month_spend_by_category(uid, year, month)
+        rows = db.session.query(BudgetEnvelope.id, BudgetEnvelope.category)\
+            .filter(BudgetEnvelope.budget_id == budget_id).all()
+        if rows:
+            db.session.execute(
+                table.update().where(table.c.id == db.bindparam('row_id'))
+                .values(spent=db.bindparam('new_spent')),
+                [{'row_id': row_id, 'new_spent': spent.get(category, 0.0)} for row_id, category in rows]
+            )
+    return len(budgets)
@@ -0,0 +1,327 @@
+"""Background jobs backed by the ``jobs`` table.
+
+Request handlers call :func:`enqueue` and commit; the job row is the
+queue, so there is no broker and jobs run wherever the database does.
+A worker claims the oldest due job with a conditional UPDATE (``state``
+must still be ``queued``), so any number of worker threads or processes
+can share the table. On Postgres the candidate SELECT also uses
+``FOR UPDATE SKIP LOCKED``.
+
+Handlers are listed in :data:`HANDLERS` and take the :class:`Job`. They
+write through the session without committing and return a JSON-able
+result; the worker commits their writes together with the job's
+``succeeded`` state. A handler that raises is rolled back and retried
+after a growing delay until ``max_attempts``, then marked ``failed``.
+A job left ``running`` longer than ``JOBS_LOCK_TIMEOUT`` (its worker
+died) is put back in the queue.
+
+Who runs the jobs depends on ``JOBS_RUNNER``:
+
+* ``after-response`` (default): the request that enqueued a job runs it
+  once its response has gone out, so jobs run without any extra process
+  (and on Vercel, where nothing runs between requests). Each drain also
+  requeues stale jobs and runs a few other due ones (retries), and a
+  request at least once a minute drains even if it enqueued nothing.
+* ``thread``: worker threads inside the web process, started on its
+  first request (``python run.py``).
+* ``worker``: a separate ``flask jobs work`` process, for gunicorn
+  deployments that run one.
+"""
+import os
+import json
+import socket
+import logging
+import threading
+from time import monotonic
+from datetime import datetime, timedelta
+from importlib import import_module
+from flask import current_app, g, has_request_context, after_this_request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models import Job
+
+logger = logging.getLogger(__name__)
+
+# kind: "module:function"
+HANDLERS = {
+    'meals.auto_plan': 'app.blueprints.meals.planner:plan_week_job',
+    'streaks.refresh': 'app.streaks:refresh_streak_job',
+    'summaries.rebuild': 'app.summaries:rebuild_summaries_job',
+}
+RETRY_BASE_SECONDS = 10
+CLAIM_CANDIDATES = 5
+# Due jobs an after-response drain runs beyond the ones its request enqueued
+DRAIN_BACKLOG = 5
+
+
+def enqueue(kind, payload=None, user_id=None, delay=0, max_attempts=3, unique=False):
+    """Add a job to the session; it is queued when the caller commits.
+
+    With ``unique``, a queued or running job of the same kind for the same
+    user is returned instead of adding another. A job running longer than
+    ``JOBS_LOCK_TIMEOUT`` doesn't count: its worker probably died.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    if unique:
+        locked_since = datetime.utcnow() - timedelta(seconds=current_app.config['JOBS_LOCK_TIMEOUT'])
+        existing = Job.query.filter(
+            Job.kind == kind, Job.user_id == user_id,
+            db.or_(Job.state == 'queued', db.and_(Job.state == 'running', Job.locked_at >= locked_since)),
+        ).order_by(Job.id).first()
+        if existing is not None:
+            return existing
+    job = Job(
+        kind=kind, user_id=user_id, payload=json.dumps(payload or {}), state='queued',
+        attempts=0, max_attempts=max_attempts,
+        run_after=datetime.utcnow() + timedelta(seconds=delay),
+    )
+    db.session.add(job)
+    db.session.info['jobs_enqueued'] = db.session.info.get('jobs_enqueued', 0) + 1
+    return job
+
+
+def handler_for(kind):
+    module, name = HANDLERS[kind].split(':')
+    return getattr(import_module(module), name)
+
+
+def claim(worker_id, now=None):
+    """Mark the oldest due job as running for ``worker_id`` and return it, or None."""
+    now = now or datetime.utcnow()
+    candidates = db.select(Job.id).where(
+        Job.state == 'queued', Job.run_after <= now
+    ).order_by(Job.run_after, Job.id).limit(CLAIM_CANDIDATES)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        candidates = candidates.with_for_update(skip_locked=True)
+    for job_id in db.session.scalars(candidates).all():
+        claimed = db.session.execute(
+            db.update(Job).where(Job.id == job_id, Job.state == 'queued').values(
+                state='running', attempts=Job.attempts + 1, locked_by=worker_id, locked_at=now,
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+        if claimed:
+            db.session.commit()
+            return db.session.get(Job, job_id)
+    db.session.commit()
+    return None
+
+
+def execute(job):
+    """Run a claimed job's handler and record the outcome."""
+    job_id, kind = job.id, job.kind
+    try:
+        result = handler_for(kind)(job)
+        job.state = 'succeeded'
+        job.result = json.dumps(result) if result is not None else None
+        job.error = None
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        return True
+    except Exception as exc:
+        db.session.rollback()
+        logger.exception('job %s (%s) failed', job_id, kind)
+        job = db.session.get(Job, job_id)
+        job.error = f'{type(exc).__name__}: {exc}'[:500]
+        job.locked_by = job.locked_at = None
+        if job.attempts >= job.max_attempts:
+            job.state = 'failed'
+            job.finished_at = datetime.utcnow()
+        else:
+            job.state = 'queued'
+            job.run_after = datetime.utcnow() + timedelta(seconds=retry_delay(job.attempts))
+        db.session.commit()
+        return False
+
+
+def retry_delay(attempts):
+    """Seconds before the next try: 10, 40, 160, ..."""
+    return RETRY_BASE_SECONDS * 4 ** (attempts - 1)
+
+
+def run_next(worker_id):
+    """Claim and run one job. Returns False when nothing was due."""
+    job = claim(worker_id)
+    if job is None:
+        return False
+    execute(job)
+    return True
+
+
+def requeue_stale(timeout_seconds, now=None):
+    """Requeue jobs left running past the timeout, or fail them if they are
+    out of attempts. Returns how many were released."""
+    now = now or datetime.utcnow()
+    stale = db.and_(Job.state == 'running', Job.locked_at < now - timedelta(seconds=timeout_seconds))
+    released = db.session.execute(
+        db.update(Job).where(stale, Job.attempts < Job.max_attempts).values(
+            state='queued', locked_by=None, locked_at=None, run_after=now, error='worker timed out',
+        ).execution_options(synchronize_session=False)
+    ).rowcount
+    released += db.session.execute(
+        db.update(Job).where(stale).values(
+            state='failed', locked_by=None, locked_at=None, finished_at=now, error='worker timed out',
+        ).execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return released
+
+
+def queue_counts():
+    """{state: count} over the whole table."""
+    rows = db.session.query(Job.state, db.func.count(Job.id)).group_by(Job.state).all()
+    return {state: count for state, count in rows}
+
+
+def prune(older_than_days):
+    """Delete finished jobs older than the cutoff; the caller commits."""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    return db.session.execute(
+        db.delete(Job).where(Job.state.in_(('succeeded', 'failed')), Job.finished_at < cutoff)
+    ).rowcount
+
+
+class Worker:
+    """``threads`` polling loops, each running one job at a time in its own app context."""
+
+    def __init__(self, app, threads=2, poll_interval=1.0, once=False):
+        self.app = app
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.once = once
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for index in range(self.threads):
+            thread = threading.Thread(target=self._loop, args=(index,), name=f'jobs-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def run(self):
+        """Start the threads and block until they finish (``once``) or stop() is called."""
+        self.start()
+        try:
+            for thread in self._threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            self.stop()
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+
+    def _loop(self, index):
+        worker_id = f'{self.name}/{index}'
+        timeout = self.app.config['JOBS_LOCK_TIMEOUT']
+        next_sweep = 0.0
+        while not self._stop.is_set():
+            with self.app.app_context():
+                try:
+                    # One thread per worker returns jobs abandoned by dead workers
+                    if index == 0 and monotonic() >= next_sweep:
+                        requeue_stale(timeout)
+                        next_sweep = monotonic() + min(60, timeout)
+                    ran = run_next(worker_id)
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception('job worker %s hit a database error', worker_id)
+                    ran = False
+            if not ran:
+                if self.once:
+                    return
+                self._stop.wait(self.poll_interval)
+
+
+def run_worker_process(app, threads, poll_interval):
+    """Entry point for ``flask jobs work --processes``: a forked child with its own connections."""
+    with app.app_context():
+        db.engine.dispose(close=False)
+    Worker(app, threads, poll_interval).run()
+
+
+def init_jobs(app):
+    """Start in-process worker threads on the first request when JOBS_RUNNER is
+    ``thread``; with ``after-response``, sweep the queue after a request now and then."""
+    if app.config['JOBS_RUNNER'] == 'after-response':
+        _init_sweep(app)
+    if app.config['JOBS_RUNNER'] != 'thread':
+        return
+    lock = threading.Lock()
+    started = []
+
+    @app.before_request
+    def start_job_worker():
+        if started:
+            return
+        with lock:
+            if not started:
+                started.append(Worker(app, app.config['JOBS_THREADS']).start())
+                app.logger.info('started %s in-process job worker thread(s)', app.config['JOBS_THREADS'])
+
+
+def _init_sweep(app):
+    # Retries and requeued jobs are due with nobody enqueuing; at most one
+    # request per interval per process drains them
+    interval = min(60, app.config['JOBS_LOCK_TIMEOUT'])
+    next_sweep = [0.0]
+
+    @app.after_request
+    def sweep_jobs(response):
+        # A request that enqueued jobs drains (and sweeps) anyway
+        if g.get('jobs_to_run') is not None or monotonic() < next_sweep[0]:
+            return response
+        next_sweep[0] = monotonic() + interval
+        response.call_on_close(lambda: _drain(app, 0))
+        return response
+
+
+@event.listens_for(Session, 'after_commit')
+def _run_after_response(session):
+    count = session.info.pop('jobs_enqueued', 0)
+    if not count or not has_request_context():
+        return
+    if current_app.config.get('JOBS_RUNNER') != 'after-response':
+        return
+    pending = g.get('jobs_to_run')
+    if pending is not None:
+        pending[0] += count
+        return
+    g.jobs_to_run = pending = [count]
+    app = current_app._get_current_object()
+
+    @after_this_request
+    def run_jobs_after_response(response):
+        response.call_on_close(lambda: _drain(app, pending[0]))
+        return response
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_on_rollback(session, previous_transaction):
+    session.info.pop('jobs_enqueued', None)
+
+
+def _drain(app, max_jobs):
+    """Requeue stale jobs, then run the request's ``max_jobs`` and up to
+    DRAIN_BACKLOG others that are due."""
+    worker_id = f'{socket.gethostname()}:{os.getpid()}/response'
+    with app.app_context():
+        try:
+            requeue_stale(app.config['JOBS_LOCK_TIMEOUT'])
+        except Exception:
+            db.session.rollback()
+            app.logger.exception('requeueing stale jobs after the response failed')
+    for _ in range(max_jobs + DRAIN_BACKLOG):
+        with app.app_context():
+            try:
+                if not run_next(worker_id):
+                    return
+            except Exception:
+                db.session.rollback()
+                app.logger.exception('running jobs after the response failed')
+                return
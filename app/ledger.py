@@ -0,0 +1,163 @@
+"""Transaction write path.
+
+Every insert or delete of a Transaction goes through this module so the
+``daily_spend`` rollup and budget envelope ``spent`` counters stay in
+sync with the raw table. Readers that need per-day totals use
+:func:`daily_totals` instead of summing transactions. Every write also
+queues the user for the after-commit alert rules (app.alert_rules), and
+a back-dated one flags the streak and closed-month summaries for rebuild.
+"""
+from datetime import date, datetime
+from app.extensions import db
+from app.models import Transaction, DailySpend
+from app.envelopes import bump_envelope, apply_envelope_deltas
+from app.alert_rules import queue_alert_check
+
+
+def add_transaction(txn):
+    """Add a Transaction to the session and roll its amount into daily_spend and its envelope."""
+    if txn.date is None:
+        txn.date = datetime.utcnow()
+    db.session.add(txn)
+    _bump(txn.user_id, txn.date.date(), txn.category or 'Misc', txn.amount, 1)
+    bump_envelope(txn.user_id, txn.date, txn.category, txn.amount)
+    _touch_closed_days(txn.user_id, [txn.date.date()])
+    queue_alert_check(txn.user_id)
+    return txn
+
+
+def delete_transaction(txn):
+    """Delete a Transaction and remove its amount from daily_spend and its envelope."""
+    _bump(txn.user_id, txn.date.date(), txn.category or 'Misc', -txn.amount, -1)
+    bump_envelope(txn.user_id, txn.date, txn.category, -txn.amount)
+    _touch_closed_days(txn.user_id, [txn.date.date()])
+    queue_alert_check(txn.user_id)
+    db.session.delete(txn)
+
+
+def apply_daily_deltas(user_id, deltas):
+    """Roll {(day, category): (amount, count)} into daily_spend and budget
+    envelopes for rows written without add_transaction, e.g. batched Core inserts.
+
+    Existing rollup rows are updated with one executemany UPDATE and new
+    ones added with one multi-row INSERT, whatever the number of keys.
+    """
+    deltas = {(day, category or 'Misc'): value for (day, category), value in deltas.items()}
+    if not deltas:
+        return
+    days = [day for day, _ in deltas]
+    existing = {
+        (day, category): row_id
+        for row_id, day, category in db.session.query(
+            DailySpend.id, DailySpend.day, DailySpend.category
+        ).filter(
+            DailySpend.user_id == user_id,
+            DailySpend.day >= min(days),
+            DailySpend.day <= max(days)
+        )
+    }
+
+    updates, inserts = [], []
+    for (day, category), (amount, count) in deltas.items():
+        if (day, category) in existing:
+            updates.append({'row_id': existing[(day, category)], 'd_total': amount, 'd_count': count})
+        else:
+            inserts.append({'user_id': user_id, 'day': day, 'category': category,
+                            'total': amount, 'txn_count': count})
+
+    table = DailySpend.__table__
+    if updates:
+        db.session.execute(
+            table.update().where(table.c.id == db.bindparam('row_id')).values(
+                total=table.c.total + db.bindparam('d_total'),
+                txn_count=table.c.txn_count + db.bindparam('d_count')
+            ),
+            updates
+        )
+    if inserts:
+        db.session.execute(table.insert(), inserts)
+
+    months = {}
+    for (day, category), (amount, _) in deltas.items():
+        key = (day.year, day.month, category)
+        months[key] = months.get(key, 0.0) + amount
+    apply_envelope_deltas(user_id, months)
+    _touch_closed_days(user_id, days)
+    queue_alert_check(user_id)
+
+
+def _touch_closed_days(user_id, days):
+    """Back-dated writes invalidate the streak and any closed month's summary."""
+    first = min(days)
+    if first < date.today():
+        from app.streaks import mark_streak_stale
+        from app.summaries import mark_summary_stale
+        mark_streak_stale(user_id, first)
+        mark_summary_stale(user_id, days)
+
+
+def _bump(user_id, day, category, amount, count):
+    updated = db.session.execute(
+        db.update(DailySpend).where(
+            DailySpend.user_id == user_id,
+            DailySpend.day == day,
+            DailySpend.category == category
+        ).values(
+            total=DailySpend.total + amount,
+            txn_count=DailySpend.txn_count + count
+        ).execution_options(synchronize_session=False)
+    ).rowcount
+    if not updated:
+        db.session.add(DailySpend(
+            user_id=user_id, day=day, category=category,
+            total=amount, txn_count=count
+        ))
+
+
+def daily_totals(user_id, start, end):
+    """Return {date: amount} for every day in [start, end] with spending."""
+    rows = db.session.query(
+        DailySpend.day, db.func.sum(DailySpend.total)
+    ).filter(
+        DailySpend.user_id == user_id,
+        DailySpend.day >= start,
+        DailySpend.day <= end
+    ).group_by(DailySpend.day).all()
+    return {day: float(total or 0) for day, total in rows}
+
+
+def approx_transaction_count(user_id, category=None, day=None):
+    """Transaction count from the rollup; cheap, but only as exact as daily_spend."""
+    query = db.session.query(db.func.sum(DailySpend.txn_count)).filter(DailySpend.user_id == user_id)
+    if category:
+        query = query.filter(DailySpend.category == category)
+    if day:
+        query = query.filter(DailySpend.day == day)
+    return int(query.scalar() or 0)
+
+
+def rebuild_daily_spend(user_id=None):
+    """Recompute daily_spend from the transactions table (all users by default)."""
+    delete = db.delete(DailySpend)
+    if user_id is not None:
+        delete = delete.where(DailySpend.user_id == user_id)
+    db.session.execute(delete)
+
+    day = db.func.date(Transaction.date)
+    query = db.session.query(
+        Transaction.user_id, day, Transaction.category,
+        db.func.sum(Transaction.amount), db.func.count(Transaction.id)
+    )
+    if user_id is not None:
+        query = query.filter(Transaction.user_id == user_id)
+    rows = query.group_by(Transaction.user_id, day, Transaction.category).all()
+
+    db.session.add_all(
+        DailySpend(
+            user_id=uid,
+            day=d if not isinstance(d, str) else datetime.strptime(d, '%Y-%m-%d').date(),
+            category=category or 'Misc', total=float(total or 0), txn_count=count
+        )
+        for uid, d, category, total, count in rows
+    )
+    return len(rows)
@@ -1,5 +1,5 @@
-from datetime import datetime, date
 import json
+from datetime import datetime, date
 from flask_login import UserMixin
 from app.extensions import db, login_manager
 
@@ -22,6 +22,11 @@ class User(UserMixin, db.Model):
     food_preference = db.Column(db.String(20), default='Vegetarian')
     phone = db.Column(db.String(15), nullable=True)
     onboarding_complete = db.Column(db.Boolean, default=False)
+    current_streak = db.Column(db.Integer, default=0)
+    longest_streak = db.Column(db.Integer, default=0)
+    streak_as_of = db.Column(db.Date, nullable=True)
+    unread_alert_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -42,50 +47,24 @@ class User(UserMixin, db.Model):
         ).first()
         return budget
 
+    def spending(self):
+        """This month's spending totals, memoized for the current request."""
+        from app.spending import spending_context
+        return spending_context(self)
+
     def get_today_spent(self):
-        today = date.today()
-        result = db.session.query(db.func.sum(Transaction.amount)).filter(
-            Transaction.user_id == self.id,
-            db.func.date(Transaction.date) == today
-        ).scalar()
-        return result or 0.0
+        return self.spending().today_spent
 
     def get_month_spent(self):
-        today = date.today()
-        result = db.session.query(db.func.sum(Transaction.amount)).filter(
-            Transaction.user_id == self.id,
-            db.extract('month', Transaction.date) == today.month,
-            db.extract('year', Transaction.date) == today.year
-        ).scalar()
-        return result or 0.0
+        return self.spending().month_spent
 
     def get_daily_limit(self):
-        import calendar
-        today = date.today()
-        days_in_month = calendar.monthrange(today.year, today.month)[1]
-        remaining_days = days_in_month - today.day + 1
-        remaining_budget = self.monthly_budget - self.get_month_spent()
-        if remaining_days <= 0:
-            return 0
-        return round(remaining_budget / remaining_days, 2)
+        return self.spending().daily_limit
 
     def get_streak(self):
-        """Calculate current savings streak (days under budget)."""
-        today = date.today()
-        streak = 0
-        for i in range(30):
-            check_date = date(today.year, today.month, today.day - i) if today.day - i > 0 else None
-            if check_date is None:
-                break
-            daily_spent = db.session.query(db.func.sum(Transaction.amount)).filter(
-                Transaction.user_id == self.id,
-                db.func.date(Transaction.date) == check_date
-            ).scalar() or 0
-            if daily_spent <= self.get_daily_limit():
-                streak += 1
-            else:
-                break
-        return streak
+        """Current savings streak (days under budget), including today."""
+        from app.streaks import current_streak
+        return current_streak(self)
 
 
 class Transaction(db.Model):
@@ -102,6 +81,11 @@ class Transaction(db.Model):
     meal_type = db.Column(db.String(20), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_transactions_user_date', 'user_id', 'date'),
+        db.Index('ix_transactions_user_category_date', 'user_id', 'category', 'date'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -115,6 +99,22 @@ class Transaction(db.Model):
         }
 
 
+class DailySpend(db.Model):
+    """Per-user, per-day, per-category spend rollup maintained by app.ledger."""
+    __tablename__ = 'daily_spend'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    category = db.Column(db.String(50), nullable=False, default='Misc')
+    total = db.Column(db.Float, nullable=False, default=0.0)
+    txn_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', 'category', name='uq_daily_spend_user_day_category'),
+    )
+
+
 class Budget(db.Model):
     __tablename__ = 'budgets'
 
@@ -123,21 +123,38 @@ class Budget(db.Model):
     month = db.Column(db.Integer, nullable=False)
     year = db.Column(db.Integer, nullable=False)
     total_amount = db.Column(db.Float, nullable=False)
-    food_allocation = db.Column(db.Float, default=0.0)
-    travel_allocation = db.Column(db.Float, default=0.0)
-    academic_allocation = db.Column(db.Float, default=0.0)
-    entertainment_allocation = db.Column(db.Float, default=0.0)
     emergency_reserve = db.Column(db.Float, default=0.0)
-    _categories_json = db.Column('categories_json', db.Text, default='{}')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    envelopes = db.relationship('BudgetEnvelope', backref='budget', order_by='BudgetEnvelope.id',
+                                cascade='all, delete-orphan')
+
+    __table_args__ = (
+        db.Index('ix_budgets_user_year_month', 'user_id', 'year', 'month'),
+    )
+
+
+class BudgetEnvelope(db.Model):
+    """Per-category allocation for a monthly budget; ``spent`` is kept current by app.ledger."""
+    __tablename__ = 'budget_envelopes'
+
+    id = db.Column(db.Integer, primary_key=True)
+    budget_id = db.Column(db.Integer, db.ForeignKey('budgets.id', ondelete='CASCADE'), nullable=False)
+    category = db.Column(db.String(50), nullable=False)
+    allocated = db.Column(db.Float, nullable=False, default=0.0)
+    spent = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        db.UniqueConstraint('budget_id', 'category', name='uq_budget_envelopes_budget_category'),
+    )
+
     @property
-    def categories(self):
-        return json.loads(self._categories_json) if self._categories_json else {}
+    def remaining(self):
+        return self.allocated - self.spent
 
-    @categories.setter
-    def categories(self, value):
-        self._categories_json = json.dumps(value)
+    @property
+    def is_over(self):
+        return self.spent > self.allocated
 
 
 class MealPlan(db.Model):
@@ -156,6 +173,10 @@ class MealPlan(db.Model):
     is_completed = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_meal_plans_user_date', 'user_id', 'date'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -171,6 +192,37 @@ class MealPlan(db.Model):
         }
 
 
+class MealItem(db.Model):
+    """A dish offered by a mess, canteen or cooked at home, for meal suggestions."""
+    __tablename__ = 'meal_items'
+
+    id = db.Column(db.Integer, primary_key=True)
+    preference = db.Column(db.String(20), nullable=False)
+    meal_type = db.Column(db.String(20), nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    cost = db.Column(db.Float, nullable=False)
+    calories = db.Column(db.Integer, default=0)
+    protein = db.Column(db.Float, default=0)
+    score = db.Column(db.Float, default=0)
+    source = db.Column(db.String(50), default='Mess')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_meal_items_pref_type_source_cost', 'preference', 'meal_type', 'source', 'cost'),
+    )
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'cost': self.cost,
+            'calories': self.calories,
+            'protein': self.protein,
+            'score': self.score,
+            'source': self.source
+        }
+
+
 class SavingsGoal(db.Model):
     __tablename__ = 'savings_goals'
 
@@ -190,6 +242,54 @@ class SavingsGoal(db.Model):
         return round((self.current_amount / self.target_amount) * 100, 1)
 
 
+class MonthlySummary(db.Model):
+    """Snapshot of one user's closed month, written by app.summaries."""
+    __tablename__ = 'monthly_summaries'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    month = db.Column(db.Integer, nullable=False)
+    total_spent = db.Column(db.Float, nullable=False, default=0.0)
+    txn_count = db.Column(db.Integer, nullable=False, default=0)
+    budget_amount = db.Column(db.Float, nullable=True)  # Budget.total_amount, if one was set
+    # JSON: {category: total}, {food subcategory: total}, [total per day of month]
+    category_totals = db.Column(db.Text, nullable=False, default='{}')
+    food_totals = db.Column(db.Text, nullable=False, default='{}')
+    daily_totals = db.Column(db.Text, nullable=False, default='[]')
+    weekday_avg = db.Column(db.Float, nullable=False, default=0.0)
+    weekend_avg = db.Column(db.Float, nullable=False, default=0.0)
+    top_expense_amount = db.Column(db.Float, nullable=True)
+    top_expense_description = db.Column(db.String(200), nullable=True)
+    top_expense_category = db.Column(db.String(50), nullable=True)
+    # Set when a back-dated transaction lands in the month; the next read or job rebuilds it
+    is_stale = db.Column(db.Boolean, nullable=False, default=False)
+    built_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'year', 'month', name='uq_monthly_summaries_user_month'),
+    )
+
+    def to_dict(self):
+        return {
+            'year': self.year,
+            'month': self.month,
+            'total_spent': self.total_spent,
+            'txn_count': self.txn_count,
+            'budget_amount': self.budget_amount,
+            'category_totals': json.loads(self.category_totals),
+            'food_totals': json.loads(self.food_totals),
+            'daily_totals': json.loads(self.daily_totals),
+            'weekday_avg': self.weekday_avg,
+            'weekend_avg': self.weekend_avg,
+            'top_expense': {
+                'amount': self.top_expense_amount,
+                'description': self.top_expense_description,
+                'category': self.top_expense_category,
+            } if self.top_expense_amount is not None else None,
+        }
+
+
 class Badge(db.Model):
     __tablename__ = 'badges'
 
@@ -209,20 +309,47 @@ class BillSplit(db.Model):
     creator_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     title = db.Column(db.String(100), nullable=False)
     total_amount = db.Column(db.Float, nullable=False)
-    _participants_json = db.Column('participants_json', db.Text, default='[]')
     split_type = db.Column(db.String(20), default='equal')
     is_settled = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     creator = db.relationship('User', backref='created_splits')
+    participants = db.relationship('SplitParticipant', backref='split', order_by='SplitParticipant.id',
+                                   cascade='all, delete-orphan')
 
-    @property
-    def participants(self):
-        return json.loads(self._participants_json) if self._participants_json else []
+    __table_args__ = (
+        db.Index('ix_bill_splits_creator_settled', 'creator_id', 'is_settled'),
+    )
 
-    @participants.setter
-    def participants(self, value):
-        self._participants_json = json.dumps(value)
+
+class SplitParticipant(db.Model):
+    __tablename__ = 'split_participants'
+
+    id = db.Column(db.Integer, primary_key=True)
+    split_id = db.Column(db.Integer, db.ForeignKey('bill_splits.id', ondelete='CASCADE'), nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    share = db.Column(db.Float, nullable=False, default=0)
+    paid = db.Column(db.Boolean, nullable=False, default=False)
+    paid_at = db.Column(db.DateTime, nullable=True)
+    is_creator = db.Column(db.Boolean, nullable=False, default=False)
+    is_payer = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+
+    __table_args__ = (
+        db.Index('ix_split_participants_split_paid', 'split_id', 'paid'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'user_id': self.user_id,
+            'share': self.share,
+            'paid': self.paid,
+            'paid_at': self.paid_at.isoformat() if self.paid_at else None,
+            'is_creator': self.is_creator,
+            'is_payer': self.is_payer
+        }
 
 
 class Alert(db.Model):
@@ -235,8 +362,15 @@ class Alert(db.Model):
     message = db.Column(db.String(500), nullable=False)
     icon = db.Column(db.String(10), default='🔔')
     is_read = db.Column(db.Boolean, default=False)
+    # "<rule>:<period>" for rule-generated alerts (app.alert_rules); one per user
+    dedupe_key = db.Column(db.String(80), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_alerts_user_read_created', 'user_id', 'is_read', 'created_at'),
+        db.Index('uq_alerts_user_dedupe_key', 'user_id', 'dedupe_key', unique=True),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -247,3 +381,45 @@ class Alert(db.Model):
             'is_read': self.is_read,
             'created_at': self.created_at.isoformat()
         }
+
+
+class Job(db.Model):
+    """A unit of background work; see app.jobs."""
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    state = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed
+    payload = db.Column(db.Text, nullable=False, default='{}')
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.String(500), nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(100), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_jobs_state_run_after', 'state', 'run_after'),
+        db.Index('ix_jobs_user_kind_state', 'user_id', 'kind', 'state'),
+    )
+
+    @property
+    def params(self):
+        return json.loads(self.payload or '{}')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'state': self.state,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
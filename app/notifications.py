@@ -0,0 +1,65 @@
+"""Alert writes that keep ``User.unread_alert_count`` in step.
+
+The counter is changed with relative UPDATEs inside the same database
+transaction as the alert rows, so concurrent writers cannot lose an
+increment. ``recount_unread_alerts`` repairs it from the alerts table.
+"""
+from app.extensions import db
+from app.models import User, Alert
+from app.versioning import bump_data_version
+
+
+def _adjust_unread(user_id, delta):
+    adjusted = User.unread_alert_count + delta
+    db.session.execute(
+        db.update(User).where(User.id == user_id).values(
+            unread_alert_count=db.case((adjusted < 0, 0), else_=adjusted)
+        ).execution_options(synchronize_session='fetch')
+    )
+
+
+def create_alert(user_id, alert_type, title, message, icon='🔔'):
+    """Add an unread alert for a user and bump their unread counter."""
+    alert = Alert(user_id=user_id, alert_type=alert_type, title=title, message=message, icon=icon)
+    db.session.add(alert)
+    _adjust_unread(user_id, 1)
+    return alert
+
+
+def mark_alert_read(alert):
+    """Mark one alert read; the counter only moves if it was still unread."""
+    updated = db.session.execute(
+        db.update(Alert).where(
+            Alert.id == alert.id, Alert.is_read == False  # noqa: E712
+        ).values(is_read=True).execution_options(synchronize_session='fetch')
+    ).rowcount
+    if updated:
+        _adjust_unread(alert.user_id, -1)
+        bump_data_version(alert.user_id)
+
+
+def mark_all_alerts_read(user_id):
+    """Mark every unread alert read; the counter drops by as many as were
+    updated, so an alert committed meanwhile stays counted."""
+    updated = db.session.execute(
+        db.update(Alert).where(
+            Alert.user_id == user_id, Alert.is_read == False  # noqa: E712
+        ).values(is_read=True).execution_options(synchronize_session='fetch')
+    ).rowcount
+    if updated:
+        _adjust_unread(user_id, -updated)
+        bump_data_version(user_id)
+
+
+def recount_unread_alerts(user_id=None, user_ids=None):
+    """Recompute unread counters from the alerts table (all users by default)."""
+    unread = db.select(db.func.count(Alert.id)).where(
+        Alert.user_id == User.id, Alert.is_read == False  # noqa: E712
+    ).scalar_subquery()
+    stmt = db.update(User).values(unread_alert_count=unread)
+    if user_id is not None:
+        stmt = stmt.where(User.id == user_id)
+    if user_ids is not None:
+        stmt = stmt.where(User.id.in_(user_ids))
+    return db.session.execute(stmt.execution_options(synchronize_session='fetch')).rowcount
+
@@ -0,0 +1,163 @@
+"""Per-request SQL profiling.
+
+Engine cursor events count every statement run while handling a request,
+along with its time. After the request the figures go out in a
+``Server-Timing`` header (``db`` = total DB time and query count,
+``db-slowest`` = the slowest statement). They are also folded into
+per-endpoint aggregates, which admins can read at ``/admin/api/queries``.
+
+Statements are normalized (literals and IN-lists collapsed) so a query
+run in a loop shows up as one statement with a high count. When the app
+runs in debug mode, or SQL_REPEAT_WARN is on, any normalized statement
+that runs more than ``SQL_REPEAT_THRESHOLD`` times in one request is
+logged as a likely N+1.
+"""
+import re
+import time
+import threading
+from functools import lru_cache
+from flask import g, request, has_request_context
+from sqlalchemy import event
+
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:\?|%\(\w+\)s|:\w+|\$\d+|%s)\s*,?)+\)', re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_SPACE = re.compile(r'\s+')
+_SELECT_LIST = re.compile(r'^SELECT .+? FROM ')
+
+
+@lru_cache(maxsize=2048)
+def normalize(statement):
+    """Statement with whitespace, literals and IN-lists collapsed, for grouping."""
+    text = _SPACE.sub(' ', statement).strip()
+    text = _STRING.sub('?', text)
+    text = _NUMBER.sub('?', text)
+    return _IN_LIST.sub('IN (…)', text)
+
+
+class RequestQueries:
+    """The statements run while handling one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest = []  # [(ms, normalized statement)], longest first, at most 3
+        self.by_statement = {}
+
+    def record(self, statement, ms):
+        self.count += 1
+        self.total_ms += ms
+        key = normalize(statement)
+        self.by_statement[key] = self.by_statement.get(key, 0) + 1
+        if len(self.slowest) < 3 or ms > self.slowest[-1][0]:
+            self.slowest = sorted(self.slowest + [(ms, key)], reverse=True)[:3]
+
+    def repeated(self, threshold):
+        return sorted(((n, sql) for sql, n in self.by_statement.items() if n > threshold), reverse=True)
+
+
+class EndpointStats:
+    """Per-endpoint totals since the process started (or the last reset)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+
+    def add(self, endpoint, queries, elapsed_ms):
+        with self._lock:
+            entry = self.endpoints.setdefault(endpoint, {
+                'requests': 0, 'queries': 0, 'db_ms': 0.0, 'request_ms': 0.0,
+                'max_queries': 0, 'max_db_ms': 0.0, 'slowest_ms': 0.0, 'slowest_sql': None,
+            })
+            entry['requests'] += 1
+            entry['queries'] += queries.count
+            entry['db_ms'] += queries.total_ms
+            entry['request_ms'] += elapsed_ms
+            entry['max_queries'] = max(entry['max_queries'], queries.count)
+            entry['max_db_ms'] = max(entry['max_db_ms'], queries.total_ms)
+            if queries.slowest and queries.slowest[0][0] > entry['slowest_ms']:
+                entry['slowest_ms'], entry['slowest_sql'] = queries.slowest[0]
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+
+    def snapshot(self):
+        with self._lock:
+            rows = [
+                {
+                    'endpoint': endpoint,
+                    'requests': e['requests'],
+                    'avg_queries': round(e['queries'] / e['requests'], 1),
+                    'max_queries': e['max_queries'],
+                    'avg_db_ms': round(e['db_ms'] / e['requests'], 2),
+                    'max_db_ms': round(e['max_db_ms'], 2),
+                    'total_db_ms': round(e['db_ms'], 1),
+                    'avg_request_ms': round(e['request_ms'] / e['requests'], 2),
+                    'slowest_ms': round(e['slowest_ms'], 2),
+                    'slowest_sql': e['slowest_sql'],
+                }
+                for endpoint, e in self.endpoints.items()
+            ]
+        return sorted(rows, key=lambda r: -r['total_db_ms'])
+
+
+endpoint_stats = EndpointStats()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'sql_queries' in g:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started')
+    if started and has_request_context() and 'sql_queries' in g:
+        g.sql_queries.record(statement, (time.perf_counter() - started.pop()) * 1000)
+
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get('query_started') \
+        if exception_context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def init_profiler(app):
+    """Hook the app's engine and request cycle. Call after db.init_app."""
+    if not app.config.get('SQL_PROFILER', True):
+        return
+    from app.extensions import db
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+
+    threshold = app.config.get('SQL_REPEAT_THRESHOLD', 5)
+
+    @app.before_request
+    def start_query_profile():
+        g.sql_queries = RequestQueries()
+        g.sql_started = time.perf_counter()
+
+    @app.after_request
+    def finish_query_profile(response):
+        queries = g.pop('sql_queries', None)
+        if queries is None:
+            return response
+        elapsed_ms = (time.perf_counter() - g.pop('sql_started')) * 1000
+        endpoint = request.endpoint or 'unmatched'
+        endpoint_stats.add(endpoint, queries, elapsed_ms)
+
+        timing = f'db;dur={queries.total_ms:.1f};desc="{queries.count} queries"'
+        if queries.slowest:
+            timing += f', db-slowest;dur={queries.slowest[0][0]:.1f}'
+        response.headers.add('Server-Timing', timing)
+
+        if app.debug or app.config.get('SQL_REPEAT_WARN'):
+            for count, sql in queries.repeated(threshold):
+                short = _SELECT_LIST.sub('SELECT … FROM ', sql)
+                app.logger.warning(f'possible N+1 in {endpoint}: {count}x {short[:300]}')
+        return response
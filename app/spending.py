@@ -0,0 +1,88 @@
+"""Request-scoped memo of a user's current-month spending.
+
+One GROUP BY over the month yields per-category totals, the month total
+and today's total together. The result is kept on ``flask.g`` so that
+``User.get_month_spent``/``get_today_spent``/``get_daily_limit`` and the
+category breakdowns on dashboard, budget and expenses all share it. Any
+flush that touches a Transaction drops the memo.
+"""
+from datetime import date
+import calendar
+from flask import g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.daterange import within, day_range, month_range
+
+
+class SpendingContext:
+    def __init__(self, user, today=None):
+        self.user = user
+        self.today = today or date.today()
+        self._category_totals = None
+        self._today_spent = 0.0
+
+    def _load(self):
+        from app.models import Transaction
+        today_start, today_end = day_range(self.today)
+        is_today = (Transaction.date >= today_start) & (Transaction.date < today_end)
+        rows = db.session.query(
+            Transaction.category,
+            db.func.sum(Transaction.amount),
+            db.func.sum(db.case((is_today, Transaction.amount), else_=0))
+        ).filter(
+            Transaction.user_id == self.user.id,
+            within(Transaction.date, month_range(self.today.year, self.today.month))
+        ).group_by(Transaction.category).all()
+        self._category_totals = {cat: float(total or 0) for cat, total, _ in rows}
+        self._today_spent = float(sum(today or 0 for _, _, today in rows))
+
+    @property
+    def category_totals(self):
+        """{category: amount} spent this month."""
+        if self._category_totals is None:
+            self._load()
+        return self._category_totals
+
+    @property
+    def month_spent(self):
+        return sum(self.category_totals.values())
+
+    @property
+    def today_spent(self):
+        if self._category_totals is None:
+            self._load()
+        return self._today_spent
+
+    @property
+    def daily_limit(self):
+        days_in_month = calendar.monthrange(self.today.year, self.today.month)[1]
+        remaining_days = days_in_month - self.today.day + 1
+        remaining_budget = self.user.monthly_budget - self.month_spent
+        if remaining_days <= 0:
+            return 0
+        return round(remaining_budget / remaining_days, 2)
+
+
+def spending_context(user):
+    """Return the SpendingContext for ``user``, shared for the current request."""
+    if not has_app_context():
+        return SpendingContext(user)
+    contexts = g.setdefault('spending_contexts', {})
+    ctx = contexts.get(user.id)
+    if ctx is None or ctx.today != date.today():
+        ctx = contexts[user.id] = SpendingContext(user)
+    return ctx
+
+
+def invalidate_spending():
+    """Forget memoized spending, e.g. after writing transactions with Core statements."""
+    if has_app_context():
+        g.pop('spending_contexts', None)
+
+
+@event.listens_for(Session, 'after_flush')
+def _invalidate_on_transaction_flush(session, flush_context):
+    from app.models import Transaction
+    if any(isinstance(obj, Transaction) for obj in (*session.new, *session.dirty, *session.deleted)):
+        invalidate_spending()
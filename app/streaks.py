@@ -0,0 +1,158 @@
+"""Under-budget streaks computed from the daily_spend rollup.
+
+A day counts towards the streak when the user spent no more than their
+daily allowance (monthly budget / days in that month). Closed days (up
+to yesterday) are summarised on the user row as ``current_streak``,
+``longest_streak`` and ``streak_as_of``; reading a streak only has to
+look at today's spending, which the request's SpendingContext already
+holds.
+
+Reads never write. ``streak_as_of`` is cleared when a back-dated
+transaction lands on a closed day or the budget changes, and a
+``streaks.refresh`` job recomputes and stores the history from one
+grouped query; ``flask close-day`` rolls every user forward daily. Until
+then a read works the missing days out in memory.
+"""
+from datetime import date, timedelta
+import calendar
+from app.extensions import db
+from app.models import User, DailySpend, Badge
+
+STREAK_BADGES = (('week_streak', 7), ('month_streak', 30))
+
+
+def daily_allowance(user, day):
+    return (user.monthly_budget or 0) / calendar.monthrange(day.year, day.month)[1]
+
+
+def _day_totals(user_ids, start, end):
+    """{(user_id, day): amount} for days in [start, end] with spending."""
+    query = db.session.query(
+        DailySpend.user_id, DailySpend.day, db.func.sum(DailySpend.total)
+    ).filter(DailySpend.user_id.in_(user_ids), DailySpend.day <= end)
+    if start is not None:
+        query = query.filter(DailySpend.day >= start)
+    rows = query.group_by(DailySpend.user_id, DailySpend.day).all()
+    return {(uid, day): float(total or 0) for uid, day, total in rows}
+
+
+def _history(user, as_of):
+    """(current, longest) over the user's full spending history through as_of."""
+    totals = _day_totals([user.id], None, as_of)
+    first_day = user.created_at.date() if user.created_at else as_of
+    if totals:
+        first_day = min(first_day, min(day for _, day in totals))
+
+    over_days = sorted(
+        day for (_, day), spent in totals.items() if spent > daily_allowance(user, day)
+    )
+    # Streaks are the gaps between consecutive over-budget days
+    bounds = [first_day - timedelta(days=1), *over_days, as_of + timedelta(days=1)]
+    longest = max(((b - a).days - 1 for a, b in zip(bounds, bounds[1:])), default=0)
+    return max(0, (as_of - bounds[-2]).days), max(0, longest)
+
+
+def _fold(user, totals, as_of):
+    """(current, longest) after rolling the stored state forward to as_of."""
+    current, longest = user.current_streak or 0, user.longest_streak or 0
+    day = user.streak_as_of + timedelta(days=1)
+    while day <= as_of:
+        if totals.get((user.id, day), 0) > daily_allowance(user, day):
+            current = 0
+        else:
+            current += 1
+        longest = max(longest, current)
+        day += timedelta(days=1)
+    return current, longest
+
+
+def recompute_streak(user, as_of=None):
+    """Rebuild a user's streak state from their full spending history."""
+    as_of = as_of or date.today() - timedelta(days=1)
+    user.current_streak, user.longest_streak = _history(user, as_of)
+    user.streak_as_of = as_of
+    _award_streak_badges(user)
+
+
+def advance_streaks(users, as_of=None):
+    """Roll each user's streak forward over days closed since streak_as_of."""
+    as_of = as_of or date.today() - timedelta(days=1)
+    stale = [u for u in users if u.streak_as_of is None]
+    behind = [u for u in users if u.streak_as_of is not None and u.streak_as_of < as_of]
+    for user in stale:
+        recompute_streak(user, as_of)
+    if not behind:
+        return
+
+    start = min(u.streak_as_of for u in behind) + timedelta(days=1)
+    totals = _day_totals([u.id for u in behind], start, as_of)
+    for user in behind:
+        user.current_streak, user.longest_streak = _fold(user, totals, as_of)
+        user.streak_as_of = as_of
+        _award_streak_badges(user)
+
+
+def closed_streak(user, as_of=None):
+    """(current, longest) through as_of (default yesterday) without writing.
+
+    Uses the stored state when it is up to date; otherwise works it out in
+    memory and leaves persisting it to ``flask close-day`` or the
+    ``streaks.refresh`` job.
+    """
+    as_of = as_of or date.today() - timedelta(days=1)
+    if user.streak_as_of is None:
+        return _history(user, as_of)
+    if user.streak_as_of >= as_of:
+        return user.current_streak or 0, user.longest_streak or 0
+    totals = _day_totals([user.id], user.streak_as_of + timedelta(days=1), as_of)
+    return _fold(user, totals, as_of)
+
+
+def current_streak(user):
+    """Streak shown to the user: closed days plus today while today is under budget."""
+    return streak_summary(user)[0]
+
+
+def streak_summary(user):
+    """(current streak including today, longest streak); read-only."""
+    today = date.today()
+    closed, longest = closed_streak(user)
+    current = 0 if user.get_today_spent() > daily_allowance(user, today) else closed + 1
+    return current, max(longest, current)
+
+
+def refresh_streak_job(job):
+    """``streaks.refresh`` job: rebuild a stale streak before the user next reads it."""
+    user = db.session.get(User, job.user_id)
+    advance_streaks([user])
+    return {'current_streak': user.current_streak, 'longest_streak': user.longest_streak}
+
+
+def mark_streak_stale(user_id, day):
+    """Force a recompute if ``day`` is a day already folded into the streak,
+    and queue the ``streaks.refresh`` job that persists it."""
+    cleared = db.session.execute(
+        db.update(User).where(
+            User.id == user_id, User.streak_as_of >= day
+        ).values(streak_as_of=None).execution_options(synchronize_session='fetch')
+    ).rowcount
+    if cleared:
+        from app.jobs import enqueue
+        enqueue('streaks.refresh', user_id=user_id, unique=True)
+
+
+def _award_streak_badges(user):
+    from app.blueprints.gamification.routes import AVAILABLE_BADGES
+    best = max(user.longest_streak or 0, user.current_streak or 0)
+    wanted = [btype for btype, days in STREAK_BADGES if best >= days]
+    if not wanted:
+        return
+    earned = {b for (b,) in db.session.query(Badge.badge_type).filter(
+        Badge.user_id == user.id, Badge.badge_type.in_(wanted)
+    )}
+    for badge_def in AVAILABLE_BADGES:
+        if badge_def['type'] in wanted and badge_def['type'] not in earned:
+            db.session.add(Badge(
+                user_id=user.id, badge_type=badge_def['type'], name=badge_def['name'],
+                description=badge_def['desc'], icon=badge_def['icon']
+            ))
@@ -0,0 +1,252 @@
+"""Monthly summary snapshots for closed months.
+
+A month is closed once it has ended. Its totals, category and food
+subcategory breakdowns, daily series, weekday/weekend averages, top
+expense and budget are stored in one ``monthly_summaries`` row per user.
+Historical views then read a few small rows instead of rescanning
+transactions.
+
+Rows are written by ``flask close-month`` (schedule it on the 1st) and
+in bulk by ``flask backfill-summaries``. Both stream each batch of users'
+transactions once, ordered by (user_id, date) so the
+ix_transactions_user_date index serves the scan. A closed month's row is
+rebuilt only when a back-dated transaction lands in it: app.ledger calls
+:func:`mark_summary_stale`, which flags the row and queues a
+``summaries.rebuild`` job. :func:`month_summaries` computes any missing
+or stale month it is asked for in memory, so readers never see a gap and
+never write.
+"""
+import json
+import calendar
+from datetime import date, datetime, timedelta
+from app.extensions import db
+from app.models import User, Transaction, Budget, DailySpend, MonthlySummary
+from app.daterange import within, days_range
+
+BATCH_USERS = 200
+STREAM_ROWS = 5000
+
+
+def month_index(year, month):
+    return year * 12 + month - 1
+
+
+def month_of(index):
+    """(year, month) for a month_index()."""
+    return index // 12, index % 12 + 1
+
+
+def current_month_index(today=None):
+    today = today or date.today()
+    return month_index(today.year, today.month)
+
+
+# month_index() of a stored row, for range and membership filters within one user's rows
+STORED_MONTH = MonthlySummary.year * 12 + MonthlySummary.month - 1
+
+
+class _MonthTotals:
+    def __init__(self, year, month):
+        self.year = year
+        self.month = month
+        self.days = [0.0] * calendar.monthrange(year, month)[1]
+        self.categories = {}
+        self.food = {}
+        self.total = 0.0
+        self.count = 0
+        self.top = None  # (amount, description, category)
+
+    def add(self, day, amount, category, subcategory, is_food, description):
+        amount = float(amount or 0)
+        category = category or 'Misc'
+        self.days[day - 1] += amount
+        self.categories[category] = self.categories.get(category, 0.0) + amount
+        if is_food:
+            sub = subcategory or 'Unknown'
+            self.food[sub] = self.food.get(sub, 0.0) + amount
+        self.total += amount
+        self.count += 1
+        if self.top is None or amount > self.top[0]:
+            self.top = (amount, description, category)
+
+    def row(self, user_id, budget_amount, now):
+        weekday, weekend = [], []
+        for day, spent in enumerate(self.days, start=1):
+            (weekday if date(self.year, self.month, day).weekday() < 5 else weekend).append(spent)
+        top_amount, top_description, top_category = self.top or (None, None, None)
+        return {
+            'user_id': user_id, 'year': self.year, 'month': self.month,
+            'total_spent': round(self.total, 2), 'txn_count': self.count, 'budget_amount': budget_amount,
+            'category_totals': json.dumps({k: round(v, 2) for k, v in sorted(self.categories.items())}),
+            'food_totals': json.dumps({k: round(v, 2) for k, v in sorted(self.food.items())}),
+            'daily_totals': json.dumps([round(v, 2) for v in self.days]),
+            'weekday_avg': round(sum(weekday) / max(1, len(weekday)), 2),
+            'weekend_avg': round(sum(weekend) / max(1, len(weekend)), 2),
+            'top_expense_amount': top_amount,
+            'top_expense_description': (top_description or '')[:200] or None,
+            'top_expense_category': top_category,
+            'is_stale': False, 'built_at': now,
+        }
+
+
+def summarize(user_ids, first, last):
+    """Summary rows for every (user, month) with first <= month_index <= last,
+    from the month the user joined or first spent. ``last`` must be closed."""
+    if not user_ids or first > last:
+        return []
+    start = date(*month_of(first), 1)
+    end = date(*month_of(last + 1), 1)
+    totals = {}
+    rows = db.session.query(
+        Transaction.user_id, Transaction.date, Transaction.amount, Transaction.category,
+        Transaction.subcategory, Transaction.is_food, Transaction.description
+    ).filter(
+        Transaction.user_id.in_(user_ids), within(Transaction.date, days_range(start, end - timedelta(days=1)))
+    ).order_by(Transaction.user_id, Transaction.date).yield_per(STREAM_ROWS)
+    for uid, when, amount, category, subcategory, is_food, description in rows:
+        key = (uid, month_index(when.year, when.month))
+        month = totals.get(key)
+        if month is None:
+            month = totals[key] = _MonthTotals(when.year, when.month)
+        month.add(when.day, amount, category, subcategory, is_food, description)
+
+    budgets = {
+        (uid, month_index(year, month)): amount
+        for uid, year, month, amount in db.session.query(
+            Budget.user_id, Budget.year, Budget.month, Budget.total_amount
+        ).filter(Budget.user_id.in_(user_ids))
+        if first <= month_index(year, month) <= last
+    }
+    joined = dict(db.session.query(User.id, User.created_at).filter(User.id.in_(user_ids)))
+
+    now = datetime.utcnow()
+    out = []
+    for uid in user_ids:
+        created = joined.get(uid)
+        starts = [month for (owner, month) in totals if owner == uid]
+        if created is not None:
+            starts.append(month_index(created.year, created.month))
+        for index in range(max(first, min(starts, default=last + 1)), last + 1):
+            month = totals.get((uid, index)) or _MonthTotals(*month_of(index))
+            out.append(month.row(uid, budgets.get((uid, index)), now))
+    return out
+
+
+def write_summaries(rows):
+    """Replace the stored rows for the (user, month) pairs in ``rows``."""
+    if not rows:
+        return 0
+    by_user = {}
+    for row in rows:
+        by_user.setdefault(row['user_id'], []).append(month_index(row['year'], row['month']))
+    for uid, months in by_user.items():
+        db.session.execute(db.delete(MonthlySummary).where(
+            MonthlySummary.user_id == uid, STORED_MONTH.in_(months)
+        ))
+    db.session.execute(MonthlySummary.__table__.insert(), rows)
+    return len(rows)
+
+
+def _stored(user_ids, first, last):
+    """{(user_id, month_index): is_stale} for stored rows in the range."""
+    return {
+        (uid, month_index(year, month)): stale
+        for uid, year, month, stale in db.session.query(
+            MonthlySummary.user_id, MonthlySummary.year, MonthlySummary.month, MonthlySummary.is_stale
+        ).filter(MonthlySummary.user_id.in_(user_ids), STORED_MONTH.between(first, last))
+    }
+
+
+def _user_batches(user_id=None):
+    query = db.session.query(User.id).order_by(User.id)
+    if user_id is not None:
+        query = query.filter(User.id == user_id)
+    ids = [uid for (uid,) in query]
+    for start in range(0, len(ids), BATCH_USERS):
+        yield ids[start:start + BATCH_USERS]
+
+
+def _fill(user_ids, first, last, rebuild=False):
+    """Write the months in range that are missing or stale (all of them with rebuild)."""
+    rows = summarize(user_ids, first, last)
+    if not rebuild:
+        stored = _stored(user_ids, first, last)
+        rows = [row for row in rows
+                if stored.get((row['user_id'], month_index(row['year'], row['month'])), True)]
+    return write_summaries(rows)
+
+
+def close_month(year, month):
+    """Summarise a closed month for every user who doesn't have it yet. The caller commits."""
+    index = month_index(year, month)
+    if index >= current_month_index():
+        raise ValueError(f'{year}-{month:02d} has not ended yet')
+    return sum(_fill(ids, index, index) for ids in _user_batches())
+
+
+def backfill(user_id=None, rebuild=False):
+    """Summarise every closed month of every user (or one user). Returns rows written."""
+    last = current_month_index() - 1
+    first_txn = db.session.query(db.func.min(Transaction.date)).scalar()
+    first_user = db.session.query(db.func.min(User.created_at)).scalar()
+    starts = [month_index(d.year, d.month) for d in (first_txn, first_user) if d is not None]
+    if not starts:
+        return 0
+    return sum(_fill(ids, min(starts), last, rebuild) for ids in _user_batches(user_id))
+
+
+def first_month(user):
+    """month_index of the user's first activity: joining, or their earliest spend."""
+    months = [month_index(user.created_at.year, user.created_at.month)] if user.created_at else []
+    first_day = db.session.query(db.func.min(DailySpend.day)).filter(DailySpend.user_id == user.id).scalar()
+    if first_day is not None:
+        months.append(month_index(first_day.year, first_day.month))
+    return min(months, default=current_month_index())
+
+
+def month_summaries(user, first, last):
+    """{month_index: MonthlySummary} for the user's closed months in range.
+    Missing or stale months are computed but not stored; close-month,
+    backfill-summaries and the rebuild job persist them."""
+    last = min(last, current_month_index() - 1)
+    first = max(first, first_month(user))
+    if first > last:
+        return {}
+    rows = MonthlySummary.query.filter(
+        MonthlySummary.user_id == user.id, STORED_MONTH.between(first, last),
+        MonthlySummary.is_stale == False  # noqa: E712
+    ).all()
+    out = {month_index(row.year, row.month): row for row in rows}
+    missing = [index for index in range(first, last + 1) if index not in out]
+    if missing:
+        for row in summarize([user.id], min(missing), max(missing)):
+            index = month_index(row['year'], row['month'])
+            if index not in out:
+                # Transient: never added to the session
+                out[index] = MonthlySummary(**row)
+    return out
+
+
+def mark_summary_stale(user_id, days):
+    """Flag the closed months among ``days`` for a rebuild and queue the job."""
+    current = current_month_index()
+    months = sorted({month_index(d.year, d.month) for d in days if month_index(d.year, d.month) < current})
+    if not months:
+        return
+    flagged = db.session.execute(
+        db.update(MonthlySummary).where(MonthlySummary.user_id == user_id, STORED_MONTH.in_(months))
+        .values(is_stale=True).execution_options(synchronize_session=False)
+    ).rowcount
+    if flagged:
+        from app.jobs import enqueue
+        enqueue('summaries.rebuild', user_id=user_id, unique=True)
+
+
+def rebuild_summaries_job(job):
+    """``summaries.rebuild`` job: rebuild the user's stale months."""
+    months = [month_index(year, month) for year, month in db.session.query(
+        MonthlySummary.year, MonthlySummary.month
+    ).filter(MonthlySummary.user_id == job.user_id, MonthlySummary.is_stale == True)]  # noqa: E712
+    if not months:
+        return {'rebuilt': 0}
+    return {'rebuilt': _fill([job.user_id], min(months), max(months))}
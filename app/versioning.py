@@ -0,0 +1,84 @@
+"""Per-user data version used for ETags.
+
+``User.data_version`` is bumped in the same flush as any ORM write to a
+user's transactions, meal plans, alerts, savings goals, budgets, badges
+or bill splits, or to the user's own monthly budget. Writers that go
+through Core statements (e.g. app.notifications, envelope allocations,
+split settlement) bump it explicitly with :func:`bump_data_version`.
+The version keys both the ETags below and the view cache (app.cache).
+"""
+from datetime import date
+from flask import current_app, request, jsonify
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models import (User, Transaction, MealPlan, Alert, SavingsGoal, Budget, Badge,
+                        BillSplit, SplitParticipant)
+
+# model: column holding the owning user's id
+VERSIONED_MODELS = {
+    Transaction: 'user_id', MealPlan: 'user_id', Alert: 'user_id', SavingsGoal: 'user_id',
+    Budget: 'user_id', Badge: 'user_id', BillSplit: 'creator_id', SplitParticipant: 'user_id',
+}
+VERSIONED_USER_FIELDS = ('monthly_budget',)
+
+
+def bump_data_version(user_id):
+    db.session.execute(
+        db.update(User).where(User.id == user_id).values(data_version=User.data_version + 1)
+        .execution_options(synchronize_session='fetch')
+    )
+
+
+def bump_data_versions(user_ids):
+    """bump_data_version for many users in one UPDATE."""
+    if user_ids:
+        db.session.execute(
+            db.update(User).where(User.id.in_(user_ids)).values(data_version=User.data_version + 1)
+            .execution_options(synchronize_session='fetch')
+        )
+
+
+def data_etag(user, view):
+    """Strong ETag for a view of a user's data; day-sensitive figures change at midnight."""
+    return f'{view}-{user.id}-{user.data_version or 0}-{date.today().isoformat()}'
+
+
+def conditional_json(user, view, build):
+    """Return 304 if the client's ETag matches, else jsonify(build()) tagged with it."""
+    etag = data_etag(user, view)
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(build())
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _touched_user_ids(session):
+    user_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        owner = VERSIONED_MODELS.get(type(obj))
+        if owner is not None:
+            if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+                continue
+            if getattr(obj, owner) is not None:
+                user_ids.add(getattr(obj, owner))
+        elif isinstance(obj, User) and obj.id is not None and obj in session.dirty:
+            state = db.inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in VERSIONED_USER_FIELDS):
+                user_ids.add(obj.id)
+    return user_ids
+
+
+@event.listens_for(Session, 'before_flush')
+def _bump_versions_on_flush(session, flush_context, instances):
+    user_ids = _touched_user_ids(session)
+    if not user_ids:
+        return
+    with session.no_autoflush:
+        for user_id in user_ids:
+            user = session.get(User, user_id)
+            if user is not None:
+                user.data_version = User.data_version + 1
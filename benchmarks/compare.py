@@ -0,0 +1,79 @@
+"""Compare two benchmark result files.
+
+An endpoint counts as a regression when it runs more queries than the
+baseline, or when its p50 or p95 latency grew by more than ``threshold``
+(relative) and by more than ``min_ms`` (absolute). The absolute floor
+keeps sub-millisecond jitter on cheap endpoints from being flagged::
+
+    python -m benchmarks.compare benchmarks/baseline.json benchmarks/results/20260101-120000.json
+"""
+import json
+import click
+
+
+def _change(old, new):
+    return (new - old) / old if old else 0.0
+
+
+def compare(baseline, current, threshold=0.15, min_ms=1.0):
+    """One row per endpoint in either result, in the current run's order."""
+    old_endpoints, new_endpoints = baseline['endpoints'], current['endpoints']
+    names = list(new_endpoints) + [name for name in old_endpoints if name not in new_endpoints]
+    rows = []
+    for name in names:
+        old, new = old_endpoints.get(name), new_endpoints.get(name)
+        if old is None or new is None:
+            rows.append({'endpoint': name, 'status': 'new' if old is None else 'missing', 'regression': False})
+            continue
+        slower = [
+            key for key in ('p50_ms', 'p95_ms')
+            if _change(old[key], new[key]) > threshold and new[key] - old[key] > min_ms
+        ]
+        more_queries = new['queries'] > old['queries']
+        rows.append({
+            'endpoint': name,
+            'status': 'ok',
+            'p50_ms': (old['p50_ms'], new['p50_ms'], _change(old['p50_ms'], new['p50_ms'])),
+            'p95_ms': (old['p95_ms'], new['p95_ms'], _change(old['p95_ms'], new['p95_ms'])),
+            'queries': (old['queries'], new['queries']),
+            'peak_kib': (old['peak_kib'], new['peak_kib'], _change(old['peak_kib'], new['peak_kib'])),
+            'regression': bool(slower or more_queries),
+        })
+    return rows
+
+
+def format_comparison(rows):
+    lines = [f"{'endpoint':<20} {'p50 ms':>22} {'p95 ms':>22} {'queries':>9} {'peak KiB':>24}"]
+    for row in rows:
+        if row['status'] != 'ok':
+            lines.append(f"{row['endpoint']:<20} ({row['status']} in this run)")
+            continue
+        p50, p95, queries, peak = row['p50_ms'], row['p95_ms'], row['queries'], row['peak_kib']
+        lines.append(
+            f"{row['endpoint']:<20} "
+            f"{p50[0]:>7.2f} → {p50[1]:>7.2f} {p50[2]:>+5.0%} "
+            f"{p95[0]:>7.2f} → {p95[1]:>7.2f} {p95[2]:>+5.0%} "
+            f"{queries[0]:>3} → {queries[1]:<3} "
+            f"{peak[0]:>8.1f} → {peak[1]:>8.1f} {peak[2]:>+5.0%}"
+            + ('  ⚠️ regression' if row['regression'] else '')
+        )
+    regressions = sum(row['regression'] for row in rows)
+    lines.append(f'{regressions} regression(s)' if regressions else 'No regressions')
+    return '\n'.join(lines)
+
+
+@click.command()
+@click.argument('baseline', type=click.File())
+@click.argument('current', type=click.File())
+@click.option('--threshold', default=0.15, show_default=True)
+@click.option('--min-ms', default=1.0, show_default=True)
+def main(baseline, current, threshold, min_ms):
+    """Compare CURRENT against BASELINE; exits 1 on regressions."""
+    rows = compare(json.load(baseline), json.load(current), threshold, min_ms)
+    click.echo(format_comparison(rows))
+    if any(row['regression'] for row in rows):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+"""Synthetic datasets for the benchmark suite.
+
+Builds a fresh schema and bulk-inserts users, transactions, meal plans,
+alerts, bill splits, budgets and savings goals. The data is shaped like
+``seed_demo_data`` but sized by command-line options. Rows go in through
+Core executemany inserts in chunks, so a million transactions take
+seconds rather than an ORM flush per row. Derived tables (daily_spend,
+envelope spent, unread alert counters) are written consistently, the
+way the ledger would have kept them.
+
+The same seed always produces the same dataset::
+
+    python -m benchmarks.dataset --users 500 --transactions 1000000
+"""
+import os
+import math
+import random
+from time import perf_counter
+from datetime import datetime, time, timedelta
+import click
+from app.extensions import db
+from app.models import (
+    User, Transaction, DailySpend, Budget, BudgetEnvelope, MealPlan, SavingsGoal,
+    BillSplit, SplitParticipant, Alert
+)
+
+CHUNK = 20000
+
+# category: (weight, median amount, spread, descriptions)
+CATEGORY_MIX = {
+    'Food': (0.46, 60, 0.6, ['Mess lunch', 'Canteen snack', 'Tea and biscuits', 'Dinner at mess',
+                             'Juice', 'Maggi', 'Samosa', 'Swiggy order', 'Groceries']),
+    'Travel': (0.16, 45, 0.8, ['Auto to college', 'Bus ticket', 'Metro card recharge', 'Rickshaw', 'Train home']),
+    'Academic': (0.09, 80, 0.9, ['Xerox notes', 'Pen and notebook', 'Lab printout', 'Exam fee', 'Textbook']),
+    'Entertainment': (0.10, 150, 0.7, ['Movie ticket', 'Netflix share', 'Game recharge', 'Concert']),
+    'Shopping': (0.07, 400, 0.8, ['T-shirt', 'Shoes', 'Earphones', 'Backpack']),
+    'Health': (0.04, 120, 0.7, ['Pharmacy', 'Clinic visit', 'Gym day pass']),
+    'Misc': (0.08, 90, 0.8, ['Laundry', 'Phone recharge', 'Haircut', 'Gift']),
+}
+FOOD_SUBCATEGORIES = ['Mess', 'Canteen', 'Restaurant', 'Delivery', 'Groceries', 'Snacks', 'Beverages']
+# Hours students actually spend at, roughly meal times plus an evening bump
+HOUR_WEIGHTS = {8: 3, 9: 2, 10: 1, 11: 1, 12: 3, 13: 4, 14: 2, 15: 1, 16: 2, 17: 3,
+                18: 2, 19: 3, 20: 4, 21: 3, 22: 2, 23: 1}
+MEAL_HOURS = {8: 'Breakfast', 9: 'Breakfast', 12: 'Lunch', 13: 'Lunch', 14: 'Lunch',
+              19: 'Dinner', 20: 'Dinner', 21: 'Dinner'}
+BUDGETS = [3000, 4000, 5000, 6000, 8000, 10000, 12000]
+PREFERENCES = [('Vegetarian', 5), ('Non-Vegetarian', 4), ('Eggetarian', 2), ('Vegan', 1)]
+FRIENDS = ['Priya', 'Rahul', 'Aman', 'Sneha', 'Karan', 'Ishita', 'Rohan', 'Meera', 'Arjun', 'Zoya']
+ALERTS = [
+    ('budget_warning', '⚠️ Budget Alert', "You've spent {pct}% of your monthly budget", '⚠️'),
+    ('daily_limit', '🚨 Daily Limit Exceeded', "You've spent ₹{amt} today", '🚨'),
+    ('savings', '🔥 Great Savings!', 'You saved ₹{amt} this week! Keep it up!', '🔥'),
+    ('meal_tip', '💡 Smart Tip', 'Skipping delivery today saves ₹{amt}', '💡'),
+]
+
+
+class DatasetSpec:
+    """Sizes for one generated dataset."""
+
+    def __init__(self, users=100, transactions=50000, days=180, meal_days=14,
+                 alerts=12, splits=4, seed=42):
+        self.users = users
+        self.transactions = transactions
+        self.days = days
+        self.meal_days = meal_days
+        self.alerts = alerts
+        self.splits = splits
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def _weighted(rng, pairs):
+    items, weights = zip(*pairs)
+    return rng.choices(items, weights)[0]
+
+
+def _insert(table, rows):
+    for start in range(0, len(rows), CHUNK):
+        db.session.execute(table.insert(), rows[start:start + CHUNK])
+
+
+def _user_volumes(rng, spec):
+    """Transactions per user: a heavy-tailed split of the total (a few students log a lot)."""
+    weights = [rng.paretovariate(1.6) for _ in range(spec.users)]
+    scale = spec.transactions / sum(weights)
+    counts = [int(w * scale) for w in weights]
+    for i in rng.sample(range(spec.users), spec.transactions - sum(counts)):
+        counts[i] += 1
+    return counts
+
+
+def build_dataset(spec):
+    """Drop and recreate every table, then fill them according to ``spec``."""
+    rng = random.Random(spec.seed)
+    db.drop_all()
+    db.create_all()
+
+    from app.bootstrap import seed_meal_catalog
+    seed_meal_catalog()
+
+    now = datetime.now().replace(microsecond=0)
+    today = now.date()
+    user_ids = list(range(1, spec.users + 1))
+    profiles = {
+        uid: (rng.choice(BUDGETS), _weighted(rng, PREFERENCES)) for uid in user_ids
+    }
+
+    alert_rows, unread = _alerts(rng, spec, user_ids, now)
+    _insert(User.__table__, [
+        {'id': uid, 'name': f'Bench Student {uid}', 'email': f'bench-{uid}@budgetbite.test',
+         'avatar': '', 'monthly_budget': float(profiles[uid][0]), 'living_type': rng.choice(['Hostel', 'PG', 'Flat', 'Home']),
+         'food_preference': profiles[uid][1], 'onboarding_complete': True,
+         'current_streak': 0, 'longest_streak': 0, 'unread_alert_count': unread.get(uid, 0),
+         'data_version': 0, 'created_at': now - timedelta(days=spec.days), 'updated_at': now}
+        for uid in user_ids
+    ])
+    _insert(Alert.__table__, alert_rows)
+
+    _transactions(rng, spec, user_ids, now)
+    _rollup()
+    _budgets(spec, user_ids, profiles, today)
+    _meal_plans(rng, spec, user_ids, profiles, today, now)
+    _splits(rng, spec, user_ids, now)
+    _insert(SavingsGoal.__table__, [
+        {'user_id': uid, 'name': rng.choice(['New Headphones', 'Trip to Goa', 'Laptop Fund', 'Bike']),
+         'target_amount': float(target), 'current_amount': float(rng.randint(0, target)),
+         'deadline': today + timedelta(days=rng.randint(15, 120)), 'is_completed': False, 'created_at': now}
+        for uid in user_ids for target in [rng.choice([1500, 2000, 5000, 20000])]
+    ])
+
+    _sync_sequences()
+    db.session.commit()
+
+
+def _alerts(rng, spec, user_ids, now):
+    rows, unread = [], {}
+    for uid in user_ids:
+        for _ in range(rng.randint(spec.alerts // 2, spec.alerts * 3 // 2)):
+            alert_type, title, message, icon = rng.choice(ALERTS)
+            is_read = rng.random() < 0.7
+            if not is_read:
+                unread[uid] = unread.get(uid, 0) + 1
+            rows.append({
+                'user_id': uid, 'alert_type': alert_type, 'title': title,
+                'message': message.format(pct=rng.randint(50, 110), amt=rng.randint(50, 600)),
+                'icon': icon, 'is_read': is_read,
+                'created_at': now - timedelta(minutes=rng.randint(0, spec.days * 24 * 60)),
+            })
+    return rows, unread
+
+
+def _transactions(rng, spec, user_ids, now):
+    categories = list(CATEGORY_MIX)
+    category_weights = [CATEGORY_MIX[c][0] for c in categories]
+    hours, hour_weights = zip(*HOUR_WEIGHTS.items())
+    table = Transaction.__table__
+    batch = []
+    for uid, count in zip(user_ids, _user_volumes(rng, spec)):
+        for _ in range(count):
+            category = rng.choices(categories, category_weights)[0]
+            _, median, spread, descriptions = CATEGORY_MIX[category]
+            hour = rng.choices(hours, hour_weights)[0]
+            when = datetime.combine(
+                now.date() - timedelta(days=int(rng.random() ** 1.3 * spec.days)),
+                time(hour, rng.randint(0, 59), rng.randint(0, 59))
+            )
+            if when > now:
+                when = now - timedelta(minutes=rng.randint(1, 600))
+            is_food = category == 'Food'
+            batch.append({
+                'user_id': uid,
+                'amount': float(max(5, round(rng.lognormvariate(math.log(median), spread)))),
+                'category': category,
+                'subcategory': rng.choice(FOOD_SUBCATEGORIES) if is_food else None,
+                'description': rng.choice(descriptions),
+                'date': when,
+                'is_food': is_food,
+                'meal_type': MEAL_HOURS.get(hour, 'Snack') if is_food else None,
+                'created_at': when,
+            })
+            if len(batch) >= CHUNK:
+                db.session.execute(table.insert(), batch)
+                batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+
+
+def _rollup():
+    """daily_spend straight from transactions with one INSERT ... SELECT."""
+    day = db.func.date(Transaction.date)
+    db.session.execute(DailySpend.__table__.insert().from_select(
+        ['user_id', 'day', 'category', 'total', 'txn_count'],
+        db.select(Transaction.user_id, day, Transaction.category,
+                  db.func.sum(Transaction.amount), db.func.count(Transaction.id))
+        .group_by(Transaction.user_id, day, Transaction.category)
+    ))
+
+
+def _budgets(spec, user_ids, profiles, today):
+    from app.envelopes import default_allocations, RESERVE_SHARE
+    from app.daterange import month_range
+    _insert(Budget.__table__, [
+        {'id': uid, 'user_id': uid, 'month': today.month, 'year': today.year,
+         'total_amount': float(profiles[uid][0]),
+         'emergency_reserve': profiles[uid][0] * RESERVE_SHARE, 'created_at': datetime.now()}
+        for uid in user_ids
+    ])
+    start, end = month_range(today.year, today.month)
+    spent = {
+        (uid, category): float(total or 0)
+        for uid, category, total in db.session.query(
+            DailySpend.user_id, DailySpend.category, db.func.sum(DailySpend.total)
+        ).filter(DailySpend.day >= start.date(), DailySpend.day < end.date())
+        .group_by(DailySpend.user_id, DailySpend.category)
+    }
+    rows = []
+    for uid in user_ids:
+        total = profiles[uid][0]
+        allocations = {**default_allocations(total), 'Misc': total * RESERVE_SHARE}
+        rows.extend({'budget_id': uid, 'category': category, 'allocated': amount,
+                     'spent': spent.get((uid, category), 0.0)}
+                    for category, amount in allocations.items())
+    _insert(BudgetEnvelope.__table__, rows)
+
+
+def _meal_plans(rng, spec, user_ids, profiles, today, now):
+    from app.blueprints.meals.catalog import MEAL_DATABASE
+    rows = []
+    for uid in user_ids:
+        menu = MEAL_DATABASE[profiles[uid][1]]
+        for offset in range(-spec.meal_days, 7):
+            day = today + timedelta(days=offset)
+            meal_types = ['Breakfast', 'Lunch', 'Dinner'] + (['Snack'] if rng.random() < 0.5 else [])
+            for meal_type in meal_types:
+                item = rng.choice(menu[meal_type])
+                rows.append({
+                    'user_id': uid, 'date': day, 'meal_type': meal_type, 'name': item['name'],
+                    'cost': float(item['cost']), 'calories': item['calories'], 'protein': float(item['protein']),
+                    'nutrition_score': float(item['score']), 'source': item['source'],
+                    'is_completed': offset < 0 and rng.random() < 0.7, 'created_at': now,
+                })
+    _insert(MealPlan.__table__, rows)
+
+
+def _splits(rng, spec, user_ids, now):
+    from app.blueprints.social.settlement import allocate
+    splits, participants = [], []
+    split_id = 0
+    for uid in user_ids:
+        for _ in range(rng.randint(0, spec.splits * 2)):
+            split_id += 1
+            total = float(rng.choice([200, 350, 480, 600, 900, 1200, 2400]))
+            friends = rng.sample(FRIENDS, rng.randint(1, 4))
+            shares = allocate(total, [1] * (len(friends) + 1))
+            unpaid = 0
+            participants.append({
+                'split_id': split_id, 'name': 'You', 'user_id': uid, 'share': shares[0],
+                'paid': True, 'paid_at': now, 'is_creator': True, 'is_payer': True,
+            })
+            for name, share in zip(friends, shares[1:]):
+                paid = rng.random() < 0.55
+                unpaid += not paid
+                participants.append({
+                    'split_id': split_id, 'name': name, 'user_id': None, 'share': share,
+                    'paid': paid, 'paid_at': now if paid else None, 'is_creator': False, 'is_payer': False,
+                })
+            splits.append({
+                'id': split_id, 'creator_id': uid, 'title': rng.choice(['Dinner', 'Cab to station', 'Movie night', 'Groceries', 'Trip']),
+                'total_amount': total, 'split_type': 'equal', 'is_settled': unpaid == 0,
+                'created_at': now - timedelta(days=rng.randint(0, spec.days)),
+            })
+    _insert(BillSplit.__table__, splits)
+    _insert(SplitParticipant.__table__, participants)
+
+
+def _sync_sequences():
+    """Explicit ids bypass Postgres sequences; move them past the inserted rows."""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for table in ('users', 'budgets', 'bill_splits'):
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+
+
+def bench_app(database_url):
+    """An app bound to ``database_url`` with bootstrap and periodic logging off."""
+    from app import create_app
+    from app.config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        AUTO_BOOTSTRAP = False
+        TESTING = True
+        WTF_CSRF_ENABLED = False
+        POOL_STATS_LOG_SECONDS = 0
+        SQL_PROFILER = True
+        SQL_REPEAT_WARN = False
+
+    return create_app(BenchConfig)
+
+
+DEFAULT_DATABASE = 'sqlite:///' + os.path.join(os.path.dirname(os.path.abspath(__file__)), '.data', 'bench.db')
+
+
+@click.command()
+@click.option('--database-url', default=DEFAULT_DATABASE, show_default=True,
+              help='Database to (re)build. Everything in it is dropped.')
+@click.option('--users', default=100, show_default=True)
+@click.option('--transactions', default=50000, show_default=True)
+@click.option('--days', default=180, show_default=True, help='Days of transaction history.')
+@click.option('--seed', default=42, show_default=True)
+def main(database_url, users, transactions, days, seed):
+    """Build a benchmark dataset."""
+    if database_url.startswith('sqlite:///'):
+        os.makedirs(os.path.dirname(os.path.abspath(database_url[len('sqlite:///'):])), exist_ok=True)
+    spec = DatasetSpec(users=users, transactions=transactions, days=days, seed=seed)
+    app = bench_app(database_url)
+    started = perf_counter()
+    with app.app_context():
+        build_dataset(spec)
+    click.echo(f'Built {transactions} transactions for {users} users in {perf_counter() - started:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
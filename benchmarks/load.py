@@ -0,0 +1,312 @@
+"""HTTP load driver with a weighted "student day" traffic mix.
+
+Unlike benchmarks.run, which calls views in-process one at a time, this
+sends real HTTP requests concurrently. The target is a server it starts
+itself (gunicorn with several workers, or the Vercel handler in
+api/index.py under a threaded WSGI server) or any URL you give it.
+
+Requests go out open-loop at ``--rps``: each one has a scheduled send
+time and is fired from a thread pool. A slow server therefore shows up
+as growing latency and send delay instead of quietly lowering the
+offered load. Latency is measured from the scheduled time (it includes
+queueing in the driver); ``delay`` is how late the send itself was.
+
+Signed-in users are either dataset users with session cookies signed by
+the server's SECRET_KEY (``--login signed``, the default when this
+starts the server) or the demo account via auth.demo_login::
+
+    python -m benchmarks.load --serve gunicorn --workers 4 --rps 80 --duration 60 \\
+        --database-url sqlite:///benchmarks/.data/load.db \\
+        --database-url postgresql://localhost/budget_bite_bench
+"""
+import os
+import sys
+import json
+import random
+import secrets
+import socket
+import subprocess
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter, sleep
+import click
+import requests
+from benchmarks.dataset import DatasetSpec, build_dataset, bench_app
+from benchmarks.run import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name: (weight, method, path). A typical day: lots of dashboard views and
+# alert polling, a steady trickle of quick-adds and meal completions.
+TRAFFIC_MIX = {
+    'dashboard': (24, 'GET', '/dashboard/'),
+    'dashboard.summary': (8, 'GET', '/dashboard/api/summary'),
+    'alerts.poll': (18, 'GET', '/alerts/api/unread-count'),
+    'quick_add': (12, 'POST', '/expenses/quick-add'),
+    'meals.complete': (6, 'POST', '/meals/complete/{meal_id}'),
+    'meals': (6, 'GET', '/meals/'),
+    'expenses': (8, 'GET', '/expenses/'),
+    'analytics': (6, 'GET', '/analytics/'),
+    'budget': (5, 'GET', '/budget/'),
+    'gamification': (4, 'GET', '/gamification/'),
+    'social': (3, 'GET', '/social/'),
+}
+QUICK_ADDS = [
+    {'amount': 20, 'category': 'Food', 'description': 'Chai'},
+    {'amount': 45, 'category': 'Food', 'description': 'Canteen snack'},
+    {'amount': 30, 'category': 'Travel', 'description': 'Auto'},
+    {'amount': 120, 'category': 'Food', 'description': 'Swiggy order'},
+    {'amount': 15, 'category': 'Academic', 'description': 'Xerox'},
+]
+
+
+class VirtualUser:
+    """A signed-in user (one session cookie) plus the meal ids it can complete.
+
+    Requests reuse one HTTP connection per driver thread. Cookies set by
+    responses (flash messages) are dropped, so every request carries the
+    same session and the cookie doesn't grow over a long run.
+    """
+
+    _local = threading.local()
+
+    def __init__(self, base_url, cookie=None):
+        self.base_url = base_url
+        if cookie is None:
+            response = requests.get(base_url + '/auth/demo-login', allow_redirects=False, timeout=30)
+            cookie = response.cookies.get('session')
+        self.cookie = cookie
+        self.meal_ids = []
+
+    def send(self, method, path, body=None):
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = self._local.http = requests.Session()
+        http.cookies.clear()
+        return http.request(method, self.base_url + path, json=body, cookies={'session': self.cookie},
+                            allow_redirects=False, timeout=30)
+
+    def load_meals(self):
+        response = self.send('GET', '/meals/api/calendar')
+        if response.ok:
+            self.meal_ids = [meal['id'] for day in response.json()['days'] for meal in day['meals']]
+
+    def request(self, route, rng):
+        _, method, path = TRAFFIC_MIX[route]
+        body = None
+        if route == 'quick_add':
+            body = rng.choice(QUICK_ADDS)
+        elif route == 'meals.complete':
+            if not self.meal_ids:
+                return None
+            path = path.format(meal_id=rng.choice(self.meal_ids))
+        return self.send(method, path, body)
+
+
+def signed_cookies(secret_key, user_ids):
+    """Flask session cookies logging in each user id, as the server would sign them."""
+    from flask import Flask
+    from flask.sessions import SecureCookieSessionInterface
+    signer_app = Flask(__name__)
+    signer_app.secret_key = secret_key
+    serializer = SecureCookieSessionInterface().get_signing_serializer(signer_app)
+    return [serializer.dumps({'_user_id': str(uid), '_fresh': True}) for uid in user_ids]
+
+
+def run_load(users, rps, duration, concurrency, seed):
+    """Offer ``rps`` requests/second for ``duration`` seconds; returns per-route samples."""
+    rng = random.Random(seed)
+    routes = list(TRAFFIC_MIX)
+    weights = [TRAFFIC_MIX[r][0] for r in routes]
+    samples = defaultdict(list)  # route -> [(latency ms, delay ms, ok)]
+    lock = threading.Lock()
+
+    def fire(user, route, scheduled, call_rng):
+        sent = perf_counter()
+        try:
+            response = user.request(route, call_rng)
+            if response is None:
+                return
+            # A redirect to the login page means the session wasn't accepted
+            ok = response.status_code < 400 and '/auth/login' not in response.headers.get('Location', '')
+        except requests.RequestException:
+            ok = False
+        done = perf_counter()
+        with lock:
+            samples[route].append(((done - scheduled) * 1000, (sent - scheduled) * 1000, ok))
+
+    total = int(rps * duration)
+    started = perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(total):
+            scheduled = started + i / rps
+            wait = scheduled - perf_counter()
+            if wait > 0:
+                sleep(wait)
+            route = rng.choices(routes, weights)[0]
+            pool.submit(fire, rng.choice(users), route, scheduled, random.Random(rng.random()))
+    elapsed = perf_counter() - started
+    return samples, elapsed
+
+
+def summarize(samples, elapsed):
+    rows = {}
+    everything = []
+    for route in TRAFFIC_MIX:
+        entries = samples.get(route, [])
+        if not entries:
+            continue
+        everything.extend(entries)
+        rows[route] = _summary(entries, elapsed)
+    rows['ALL'] = _summary(everything, elapsed)
+    return rows
+
+
+def _summary(entries, elapsed):
+    latencies = sorted(e[0] for e in entries)
+    delays = sorted(e[1] for e in entries)
+    errors = sum(not e[2] for e in entries)
+    return {
+        'requests': len(entries),
+        'throughput_rps': round(len(entries) / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+        'max_ms': round(latencies[-1], 1),
+        'delay_p95_ms': round(percentile(delays, 95), 1),
+        'error_rate': round(errors / len(entries), 4),
+    }
+
+
+def format_summary(label, rows):
+    lines = [label, f"{'route':<18} {'reqs':>6} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'delay95':>8} {'errors':>7}"]
+    for route, row in rows.items():
+        lines.append(
+            f"{route:<18} {row['requests']:>6} {row['throughput_rps']:>7.1f} {row['p50_ms']:>8.1f} "
+            f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['delay_p95_ms']:>8.1f} {row['error_rate']:>7.1%}"
+        )
+    return '\n'.join(lines)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, database_url, secret_key, workers, threads, admin_email):
+    """Start gunicorn or the Vercel handler on a free port; returns (process, base URL)."""
+    port = _free_port()
+    env = dict(os.environ, DATABASE_URL=database_url, SECRET_KEY=secret_key, AUTO_BOOTSTRAP='0',
+               ADMIN_EMAILS=admin_email, POOL_STATS_LOG_SECONDS='0')
+    if kind == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--threads', str(threads),
+                   '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', 'api.index:app']
+    else:
+        command = [sys.executable, '-c',
+                   'import sys; from werkzeug.serving import run_simple; from api.index import app; '
+                   'run_simple("127.0.0.1", int(sys.argv[1]), app, threaded=True)', str(port)]
+    process = subprocess.Popen(command, cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    base_url = f'http://127.0.0.1:{port}'
+    for _ in range(150):
+        if process.poll() is not None:
+            raise click.ClickException(f'{kind} exited:\n{process.stderr.read()[-2000:]}')
+        try:
+            requests.get(base_url + '/auth/login', timeout=1)
+            return process, base_url
+        except requests.RequestException:
+            sleep(0.2)
+    process.terminate()
+    raise click.ClickException(f'{kind} did not start listening on {base_url}')
+
+
+def _prepare_users(base_url, login, secret_key, user_ids, sessions):
+    if login == 'signed':
+        ids = user_ids[:sessions]
+        users = [VirtualUser(base_url, cookie) for cookie in signed_cookies(secret_key, ids)]
+    else:
+        users = [VirtualUser(base_url)]
+    for user in users:
+        user.load_meals()
+    return users
+
+
+@click.command()
+@click.option('--url', default=None, help='Load an already running server instead of starting one.')
+@click.option('--serve', type=click.Choice(['gunicorn', 'vercel']), default='vercel', show_default=True,
+              help='Server to start when --url is not given (vercel = api/index.py under a threaded WSGI server).')
+@click.option('--database-url', 'database_urls', multiple=True,
+              help='Backend(s) to start the server against, one run each. Rebuilt unless --reuse.')
+@click.option('--reuse', is_flag=True, help='Keep the existing dataset in each database.')
+@click.option('--users', default=200, show_default=True, help='Dataset users to build.')
+@click.option('--transactions', default=100000, show_default=True)
+@click.option('--workers', default=4, show_default=True, help='gunicorn worker processes.')
+@click.option('--threads', default=2, show_default=True, help='gunicorn threads per worker.')
+@click.option('--login', type=click.Choice(['signed', 'demo']), default=None,
+              help='signed: dataset users via signed cookies (needs --secret-key with --url). '
+                   'demo: everyone shares the demo account.')
+@click.option('--secret-key', default=None, help="The server's SECRET_KEY, for --login signed with --url.")
+@click.option('--sessions', default=50, show_default=True, help='Distinct signed-in users to spread load over.')
+@click.option('--rps', default=30.0, show_default=True, help='Offered requests per second.')
+@click.option('--duration', default=30, show_default=True, help='Seconds of load per backend.')
+@click.option('--concurrency', default=64, show_default=True, help='Max requests in flight.')
+@click.option('--seed', default=42, show_default=True)
+@click.option('--out', default=None, help='Write all results as JSON here.')
+def main(url, serve, database_urls, reuse, users, transactions, workers, threads, login, secret_key,
+         sessions, rps, duration, concurrency, seed, out):
+    """Replay a weighted student-day traffic mix against the app over HTTP."""
+    results = {}
+    if url:
+        login = login or ('signed' if secret_key else 'demo')
+        if login == 'signed' and not secret_key:
+            raise click.UsageError('--login signed with --url needs --secret-key')
+        user_ids = list(range(1, sessions + 1))
+        vus = _prepare_users(url.rstrip('/'), login, secret_key, user_ids, sessions)
+        samples, elapsed = run_load(vus, rps, duration, concurrency, seed)
+        results[url] = {'summary': summarize(samples, elapsed)}
+        click.echo(format_summary(url, results[url]['summary']))
+    else:
+        login = login or 'signed'
+        for database_url in database_urls or ['sqlite:///' + os.path.join(ROOT, 'benchmarks', '.data', 'load.db')]:
+            if database_url.startswith('sqlite:///'):
+                os.makedirs(os.path.dirname(os.path.abspath(database_url[len('sqlite:///'):])), exist_ok=True)
+            app = bench_app(database_url)
+            with app.app_context():
+                if not reuse:
+                    build_dataset(DatasetSpec(users=users, transactions=transactions, seed=seed))
+                from app.models import User
+                user_ids = [uid for (uid,) in User.query.with_entities(User.id).order_by(User.id)]
+            key = secrets.token_hex(16)
+            admin_email = 'bench-1@budgetbite.test'
+            process, base_url = start_server(serve, database_url, key, workers, threads, admin_email)
+            try:
+                vus = _prepare_users(base_url, login, key, user_ids, sessions)
+                samples, elapsed = run_load(vus, rps, duration, concurrency, seed)
+                pool = None
+                if login == 'signed':
+                    admin = VirtualUser(base_url, signed_cookies(key, [1])[0])
+                    response = admin.send('GET', '/admin/api/pool')
+                    pool = response.json() if response.ok else None
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+            label = f'{serve} × {database_url.split(":", 1)[0]} ({database_url})'
+            results[label] = {'summary': summarize(samples, elapsed), 'pool': pool}
+            click.echo(format_summary(label, results[label]['summary']))
+            if pool:
+                click.echo(f"pool (one worker): profile={pool['profile']} peak_in_use={pool['peak_in_use']} "
+                           f"peak_overflow={pool['peak_overflow']} timeouts={pool['timeouts']} "
+                           f"wait_p95={pool['wait_ms']['p95']}ms opened={pool['connections']['opened']}")
+            click.echo('')
+
+    if out:
+        with open(out, 'w') as f:
+            json.dump({'rps': rps, 'duration': duration, 'mix': {k: v[0] for k, v in TRAFFIC_MIX.items()},
+                       'runs': results}, f, indent=2)
+        click.echo(f'Wrote {out}')
+
+
+if __name__ == '__main__':
+    main()
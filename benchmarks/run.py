@@ -0,0 +1,231 @@
+"""Endpoint benchmarks through the Flask test client.
+
+Builds (or reuses) a dataset from benchmarks.dataset. It then calls each
+endpoint as a rotating sample of users and records latency percentiles,
+query count and DB time (read from the Server-Timing header written by
+app.profiler) and peak Python memory. Results are written as JSON and
+can be compared against a saved baseline::
+
+    python -m benchmarks.run --users 200 --transactions 200000 --save-baseline benchmarks/baseline.json
+    # ... change something ...
+    python -m benchmarks.run --reuse --baseline benchmarks/baseline.json
+
+Latency and memory are measured in separate passes, because tracemalloc
+slows every allocation down.
+"""
+import os
+import re
+import json
+import random
+import platform
+import subprocess
+import tracemalloc
+from datetime import datetime
+from time import perf_counter
+import click
+import sqlalchemy
+from app.extensions import db
+from benchmarks.dataset import DatasetSpec, build_dataset, bench_app, DEFAULT_DATABASE
+from benchmarks.compare import compare, format_comparison
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# name: (method, path, JSON body)
+ENDPOINTS = {
+    'dashboard': ('GET', '/dashboard/', None),
+    'dashboard.summary': ('GET', '/dashboard/api/summary', None),
+    'dashboard.weekly': ('GET', '/dashboard/api/weekly-data', None),
+    'analytics': ('GET', '/analytics/', None),
+    'expenses': ('GET', '/expenses/', None),
+    'expenses.api': ('GET', '/expenses/api/list?total=1', None),
+    'budget': ('GET', '/budget/', None),
+    'meals': ('GET', '/meals/', None),
+    'meals.calendar': ('GET', '/meals/api/calendar', None),
+    'gamification': ('GET', '/gamification/', None),
+    'social': ('GET', '/social/', None),
+    'alerts': ('GET', '/alerts/', None),
+    'quick_add': ('POST', '/expenses/quick-add', {'amount': 40, 'category': 'Food', 'description': 'Chai + samosa'}),
+}
+
+_DB_TIMING = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+def percentile(ordered, pct):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class Driver:
+    """One logged-in test client per sampled user, used in rotation."""
+
+    def __init__(self, app, user_ids):
+        self.app = app
+        self.clients = []
+        for user_id in user_ids:
+            client = app.test_client()
+            with client.session_transaction() as session:
+                session['_user_id'] = str(user_id)
+                session['_fresh'] = True
+            self.clients.append(client)
+        self._next = 0
+
+    def call(self, method, path, body):
+        client = self.clients[self._next % len(self.clients)]
+        self._next += 1
+        started = perf_counter()
+        response = client.open(path, method=method, json=body)
+        elapsed_ms = (perf_counter() - started) * 1000
+        queries, db_ms = 0, 0.0
+        for header in response.headers.getlist('Server-Timing'):
+            match = _DB_TIMING.search(header)
+            if match:
+                db_ms, queries = float(match.group(1)), int(match.group(2))
+        return response.status_code, elapsed_ms, queries, db_ms
+
+
+def bench_endpoint(driver, method, path, body, iterations, warmup, memory_iterations):
+    # Every sampled user is warmed at least once so lazily persisted state
+    # (streaks, caches) doesn't land in the timed calls
+    for _ in range(max(warmup, len(driver.clients))):
+        driver.call(method, path, body)
+
+    latencies, query_counts, db_times, errors = [], [], [], 0
+    for _ in range(iterations):
+        status, elapsed_ms, queries, db_ms = driver.call(method, path, body)
+        errors += status >= 400
+        latencies.append(elapsed_ms)
+        query_counts.append(queries)
+        db_times.append(db_ms)
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        for _ in range(memory_iterations):
+            tracemalloc.reset_peak()
+            driver.call(method, path, body)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    query_counts.sort()
+    db_times.sort()
+    return {
+        'iterations': iterations,
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p90_ms': round(percentile(latencies, 90), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'max_ms': round(latencies[-1], 3),
+        'queries': round(percentile(query_counts, 50)),
+        'max_queries': query_counts[-1],
+        'db_p50_ms': round(percentile(db_times, 50), 3),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def dataset_counts():
+    from app.models import User, Transaction, MealPlan, Alert, BillSplit
+    return {model.__tablename__: db.session.query(db.func.count(model.id)).scalar()
+            for model in (User, Transaction, MealPlan, Alert, BillSplit)}
+
+
+def run_benchmarks(app, endpoints, iterations, warmup, memory_iterations, sample_users, seed):
+    with app.app_context():
+        from app.models import User
+        user_ids = [uid for (uid,) in db.session.query(User.id).order_by(User.id)]
+        counts = dataset_counts()
+        dialect = db.engine.dialect.name
+    if not user_ids:
+        raise click.ClickException('The benchmark database has no users; run without --reuse first.')
+    sample = random.Random(seed).sample(user_ids, min(sample_users, len(user_ids)))
+    driver = Driver(app, sample)
+
+    results = {}
+    for name in endpoints:
+        method, path, body = ENDPOINTS[name]
+        results[name] = bench_endpoint(driver, method, path, body, iterations, warmup, memory_iterations)
+        click.echo(f"{name:<20} p50={results[name]['p50_ms']:>8.2f}ms p95={results[name]['p95_ms']:>8.2f}ms "
+                   f"queries={results[name]['queries']:>3} peak={results[name]['peak_kib']:>8.1f}KiB")
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'platform': platform.platform(),
+            'database': dialect,
+            'dataset': counts,
+            'iterations': iterations,
+            'sampled_users': len(sample),
+        },
+        'endpoints': results,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@click.command()
+@click.option('--database-url', default=DEFAULT_DATABASE, show_default=True)
+@click.option('--reuse', is_flag=True, help='Benchmark the existing dataset instead of rebuilding it.')
+@click.option('--users', default=100, show_default=True)
+@click.option('--transactions', default=50000, show_default=True)
+@click.option('--days', default=180, show_default=True)
+@click.option('--seed', default=42, show_default=True)
+@click.option('--iterations', default=50, show_default=True, help='Timed calls per endpoint.')
+@click.option('--warmup', default=5, show_default=True)
+@click.option('--memory-iterations', default=5, show_default=True)
+@click.option('--sample-users', default=20, show_default=True, help='Users the calls rotate through.')
+@click.option('--endpoint', 'only', multiple=True, type=click.Choice(list(ENDPOINTS)),
+              help='Only these endpoints (repeatable).')
+@click.option('--out', default=None, help='Result file (default benchmarks/results/<timestamp>.json).')
+@click.option('--baseline', default=None, type=click.Path(exists=True), help='Compare against this result file.')
+@click.option('--save-baseline', default=None, help='Also write the results here.')
+@click.option('--threshold', default=0.15, show_default=True, help='Relative p50/p95 slowdown counted as a regression.')
+@click.option('--min-ms', default=1.0, show_default=True, help='Ignore slowdowns smaller than this.')
+@click.option('--fail-on-regression', is_flag=True, help='Exit 1 if the comparison finds a regression.')
+def main(database_url, reuse, users, transactions, days, seed, iterations, warmup, memory_iterations,
+         sample_users, only, out, baseline, save_baseline, threshold, min_ms, fail_on_regression):
+    """Benchmark every blueprint endpoint and compare with a baseline."""
+    if database_url.startswith('sqlite:///'):
+        os.makedirs(os.path.dirname(os.path.abspath(database_url[len('sqlite:///'):])), exist_ok=True)
+    app = bench_app(database_url)
+    if not reuse:
+        started = perf_counter()
+        with app.app_context():
+            build_dataset(DatasetSpec(users=users, transactions=transactions, days=days, seed=seed))
+        click.echo(f'Built dataset in {perf_counter() - started:.1f}s')
+
+    result = run_benchmarks(app, only or list(ENDPOINTS), iterations, warmup, memory_iterations, sample_users, seed)
+
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    for path in filter(None, (out, save_baseline)):
+        with open(path, 'w') as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+        click.echo(f'Wrote {path}')
+
+    if baseline:
+        with open(baseline) as f:
+            rows = compare(json.load(f), result, threshold, min_ms)
+        click.echo(format_comparison(rows))
+        if fail_on_regression and any(row['regression'] for row in rows):
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,11 @@ if os.environ.get('FLASK_ENV') != 'production':
 from dotenv import load_dotenv
 load_dotenv()
 
+# Local dev creates tables and the demo user on start; serverless entry points don't.
+os.environ.setdefault('AUTO_BOOTSTRAP', '1')
+# ...and runs background jobs on threads inside the dev server
+os.environ.setdefault('JOBS_RUNNER', 'thread')
+
 from app import create_app
 
 app = create_app()
@@ -0,0 +1,33 @@
+import os
+import tempfile
+
+import pytest
+
+# Config reads the environment at import time
+_db_dir = tempfile.mkdtemp(prefix='budget-bite-tests-')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(_db_dir, "test.db")}'
+os.environ['AUTO_BOOTSTRAP'] = '1'
+os.environ['JOBS_RUNNER'] = 'worker'
+os.environ['CACHE_BACKEND'] = 'none'
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import create_app
+    app = create_app()
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    client.get('/auth/demo-login')
+    return client
+
+
+@pytest.fixture
+def demo_user(app, client):
+    from app.models import User
+    with app.app_context():
+        return User.query.filter_by(email='demo@budgetbite.app').one().id
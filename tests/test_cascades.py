@@ -0,0 +1,32 @@
+from app.extensions import db
+from app.models import BillSplit, SplitParticipant, Budget, BudgetEnvelope
+
+
+def test_deleting_a_split_deletes_its_participants(app, client, demo_user):
+    response = client.post('/social/split/create', data={
+        'title': 'Pizza', 'total_amount': '900', 'split_type': 'equal',
+        'participant_name': ['Asha', 'Ravi'], 'participant_value': ['', ''],
+    })
+    assert response.status_code == 302
+    with app.app_context():
+        split = BillSplit.query.filter_by(creator_id=demo_user, title='Pizza').order_by(BillSplit.id.desc()).first()
+        split_id = split.id
+        assert SplitParticipant.query.filter_by(split_id=split_id).count() == 3
+
+    assert client.post(f'/social/split/{split_id}/delete').status_code == 302
+    with app.app_context():
+        assert db.session.get(BillSplit, split_id) is None
+        assert SplitParticipant.query.filter_by(split_id=split_id).count() == 0
+
+
+def test_deleting_a_budget_deletes_its_envelopes(app, demo_user):
+    with app.app_context():
+        budget = Budget(user_id=demo_user, year=2020, month=1, total_amount=3000)
+        budget.envelopes.append(BudgetEnvelope(category='Food', allocated=1500, spent=0))
+        db.session.add(budget)
+        db.session.commit()
+        budget_id = budget.id
+
+        db.session.delete(budget)
+        db.session.commit()
+        assert BudgetEnvelope.query.filter_by(budget_id=budget_id).count() == 0
@@ -0,0 +1,33 @@
+from app.dbprofiles import engine_options, postgres_timeouts, _postgres_settings
+
+
+class FakeConnection:
+    def __init__(self):
+        self.executed = []
+        self.committed = False
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        self.executed.append(sql)
+
+    def close(self):
+        pass
+
+    def commit(self):
+        self.committed = True
+
+
+def test_postgres_profiles_send_no_startup_options():
+    for profile in ('serverless', 'worker'):
+        options = engine_options(profile, 'postgresql://db.example/app')
+        assert 'options' not in options['connect_args']
+
+
+def test_postgres_timeouts_are_set_on_connect():
+    connection = FakeConnection()
+    _postgres_settings(postgres_timeouts('serverless'))(connection, None)
+    assert connection.executed == ['SET statement_timeout = 10000',
+                                   'SET idle_in_transaction_session_timeout = 15000']
+    assert connection.committed
@@ -0,0 +1,23 @@
+from datetime import date, datetime
+
+from app.extensions import db
+from app.ledger import add_transaction
+from app.models import MonthlySummary, Transaction, User
+
+
+def test_history_reads_without_storing_summaries(app, client, demo_user):
+    year = date.today().year - 1
+    with app.app_context():
+        db.session.get(User, demo_user).created_at = datetime(year, 1, 1)
+        add_transaction(Transaction(user_id=demo_user, amount=250, category='Food', is_food=True,
+                                    description='Thali', date=datetime(year, 3, 14, 13)))
+        db.session.execute(db.delete(MonthlySummary).where(MonthlySummary.user_id == demo_user))
+        db.session.commit()
+
+    response = client.get(f'/analytics/api/months?year={year}')
+    assert response.status_code == 200
+    months = response.get_json()['months']
+    assert len(months) == 12
+    assert months[2]['total'] == 250
+    with app.app_context():
+        assert MonthlySummary.query.filter_by(user_id=demo_user).count() == 0
@@ -0,0 +1,30 @@
+import io
+
+from app.models import Transaction
+
+
+def _upload(client, text):
+    return client.post('/expenses/import', data={'file': (io.BytesIO(text.encode()), 'expenses.csv')},
+                       content_type='multipart/form-data')
+
+
+def test_malformed_upload_keeps_earlier_rows_and_reports_the_line(app, client, demo_user):
+    with app.app_context():
+        before = Transaction.query.filter_by(user_id=demo_user).count()
+    text = ('date,amount,category,description\n'
+            '2026-01-05,120,Food,Lunch\n'
+            '2026-01-06,80,Travel,Auto\n'
+            '2026-01-07,40,Misc,"' + 'x' * 200_000 + '"\n'
+            '2026-01-08,60,Food,Dinner\n')
+    response = _upload(client, text)
+    assert response.status_code == 200
+    page = response.get_data(as_text=True)
+    assert 'unreadable CSV' in page
+    with app.app_context():
+        assert Transaction.query.filter_by(user_id=demo_user).count() == before + 2
+
+
+def test_malformed_header_is_reported(client):
+    response = _upload(client, '"' + 'd' * 200_000 + '",amount\n')
+    assert response.status_code == 200
+    assert 'unreadable CSV' in response.get_data(as_text=True)
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.jobs import enqueue, _drain
+from app.models import Job
+
+
+def test_crashed_job_does_not_block_a_new_one(app, demo_user):
+    with app.app_context():
+        db.session.execute(db.delete(Job))
+        crashed_at = datetime.utcnow() - timedelta(seconds=app.config['JOBS_LOCK_TIMEOUT'] + 60)
+        crashed = Job(kind='streaks.refresh', user_id=demo_user, payload='{}', state='running', attempts=1,
+                      max_attempts=3, run_after=crashed_at, locked_by='dead:1/0', locked_at=crashed_at)
+        db.session.add(crashed)
+        db.session.commit()
+
+        job = enqueue('streaks.refresh', user_id=demo_user, unique=True)
+        db.session.commit()
+        assert job.id != crashed.id
+        crashed_id, job_id = crashed.id, job.id
+
+    _drain(app, 1)
+    with app.app_context():
+        assert db.session.get(Job, crashed_id).state == 'succeeded'
+        assert db.session.get(Job, job_id).state == 'succeeded'
+
+
+def test_running_job_still_dedupes(app, demo_user):
+    with app.app_context():
+        db.session.execute(db.delete(Job))
+        running = Job(kind='streaks.refresh', user_id=demo_user, payload='{}', state='running', attempts=1,
+                      max_attempts=3, run_after=datetime.utcnow(), locked_by='live:1/0', locked_at=datetime.utcnow())
+        db.session.add(running)
+        db.session.commit()
+        assert enqueue('streaks.refresh', user_id=demo_user, unique=True).id == running.id
+
+
+def test_drain_runs_due_retries(app, demo_user):
+    with app.app_context():
+        db.session.execute(db.delete(Job))
+        retry = Job(kind='streaks.refresh', user_id=demo_user, payload='{}', state='queued', attempts=1,
+                    max_attempts=3, run_after=datetime.utcnow() - timedelta(seconds=5))
+        db.session.add(retry)
+        db.session.commit()
+        retry_id = retry.id
+
+    _drain(app, 0)
+    with app.app_context():
+        assert db.session.get(Job, retry_id).state == 'succeeded'
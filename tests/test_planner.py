@@ -0,0 +1,74 @@
+import itertools
+import random
+import time
+
+import pytest
+
+from app.blueprints.meals.planner import plan_meals
+
+MEAL_TYPES = ['Breakfast', 'Lunch', 'Snack', 'Dinner']
+
+
+def make_catalog(per_type, seed=7):
+    """Mess/canteen-style options with non-round prices."""
+    rnd = random.Random(seed)
+    return {meal_type: [
+        {'name': f'{meal_type} {i}', 'cost': round(rnd.uniform(12, 160), 1), 'score': round(rnd.uniform(3, 9.5), 1),
+         'protein': round(rnd.uniform(2, 35), 1), 'calories': rnd.randint(150, 800), 'source': 'Mess'}
+        for i in range(per_type)
+    ] for meal_type in MEAL_TYPES}
+
+
+def brute_force(catalog, days, budget, meal_types):
+    per_type = []
+    for meal_type in meal_types:
+        options = catalog[meal_type]
+        chains = [c for c in itertools.product(range(len(options)), repeat=days)
+                  if len(options) == 1 or all(a != b for a, b in zip(c, c[1:]))]
+        per_type.append([(sum(options[i]['cost'] for i in c), sum(options[i]['score'] for i in c)) for c in chains])
+    best = None
+    for combo in itertools.product(*per_type):
+        if sum(cost for cost, _ in combo) <= budget:
+            score = sum(score for _, score in combo)
+            best = score if best is None else max(best, score)
+    return best
+
+
+def test_matches_brute_force_on_small_catalogs():
+    rnd = random.Random(1)
+    types = ['Breakfast', 'Lunch']
+    for _ in range(40):
+        catalog = {t: [{'name': f'{t}{i}', 'cost': rnd.choice([10, 15, 20, 25, 30, 40]), 'score': rnd.randint(3, 9),
+                        'protein': 5, 'calories': 300, 'source': 'Mess'} for i in range(rnd.randint(1, 3))]
+                   for t in types}
+        budget = rnd.randint(40, 200)
+        result = plan_meals(catalog, 3, budget, meal_types=types)
+        expected = brute_force(catalog, 3, budget, types)
+        if expected is None:
+            assert not result.within_budget
+        else:
+            assert result.within_budget
+            assert result.total_cost <= budget
+            assert result.total_score == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('per_type', [12, 2000])
+def test_stays_in_budget_without_consecutive_repeats(per_type):
+    result = plan_meals(make_catalog(per_type), 7, 7 * 250, min_protein=60)
+    assert result.within_budget and result.total_cost <= 7 * 250
+    for today, tomorrow in zip(result.days, result.days[1:]):
+        for meal_type in MEAL_TYPES:
+            assert today[meal_type]['name'] != tomorrow[meal_type]['name']
+
+
+@pytest.mark.parametrize('per_type', [12, 2000])
+@pytest.mark.parametrize('budget,min_protein', [(7 * 150, 0), (7 * 250, 60), (7 * 600, 90)])
+def test_plans_a_week_well_under_50ms(per_type, budget, min_protein):
+    catalog = make_catalog(per_type)
+    plan_meals(catalog, 7, budget, min_protein=min_protein)  # warm up
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        plan_meals(catalog, 7, budget, min_protein=min_protein)
+        timings.append(time.perf_counter() - start)
+    assert min(timings) < 0.05